@@ -0,0 +1,63 @@
+"""
+Memory benchmark of building a GraphProcessor from CSV files in chunks against reading them into Python lists first.
+
+Run with `python benchmarks/benchmark_chunked_loading.py`.
+"""
+
+import csv
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from benchmark_graph_memory import measure, random_radial_arrays
+
+from ees_scientific_software_engineering.graph_processing import GraphProcessor
+
+
+def write_tables(directory: Path, n: int):
+    """Write the vertex and edge tables of a random network with n vertices as CSV files"""
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = random_radial_arrays(n, n // 10)
+    np.savetxt(directory / "vertices.csv", vertex_ids, fmt="%d", header="id", comments="")
+    table = np.column_stack([edge_ids, edge_vertex_id_pairs, edge_enabled])
+    np.savetxt(
+        directory / "edges.csv",
+        table,
+        fmt="%d",
+        delimiter=",",
+        header="id,from_vertex_id,to_vertex_id,enabled",
+        comments="",
+    )
+    return source_vertex_id
+
+
+def build_from_lists(directory: Path, source_vertex_id: int):
+    """Read the tables into Python lists and pass them to the constructor"""
+    with open(directory / "vertices.csv", newline="", encoding="utf-8") as file:
+        vertex_ids = [int(row["id"]) for row in csv.DictReader(file)]
+    with open(directory / "edges.csv", newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    edge_ids = [int(row["id"]) for row in rows]
+    edge_vertex_id_pairs = [(int(row["from_vertex_id"]), int(row["to_vertex_id"])) for row in rows]
+    edge_enabled = [row["enabled"] == "1" for row in rows]
+    return GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id)
+
+
+def build_from_files(directory: Path, source_vertex_id: int):
+    """Stream the tables into the graph processor"""
+    return GraphProcessor.from_files(directory / "vertices.csv", directory / "edges.csv", source_vertex_id)
+
+
+def main():
+    """Print the time and peak memory of both ways to load the tables for increasing network sizes"""
+    print(f"{'vertices':>10} {'':>10} {'time [s]':>10} {'peak [MB]':>10} {'kept [MB]':>10}")
+    for n in [10_000, 100_000, 1_000_000]:
+        with tempfile.TemporaryDirectory() as name:
+            directory = Path(name)
+            source_vertex_id = write_tables(directory, n)
+            for label, build in [("lists", build_from_lists), ("chunks", build_from_files)]:
+                elapsed, peak, kept = measure(build, directory, source_vertex_id)
+                print(f"{n:>10} {label:>10} {elapsed:>10.3f} {peak / 1e6:>10.1f} {kept / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
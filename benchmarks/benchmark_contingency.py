@@ -0,0 +1,40 @@
+"""
+Benchmark of the N-1 contingency analysis: a loop of single queries against one bulk call.
+
+Run with `python benchmarks/benchmark_contingency.py`.
+"""
+
+import time
+
+from benchmark_graph_validation import random_radial_network
+
+from ees_scientific_software_engineering.graph_processing import GraphProcessor
+
+
+def main():
+    """Print the time of the query loop and of the bulk analysis for increasing network sizes"""
+    print(f"{'vertices':>10} {'loop [s]':>10} {'bulk [s]':>10} {'bulk x4 [s]':>12}")
+    for n in [1_000, 2_000, 4_000, 8_000]:
+        vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = random_radial_network(n, n // 10)
+        graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id)
+
+        start = time.perf_counter()
+        for edge_id, enabled in zip(edge_ids, edge_enabled):
+            if enabled:
+                graph_processor.find_downstream_vertices(edge_id)
+                graph_processor.find_alternative_edges(edge_id)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        graph_processor.find_contingencies()
+        bulk = time.perf_counter() - start
+
+        start = time.perf_counter()
+        graph_processor.find_contingencies(n_workers=4)
+        bulk_parallel = time.perf_counter() - start
+
+        print(f"{n:>10} {loop:>10.3f} {bulk:>10.3f} {bulk_parallel:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark of FactorizationCache: the time of a cache hit, which hashes the matrix, against a new LUSolver,
+and the hit rate of a workload that cycles through more matrices than fit in the budget.
+
+Run with `python benchmarks/benchmark_factorization_cache.py`.
+"""
+
+import time
+
+import numpy as np
+
+from ees_scientific_software_engineering.factorization_cache import FactorizationCache
+from ees_scientific_software_engineering.solvers import LUSolver
+
+
+def lookup():
+    """Print the time of factorizing against a cache hit for increasing matrix sizes"""
+    rng = np.random.default_rng(0)
+    cache = FactorizationCache()
+    print(f"{'n':>6} {'LUSolver [ms]':>14} {'cache hit [ms]':>15}")
+    for n in [100, 500, 1000, 2000]:
+        matrix = rng.random((n, n)) + n * np.eye(n)
+        cache.get(matrix)
+
+        start = time.perf_counter()
+        LUSolver(matrix)
+        factorize = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cache.get(matrix)
+        hit = time.perf_counter() - start
+
+        print(f"{n:>6} {factorize * 1e3:>14.2f} {hit * 1e3:>15.2f}")
+
+
+def workload():
+    """Print the hit rate and time of 1000 lookups of 20 matrices drawn with a skewed distribution"""
+    n = 300
+    rng = np.random.default_rng(0)
+    matrices = [rng.random((n, n)) + n * np.eye(n) for _ in range(20)]
+    lookups = np.minimum(rng.geometric(0.2, size=1000) - 1, 19)
+    nbytes = LUSolver(matrices[0]).nbytes
+    print(f"{'budget':>8} {'hits':>6} {'misses':>7} {'evictions':>10} {'time [s]':>9}")
+    for budget in [0, 2, 5, 10, 20]:
+        cache = FactorizationCache(max_bytes=budget * nbytes)
+
+        start = time.perf_counter()
+        for index in lookups:
+            cache.get(matrices[index])
+        elapsed = time.perf_counter() - start
+
+        statistics = cache.statistics
+        print(f"{budget:>8} {statistics.hits:>6} {statistics.misses:>7} {statistics.evictions:>10} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    lookup()
+    workload()
@@ -0,0 +1,53 @@
+"""
+Benchmark of the contingency analysis of a network of many radial feeders: one processor per feeder
+against a single multi-source processor, in this process and in a process pool.
+
+Run with `python benchmarks/benchmark_forest.py`.
+"""
+
+import time
+
+import numpy as np
+from benchmark_graph_memory import random_radial_arrays
+
+from ees_scientific_software_engineering.graph_processing import GraphProcessor
+
+
+def random_feeders(n_feeders: int, n: int, n_ties: int, seed: int = 0):
+    """n_feeders random feeders of n vertices with a few disabled edges each, plus disabled ties between them"""
+    rng = np.random.default_rng(seed)
+    feeders = [random_radial_arrays(n, n // 10, seed + feeder) for feeder in range(n_feeders)]
+    offsets = np.arange(n_feeders) * n
+    vertex_ids = np.concatenate([feeder[0] + offset for feeder, offset in zip(feeders, offsets)])
+    edge_vertex_id_pairs = np.concatenate(
+        [feeder[2] + offset for feeder, offset in zip(feeders, offsets)]
+        + [rng.integers(0, len(vertex_ids), (n_ties, 2))]
+    )
+    edge_enabled = np.concatenate([feeder[3] for feeder in feeders] + [np.zeros(n_ties, dtype=bool)])
+    edge_ids = np.arange(len(edge_vertex_id_pairs))
+    return feeders, (vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, offsets)
+
+
+def main():
+    """Print the time of the contingency analysis of all feeders for increasing numbers of feeders"""
+    n = 2_000
+    print(f"{'feeders':>8} {'per feeder [s]':>15} {'forest [s]':>12} {'forest 4 workers [s]':>21}")
+    for n_feeders in [50, 500]:
+        feeders, forest = random_feeders(n_feeders, n, n_feeders)
+
+        start = time.perf_counter()
+        for feeder in feeders:
+            GraphProcessor(*feeder).find_contingencies()
+        per_feeder = time.perf_counter() - start
+
+        timings = []
+        for n_workers in [1, 4]:
+            start = time.perf_counter()
+            GraphProcessor(*forest).find_contingencies(n_workers=n_workers)
+            timings.append(time.perf_counter() - start)
+
+        print(f"{n_feeders:>8} {per_feeder:>15.3f} {timings[0]:>12.3f} {timings[1]:>21.3f}")
+
+
+if __name__ == "__main__":
+    main()
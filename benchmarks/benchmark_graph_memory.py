@@ -0,0 +1,68 @@
+"""
+Memory and time benchmark of the array-backed GraphProcessor against a networkx graph of the same network.
+
+Run with `python benchmarks/benchmark_graph_memory.py`.
+The networkx graph is built the way GraphProcessor used to store its topology: a nx.Graph of the enabled
+edges with the edge ids as attributes.
+"""
+
+import time
+import tracemalloc
+
+import networkx as nx
+import numpy as np
+
+from ees_scientific_software_engineering.graph_processing import GraphProcessor
+
+
+def random_radial_arrays(n: int, n_disabled: int, seed: int = 0):
+    """Random spanning tree on n vertices plus n_disabled disabled edges, as numpy arrays"""
+    rng = np.random.default_rng(seed)
+    vertex_ids = np.arange(n)
+    children = np.arange(1, n)
+    parents = (rng.random(n - 1) * children).astype(np.int64)
+    edge_vertex_id_pairs = np.concatenate(
+        [np.stack([parents, children], axis=1), rng.integers(0, n, size=(n_disabled, 2))]
+    )
+    edge_ids = np.arange(n, n + len(edge_vertex_id_pairs))
+    edge_enabled = np.arange(len(edge_ids)) < n - 1
+    return vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, 0
+
+
+def build_networkx(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, _source_vertex_id):
+    """Build the networkx graph of the enabled edges"""
+    network = nx.Graph()
+    network.add_nodes_from(vertex_ids.tolist())
+    for edge_id, (vertex_1, vertex_2), enabled in zip(
+        edge_ids.tolist(), edge_vertex_id_pairs.tolist(), edge_enabled.tolist()
+    ):
+        if enabled:
+            network.add_edge(vertex_1, vertex_2, id=edge_id)
+    return network
+
+
+def measure(build, *args):
+    """Return the build time, the peak memory while building and the memory kept by the result"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(*args)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak, current
+
+
+def main():
+    """Print the time and memory of both representations for increasing network sizes"""
+    GraphProcessor(*random_radial_arrays(100, 10))  # warm up lazy imports
+    print(f"{'vertices':>10} {'':>10} {'time [s]':>10} {'peak [MB]':>10} {'kept [MB]':>10}")
+    for n in [10_000, 100_000, 1_000_000]:
+        args = random_radial_arrays(n, n // 10)
+        for name, build in [("networkx", build_networkx), ("arrays", GraphProcessor)]:
+            elapsed, peak, kept = measure(build, *args)
+            print(f"{n:>10} {name:>10} {elapsed:>10.3f} {peak / 1e6:>10.1f} {kept / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
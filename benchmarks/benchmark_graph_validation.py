@@ -0,0 +1,48 @@
+"""
+Scaling benchmark of the GraphProcessor construction (input validation and graph build).
+
+Run with `python benchmarks/benchmark_graph_validation.py`.
+The time per vertex should stay roughly constant when the network grows, which shows linear behaviour.
+"""
+
+import random
+import time
+
+from ees_scientific_software_engineering.graph_processing import GraphProcessor
+
+
+def random_radial_network(n: int, n_disabled: int, seed: int = 0):
+    """Random spanning tree on n vertices plus n_disabled disabled edges between random vertices"""
+    rng = random.Random(seed)
+    vertex_ids = list(range(n))
+    edge_vertex_id_pairs = [(rng.randrange(i), i) for i in range(1, n)]
+    edge_vertex_id_pairs += [(rng.randrange(n), rng.randrange(n)) for _ in range(n_disabled)]
+    edge_ids = list(range(n, n + len(edge_vertex_id_pairs)))
+    edge_enabled = [True] * (n - 1) + [False] * n_disabled
+    return vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, 0
+
+
+def star_network(n: int, n_disabled: int):
+    """Star of n vertices around the source plus n_disabled disabled edges between the leaves, the worst degree"""
+    vertex_ids = list(range(n))
+    edge_vertex_id_pairs = [(0, i) for i in range(1, n)]
+    edge_vertex_id_pairs += [(i, i + 1) for i in range(1, n_disabled + 1)]
+    edge_ids = list(range(n, n + len(edge_vertex_id_pairs)))
+    edge_enabled = [True] * (n - 1) + [False] * n_disabled
+    return vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, 0
+
+
+def main():
+    """Print the construction time for increasing network sizes"""
+    print(f"{'network':>8} {'vertices':>10} {'time [s]':>10} {'us/vertex':>10}")
+    for name, network in [("radial", random_radial_network), ("star", star_network)]:
+        for n in [12_500, 25_000, 50_000, 100_000, 200_000]:
+            args = network(n, n // 10)
+            start = time.perf_counter()
+            GraphProcessor(*args)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>8} {n:>10} {elapsed:>10.3f} {elapsed / n * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
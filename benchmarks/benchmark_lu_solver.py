@@ -0,0 +1,183 @@
+"""
+Benchmarks of LUSolver: the construction time, the throughput of one solve call per vector against
+solving all right-hand sides at once and against solve_stream, low-rank updates against factorizing again,
+BatchLUSolver against one LUSolver per matrix for stacks of small matrices, mixed precision against float64,
+and the fused finiteness check and in-place factorization and solve against the default copies.
+
+Run with `python benchmarks/benchmark_lu_solver.py`.
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+
+from ees_scientific_software_engineering.solvers import BatchLUSolver, LUSolver, check_finite
+
+
+def construction():
+    """Print the construction time for increasing matrix sizes, with the singularity check it used to have"""
+    rng = np.random.default_rng(0)
+    print(f"{'n':>6} {'det + factorize [s]':>20} {'LUSolver [s]':>14}")
+    for n in [500, 1000, 2000]:
+        matrix = rng.random((n, n)) + n * np.eye(n)
+
+        start = time.perf_counter()
+        scipy.linalg.det(matrix)
+        scipy.linalg.lu_factor(matrix)
+        det_factorize = time.perf_counter() - start
+
+        start = time.perf_counter()
+        LUSolver(matrix)
+        solver = time.perf_counter() - start
+
+        print(f"{n:>6} {det_factorize:>20.3f} {solver:>14.3f}")
+
+
+def throughput():
+    """Print the number of solved vectors per second for increasing matrix sizes, for 8760 hourly vectors"""
+    n_vectors = 8760
+    rng = np.random.default_rng(0)
+    print(f"{'n':>6} {'loop [1/s]':>12} {'matrix [1/s]':>14} {'stream [1/s]':>14}")
+    for n in [10, 100, 500]:
+        solver = LUSolver(rng.random((n, n)) + n * np.eye(n))
+        vectors = rng.random((n_vectors, n))
+
+        start = time.perf_counter()
+        for b in vectors:
+            solver.solve(b)
+        loop = n_vectors / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        solver.solve(np.ascontiguousarray(vectors.T))
+        matrix = n_vectors / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in solver.solve_stream(iter(vectors)):
+            pass
+        stream = n_vectors / (time.perf_counter() - start)
+
+        print(f"{n:>6} {loop:>12.0f} {matrix:>14.0f} {stream:>14.0f}")
+
+
+def updates():
+    """Print the time to change one entry (a branch outage) and solve, against a new LUSolver"""
+    rng = np.random.default_rng(0)
+    print(f"{'n':>6} {'new LUSolver [ms]':>18} {'update_entries [ms]':>20}")
+    for n in [500, 1000, 2000]:
+        matrix = rng.random((n, n)) + n * np.eye(n)
+        b = rng.random(n)
+        solver = LUSolver(matrix)
+
+        start = time.perf_counter()
+        changed = matrix.copy()
+        changed[3, 7] += 1.0
+        LUSolver(changed).solve(b)
+        refactorize = time.perf_counter() - start
+
+        start = time.perf_counter()
+        solver.update_entries(np.array([3]), np.array([7]), np.array([1.0]))
+        solver.solve(b)
+        update = time.perf_counter() - start
+
+        print(f"{n:>6} {refactorize * 1e3:>18.2f} {update * 1e3:>20.2f}")
+
+
+def batches():
+    """Print the time to factorize and solve stacks of small matrices, one LUSolver each against BatchLUSolver"""
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>8} {'m':>4} {'LUSolver loop [s]':>18} {'BatchLUSolver [s]':>18}")
+    for batch, m in [(10_000, 4), (10_000, 8), (100_000, 8), (10_000, 32)]:
+        matrices = rng.random((batch, m, m)) + m * np.eye(m)
+        vectors = rng.random((batch, m))
+
+        start = time.perf_counter()
+        for matrix, b in zip(matrices, vectors):
+            LUSolver(matrix).solve(b)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        BatchLUSolver(matrices).solve(vectors)
+        batched = time.perf_counter() - start
+
+        print(f"{batch:>8} {m:>4} {loop:>18.3f} {batched:>18.3f}")
+
+
+def mixed_precision():
+    """Print the time to factorize and solve 10 vectors, and the factorization memory, in float64 and mixed precision"""
+    rng = np.random.default_rng(0)
+    print(
+        f"{'n':>6} {'float64 [s]':>12} {'mixed [s]':>10} {'iterations':>11} {'float64 [MB]':>13} {'float32 [MB]':>13}"
+    )
+    for n in [1000, 2000, 4000]:
+        matrix = rng.random((n, n)) + n / 10 * np.eye(n)
+        b = rng.random((n, 10))
+
+        start = time.perf_counter()
+        solver = LUSolver(matrix)
+        solver.solve(b)
+        double = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mixed_solver = LUSolver(matrix, mixed_precision=True)
+        mixed_solver.solve(b)
+        mixed = time.perf_counter() - start
+
+        print(
+            f"{n:>6} {double:>12.3f} {mixed:>10.3f} {mixed_solver.refinement_iterations:>11} "
+            f"{solver._lu.nbytes / 1e6:>13.0f} {mixed_solver._lu.nbytes / 1e6:>13.0f}"
+        )
+
+
+def traced(function, *args, **kwargs):
+    """Return the time and the peak of the memory allocated while calling the function"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def separate_checks(values):
+    """The finiteness check LUSolver used to make"""
+    return np.isinf(values).any() or np.isnan(values).any()
+
+
+def default_solve(matrix, b):
+    """Factorize and solve with the default copies"""
+    return LUSolver(matrix).solve(b)
+
+
+def in_place_solve(matrix, b):
+    """Factorize in the matrix and solve in b"""
+    return LUSolver(matrix, overwrite_a=True).solve(b, out=b)
+
+
+def in_place():
+    """Print the time and peak memory of the finiteness checks, and of factorizing and solving 100 vectors"""
+    rng = np.random.default_rng(0)
+    print(f"{'n':>6} {'':>20} {'time [s]':>10} {'peak [MB]':>10}")
+    for n in [1000, 2000, 4000]:
+        matrix = rng.random((n, n)) + n / 10 * np.eye(n)
+        b = np.asfortranarray(rng.random((n, 100)))
+        cases = [
+            ("isinf + isnan", separate_checks, (matrix,)),
+            ("check_finite", check_finite, (matrix, "inf", "nan")),
+            ("default solve", default_solve, (matrix, b)),
+            ("in-place solve", in_place_solve, (matrix.copy(), b.copy(order="F"))),
+        ]
+        for name, function, args in cases:
+            elapsed, peak = traced(function, *args)
+            print(f"{n:>6} {name:>20} {elapsed:>10.3f} {peak / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    construction()
+    throughput()
+    updates()
+    batches()
+    mixed_precision()
+    in_place()
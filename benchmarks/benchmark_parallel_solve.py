@@ -0,0 +1,39 @@
+"""
+Scaling benchmark of LUSolver.solve_parallel: the throughput of solving 64 sets of 32 right-hand sides
+for 1 to 2x the available cores of workers, with the BLAS threads divided over the workers against
+leaving every BLAS call all cores.
+
+Run with `python benchmarks/benchmark_parallel_solve.py`. Limit the cores with e.g. `taskset -c 0-3`
+to measure the scaling on fewer cores.
+"""
+
+import time
+
+import numpy as np
+
+from ees_scientific_software_engineering.parallel import available_cores
+from ees_scientific_software_engineering.solvers import LUSolver
+
+
+def main():
+    """Print the solved sets per second for increasing numbers of workers"""
+    n = 2000
+    rng = np.random.default_rng(0)
+    solver = LUSolver(rng.random((n, n)) + n * np.eye(n))
+    right_hand_sides = [np.asfortranarray(rng.random((n, 32))) for _ in range(64)]
+    cores = available_cores()
+    print(f"{cores} cores")
+    print(f"{'workers':>8} {'all BLAS threads [1/s]':>23} {'divided BLAS threads [1/s]':>27}")
+
+    workers = sorted({1, 2, 4, 8, cores, 2 * cores})
+    for n_workers in [w for w in workers if w <= 2 * cores]:
+        throughputs = []
+        for blas_threads in (cores, None):
+            start = time.perf_counter()
+            solver.solve_parallel(right_hand_sides, n_workers=n_workers, blas_threads=blas_threads)
+            throughputs.append(len(right_hand_sides) / (time.perf_counter() - start))
+        print(f"{n_workers:>8} {throughputs[0]:>23.1f} {throughputs[1]:>27.1f}")
+
+
+if __name__ == "__main__":
+    main()
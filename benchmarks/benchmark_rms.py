@@ -0,0 +1,122 @@
+"""
+Benchmarks of the rms module:
+- rms of a .npy file loaded into memory against RmsAccumulator reading the memory-mapped file, and
+  against merging accumulators of parts of the file
+- batched_rms per channel and rolling_rms per window against calling rms in a loop over the slices
+- the scaling of rms of a large array with the number of threads, of values whose squares do and do
+  not overflow, against the square and mean of NumPy; limit the cores with e.g. `taskset -c 0-3`
+
+Run with `python benchmarks/benchmark_rms.py`.
+"""
+
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from ees_scientific_software_engineering.parallel import available_cores
+from ees_scientific_software_engineering.rms import RmsAccumulator, batched_rms, rms, rolling_rms
+
+
+def traced(function, *args):
+    """Return the result of the function, its time and the peak of the memory allocated meanwhile"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def rms_of_file(path):
+    """The rms of a whole .npy file in memory"""
+    return rms(np.load(path))
+
+
+def merged_parts(path, n_parts=8):
+    """The rms of a memory-mapped .npy file from accumulators of its parts, as a distributed reduction would"""
+    signal = np.load(path, mmap_mode="r")
+    bounds = np.linspace(0, len(signal), n_parts + 1).astype(int)
+    merged = RmsAccumulator()
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        merged.merge(RmsAccumulator().update(signal[start:end]))
+    return merged.result()
+
+
+def streaming():
+    """Print the time and peak memory of the rms of .npy files of increasing size"""
+    rng = np.random.default_rng(0)
+    print(f"{'values':>12} {'':>18} {'time [s]':>9} {'peak [MB]':>10} {'rms':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "signal.npy"
+        for n in [1_000_000, 10_000_000, 50_000_000]:
+            np.save(path, rng.normal(size=n))
+            cases = [
+                ("rms(np.load)", rms_of_file),
+                ("from_npy", RmsAccumulator.from_npy),
+                ("merged 8 parts", merged_parts),
+            ]
+            for name, function in cases:
+                result, elapsed, peak = traced(function, path)
+                value = result if isinstance(result, float) else result.result()
+                print(f"{n:>12} {name:>18} {elapsed:>9.3f} {peak / 1e6:>10.1f} {value:>9.6f}")
+
+
+def timed(function, *args, **kwargs):
+    """Return the result of the function and the time it took"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def batched():
+    """Print the time of the rms per channel of signals with increasing numbers of channels"""
+    rng = np.random.default_rng(1)
+    print(f"{'channels':>9} {'samples':>9} {'loop [s]':>9} {'batched [s]':>12} {'max diff':>9}")
+    for n_channels, n_samples in [(10, 1_000_000), (1000, 10_000), (100_000, 100)]:
+        signals = rng.normal(size=(n_channels, n_samples))
+        expected, loop = timed(lambda: np.array([rms(signal) for signal in signals]))
+        result, elapsed = timed(batched_rms, signals)
+        print(f"{n_channels:>9} {n_samples:>9} {loop:>9.3f} {elapsed:>12.4f} {np.abs(result - expected).max():>9.1e}")
+
+
+def rolling():
+    """Print the time of the rms of sliding windows of a 50 Hz waveform sampled at 10 kHz"""
+    rng = np.random.default_rng(2)
+    n = 1_000_000
+    waveform = np.sin(2 * np.pi * 50 * np.arange(n) / 10_000) + 0.01 * rng.normal(size=n)
+    print(f"{'window':>7} {'step':>5} {'loop [s]':>9} {'rolling [s]':>12} {'peak [MB]':>10} {'max rel diff':>13}")
+    for window, step in [(200, 200), (200, 1), (2000, 1), (20_000, 1)]:
+        starts = range(0, n - window + 1, step)
+        expected, loop = timed(lambda: np.array([rms(waveform[start : start + window]) for start in starts]))
+        result, elapsed, peak = traced(rolling_rms, waveform, window, step)
+        difference = np.abs(result - expected).max() / expected.max()
+        print(f"{window:>7} {step:>5} {loop:>9.3f} {elapsed:>12.4f} {peak / 1e6:>10.1f} {difference:>13.1e}")
+
+
+def scaling():
+    """Print the time of rms of 50M values for increasing numbers of threads"""
+    signal = np.random.default_rng(3).normal(size=50_000_000)
+    cores = available_cores()
+    _, numpy_time = timed(lambda: np.sqrt(np.mean(signal**2)))
+    print(f"{cores} cores, np.sqrt(np.mean(signal**2)): {numpy_time:.3f} s")
+    print(f"{'workers':>8} {'time [s]':>9} {'speedup':>8} {'time 1e200 [s]':>15} {'rms 1e200':>10}")
+    large = signal * 1e200
+    serial = None
+    for n_workers in sorted({1, 2, 4, 8, cores, 2 * cores}):
+        if n_workers > 2 * cores:
+            continue
+        _, elapsed = timed(rms, signal, n_workers=n_workers)
+        serial = serial or elapsed
+        result, large_time = timed(rms, large, n_workers=n_workers)
+        print(f"{n_workers:>8} {elapsed:>9.3f} {serial / elapsed:>8.2f} {large_time:>15.3f} {result:>10.3e}")
+
+
+if __name__ == "__main__":
+    streaming()
+    batched()
+    rolling()
+    scaling()
@@ -0,0 +1,45 @@
+"""
+Benchmark of add_arrays and multiply_arrays against calling add and multiply in a loop over pairs,
+for values that fit in int64 and for values of which one product overflows.
+
+Run with `python benchmarks/benchmark_simple_function.py`.
+"""
+
+import time
+
+import numpy as np
+
+from ees_scientific_software_engineering.simple_function import add, add_arrays, multiply, multiply_arrays
+
+
+def timed(function, *args):
+    """Return the result of the function and the time it took"""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Print the times of the loops and the array kernels for increasing numbers of pairs"""
+    rng = np.random.default_rng(0)
+    print(f"{'pairs':>9} {'function':>9} {'case':>9} {'loop [s]':>9} {'arrays [s]':>11} {'dtype':>6}")
+    for n in [1000, 100_000, 1_000_000]:
+        a = rng.integers(-(2**31), 2**31, size=n)
+        b = rng.integers(-(2**31), 2**31, size=n)
+        a[n // 2] = 2**31
+        overflowing_b = b.copy()
+        overflowing_b[n // 2] = 2**63 - 1
+        for name, scalar_function, array_function in [
+            ("add", add, add_arrays),
+            ("multiply", multiply, multiply_arrays),
+        ]:
+            for case, values_b in [("int64", b), ("overflow", overflowing_b)]:
+                pairs = list(zip(a.tolist(), values_b.tolist()))
+                expected, loop = timed(lambda: [scalar_function(x, y) for x, y in pairs])
+                result, elapsed = timed(array_function, a, values_b)
+                assert result.tolist() == expected
+                print(f"{n:>9} {name:>9} {case:>9} {loop:>9.3f} {elapsed:>11.4f} {str(result.dtype):>6}")
+
+
+if __name__ == "__main__":
+    main()
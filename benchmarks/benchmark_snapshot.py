@@ -0,0 +1,38 @@
+"""
+Benchmark of loading a memory-mapped GraphProcessor snapshot against building the GraphProcessor.
+
+Run with `python benchmarks/benchmark_snapshot.py`.
+"""
+
+import tempfile
+import time
+
+from benchmark_graph_memory import random_radial_arrays
+
+from ees_scientific_software_engineering.graph_processing import GraphProcessor
+
+
+def main():
+    """Print the build, save and load times for increasing network sizes"""
+    print(f"{'vertices':>10} {'build [ms]':>12} {'save [ms]':>12} {'load [ms]':>12}")
+    for n in [10_000, 100_000, 1_000_000]:
+        arrays = random_radial_arrays(n, n // 10)
+
+        start = time.perf_counter()
+        graph_processor = GraphProcessor(*arrays)
+        build = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            graph_processor.save(directory)
+            save = time.perf_counter() - start
+
+            start = time.perf_counter()
+            GraphProcessor.load(directory)
+            load = time.perf_counter() - start
+
+        print(f"{n:>10} {build * 1e3:>12.3f} {save * 1e3:>12.3f} {load * 1e3:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark of applying switch actions incrementally against rebuilding the GraphProcessor after each of them.
+
+Run with `python benchmarks/benchmark_switching.py`.
+"""
+
+import time
+
+import numpy as np
+from benchmark_graph_memory import random_radial_arrays
+
+from ees_scientific_software_engineering.graph_processing import GraphProcessor
+
+
+def main():
+    """Print the time per switch for increasing network sizes"""
+    n_switches = 200
+    print(f"{'vertices':>10} {'switch [ms]':>12} {'rebuild [ms]':>12}")
+    for n in [10_000, 100_000, 1_000_000]:
+        vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = random_radial_arrays(n, n // 10)
+        graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id)
+        rng = np.random.default_rng(0)
+
+        switches = []
+        for edge_id in rng.choice(edge_ids[edge_enabled], size=10 * n_switches, replace=False).tolist():
+            alternatives = graph_processor.find_alternative_edges(edge_id)
+            if alternatives:
+                switches.append((edge_id, alternatives[0]))
+                graph_processor.switch(edge_id, alternatives[0])
+            if len(switches) == n_switches:
+                break
+
+        graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id)
+        start = time.perf_counter()
+        for disabled_edge_id, enabled_edge_id in switches:
+            graph_processor.switch(disabled_edge_id, enabled_edge_id)
+        switch = (time.perf_counter() - start) / len(switches)
+
+        start = time.perf_counter()
+        GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, graph_processor._edge_enabled, source_vertex_id)
+        rebuild = time.perf_counter() - start
+
+        print(f"{n:>10} {switch * 1e3:>12.3f} {rebuild * 1e3:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
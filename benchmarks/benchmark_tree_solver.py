@@ -0,0 +1,60 @@
+"""
+Benchmark of TreeSolver against LUSolver on the same system of a random radial network and of a
+path of feeders, whose depth is a tenth of its size: dense LUSolver for small networks and sparse
+LUSolver, with the default ordering, for all sizes.
+
+Run with `python benchmarks/benchmark_tree_solver.py`.
+"""
+
+import time
+
+import numpy as np
+from benchmark_graph_memory import random_radial_arrays
+
+from ees_scientific_software_engineering.graph_processing import GraphProcessor
+from ees_scientific_software_engineering.solvers import LUSolver, TreeSolver
+
+
+def feeder_arrays(n: int, n_feeders: int):
+    """Path-like network of n_feeders feeders of equal length from the source, as numpy arrays"""
+    children = np.arange(1, n)
+    parents = np.where(children <= n_feeders, 0, children - n_feeders)
+    edge_vertex_id_pairs = np.stack([parents, children], axis=1)
+    return np.arange(n), np.arange(n, 2 * n - 1), edge_vertex_id_pairs, np.ones(n - 1, dtype=bool), 0
+
+
+def timed(function, *args):
+    """Return the result of the function and the time it took"""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Print the factorization and solve times for increasing network sizes"""
+    rng = np.random.default_rng(0)
+    print(f"{'vertices':>10} {'depth':>6} {'solver':>8} {'factorize [s]':>14} {'solve [s]':>10} {'rel diff':>9}")
+    networks = [(n, random_radial_arrays(n, n // 10)) for n in [1000, 4000, 100_000, 1_000_000]]
+    networks += [(n, feeder_arrays(n, 10)) for n in [1000, 4000, 100_000]]
+    for n, arrays in networks:
+        graph_processor = GraphProcessor(*arrays)
+        edge_weights = rng.random(len(graph_processor.edge_ids)) + 0.5
+        b = rng.random(n)
+
+        tree_solver, factorize = timed(TreeSolver, graph_processor, edge_weights)
+        x, solve = timed(tree_solver.solve, b)
+        depth = graph_processor.tree.depth.max()
+        print(f"{n:>10} {depth:>6} {'tree':>8} {factorize:>14.3f} {solve:>10.4f} {'':>9}")
+
+        matrix = tree_solver.matrix()
+        solvers = [("sparse", matrix)] + ([("dense", matrix.toarray())] if n <= 4000 else [])
+        for name, system in solvers:
+            lu_solver, factorize = timed(LUSolver, system)
+            y, solve = timed(lu_solver.solve, b)
+            print(
+                f"{n:>10} {depth:>6} {name:>8} {factorize:>14.3f} {solve:>10.4f} {np.abs(x - y).max() / np.abs(y).max():>9.1e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Root mean square, graph processing and linear solvers for electrical networks.
+
+The submodules and the classes and functions in __all__ are attributes of the package, but they are
+imported on first access, with their dependencies such as NumPy and SciPy. Importing the package
+itself therefore costs next to nothing, and a process which only uses the rms module never imports
+SciPy. The rms function is rms.rms, as the package attribute rms is the module.
+"""
+
+from importlib import import_module
+
+# importing typing takes longer than the rest of the package, and mypy treats this as typing.TYPE_CHECKING
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # pragma: no cover
+    from . import (
+        factorization_cache,
+        graph_loading,
+        graph_processing,
+        graph_structures,
+        parallel,
+        rms,
+        simple_function,
+        solvers,
+    )
+    from .factorization_cache import FactorizationCache
+    from .graph_loading import UnsupportedFileFormatError
+    from .graph_processing import (
+        ContingencyTable,
+        EdgeAlreadyDisabledError,
+        EdgeAlreadyEnabledError,
+        GraphCycleError,
+        GraphNotFullyConnectedError,
+        GraphProcessor,
+        IDNotFoundError,
+        IDNotUniqueError,
+        InputLengthDoesNotMatchError,
+    )
+    from .parallel import thread_map
+    from .rms import RmsAccumulator, batched_rms, rolling_rms
+    from .simple_function import add, add_arrays, multiply, multiply_arrays
+    from .solvers import BatchLUSolver, LUSolver, TreeSolver
+
+_SUBMODULES = [
+    "factorization_cache",
+    "graph_loading",
+    "graph_processing",
+    "graph_structures",
+    "parallel",
+    "rms",
+    "simple_function",
+    "solvers",
+]
+
+# the module of every class and function of the package
+_ATTRIBUTE_MODULES = {
+    "FactorizationCache": "factorization_cache",
+    "UnsupportedFileFormatError": "graph_loading",
+    "ContingencyTable": "graph_processing",
+    "EdgeAlreadyDisabledError": "graph_processing",
+    "EdgeAlreadyEnabledError": "graph_processing",
+    "GraphCycleError": "graph_processing",
+    "GraphNotFullyConnectedError": "graph_processing",
+    "GraphProcessor": "graph_processing",
+    "IDNotFoundError": "graph_processing",
+    "IDNotUniqueError": "graph_processing",
+    "InputLengthDoesNotMatchError": "graph_processing",
+    "thread_map": "parallel",
+    "RmsAccumulator": "rms",
+    "batched_rms": "rms",
+    "rolling_rms": "rms",
+    "add": "simple_function",
+    "add_arrays": "simple_function",
+    "multiply": "simple_function",
+    "multiply_arrays": "simple_function",
+    "BatchLUSolver": "solvers",
+    "LUSolver": "solvers",
+    "TreeSolver": "solvers",
+}
+
+__all__ = _SUBMODULES + list(_ATTRIBUTE_MODULES)
+
+
+def __getattr__(name: str) -> object:
+    """Import the submodule, or the submodule of the class or function, on first access"""
+    if name in _SUBMODULES:
+        return import_module(f".{name}", __name__)
+
+    if name in _ATTRIBUTE_MODULES:
+        value = getattr(import_module(f".{_ATTRIBUTE_MODULES[name]}", __name__), name)
+        # later accesses find the attribute without calling __getattr__
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    """The attributes of the package, including the ones which are not imported yet"""
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,161 @@
+"""
+Cache of LUSolver factorizations, so that a matrix which is solved from several places is factorized once.
+
+Matrices are looked up by a hash of their content, dtype and shape, together with the arguments of
+LUSolver. The cache holds at most a given number of bytes of factorizations and evicts the least
+recently used ones beyond that.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Tuple
+
+import numpy as np
+import scipy
+
+from .solvers import LUSolver
+
+
+class CacheStatistics(NamedTuple):
+    """
+    Counters of a FactorizationCache.
+
+    Attributes:
+        hits: number of lookups which returned a cached factorization
+        misses: number of lookups which factorized the matrix
+        evictions: number of factorizations removed to stay within the byte budget
+        entries: number of cached factorizations
+        nbytes: number of bytes held by the cached factorizations, see LUSolver.nbytes
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    nbytes: int
+
+
+def matrix_key(matrix: np.ndarray | scipy.sparse.sparray | scipy.sparse.spmatrix) -> Tuple[Hashable, ...]:
+    """
+    Return a key which identifies the content of a dense or sparse matrix: its dtype, shape and a
+    SHA-256 hash of its values. Sparse matrices are hashed in canonical CSC form, so that
+    equal matrices in different sparse formats have the same key, but never the key of a dense matrix.
+
+    Args:
+        matrix: numpy array or scipy sparse matrix
+
+    Returns:
+        A hashable tuple.
+    """
+    digest = hashlib.sha256()
+    if scipy.sparse.issparse(matrix):
+        matrix = scipy.sparse.csc_array(matrix, copy=True)
+        matrix.sum_duplicates()
+        for array in (matrix.indptr, matrix.indices, matrix.data):
+            digest.update(np.ascontiguousarray(array).data)
+        return ("sparse", matrix.dtype.str, matrix.shape, digest.digest())
+
+    if not isinstance(matrix, np.ndarray):
+        raise TypeError("Argument should be a numpy array or a scipy sparse matrix!")
+
+    # Fortran ordered arrays are hashed as they are, with the order in the key, to avoid a copy
+    layout = "F" if matrix.flags.f_contiguous and not matrix.flags.c_contiguous else "C"
+    digest.update((matrix.T if layout == "F" else np.ascontiguousarray(matrix)).data)
+    return ("dense", layout, matrix.dtype.str, matrix.shape, digest.digest())
+
+
+class FactorizationCache:
+    """
+    Thread-safe LRU cache of LUSolver instances, bounded by the number of bytes they hold.
+
+    The cached solvers are shared by all callers that look up the same matrix, so they should only be
+    used to solve, which several threads may do at once; a solver that is changed with LUSolver.update
+    should be made with LUSolver directly.
+    """
+
+    def __init__(self, max_bytes: int = 1 << 30):
+        """
+        Constructor of the class.
+
+        Args:
+            max_bytes: budget of the bytes held by the cached factorizations. A factorization which
+                does not fit in the budget by itself is returned without caching it.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes should not be negative")
+
+        self._max_bytes = max_bytes
+        # the solvers by key with their size when they were added, in order of use
+        self._solvers: OrderedDict[Tuple[Hashable, ...], Tuple[LUSolver, int]] = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        """Budget of the bytes held by the cached factorizations"""
+        return self._max_bytes
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        """The current counters of the cache"""
+        with self._lock:
+            return CacheStatistics(self._hits, self._misses, self._evictions, len(self._solvers), self._nbytes)
+
+    def __len__(self) -> int:
+        return len(self._solvers)
+
+    def get(self, matrix: np.ndarray | scipy.sparse.sparray | scipy.sparse.spmatrix, **kwargs: Any) -> LUSolver:
+        """
+        Return the LUSolver of the matrix, from the cache if a matrix with the same content was
+        factorized with the same keyword arguments before.
+
+        The matrix is factorized outside the lock, so other threads can use the cache meanwhile. When
+        two threads miss on the same matrix at once, both factorize it and the first result is kept.
+
+        Args:
+            matrix: matrix to factorize, see LUSolver
+            **kwargs: keyword arguments of LUSolver, which are part of the key
+
+        Returns:
+            The LUSolver of the matrix.
+        """
+        key = matrix_key(matrix) + tuple(sorted(kwargs.items()))
+        with self._lock:
+            entry = self._solvers.get(key)
+            if entry is not None:
+                self._solvers.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        solver = LUSolver(matrix, **kwargs)
+        with self._lock:
+            entry = self._solvers.get(key)
+            if entry is not None:
+                return entry[0]
+            self._insert(key, solver)
+        return solver
+
+    def _insert(self, key: Tuple[Hashable, ...], solver: LUSolver) -> None:
+        """Add the solver and evict the least recently used ones beyond the budget, holding the lock"""
+        nbytes = solver.nbytes
+        if nbytes > self._max_bytes:
+            return
+
+        while self._nbytes + nbytes > self._max_bytes:
+            _, (_, evicted_nbytes) = self._solvers.popitem(last=False)
+            self._nbytes -= evicted_nbytes
+            self._evictions += 1
+
+        self._solvers[key] = (solver, nbytes)
+        self._nbytes += nbytes
+
+    def clear(self) -> None:
+        """Remove all cached factorizations, keeping the counters"""
+        with self._lock:
+            self._solvers.clear()
+            self._nbytes = 0
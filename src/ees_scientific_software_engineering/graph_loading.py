@@ -0,0 +1,150 @@
+"""
+Chunked readers of vertex and edge tables for GraphProcessor.from_chunks.
+
+Vertex tables have a column "id", edge tables the columns "id", "from_vertex_id", "to_vertex_id" and "enabled".
+They are read from CSV files with a header row or from JSON-lines files with one object per line,
+a fixed number of records at a time, so that only one chunk is held in memory as Python objects.
+"""
+
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence
+
+import numpy as np
+
+VERTEX_COLUMNS = ["id"]
+EDGE_COLUMNS = ["id", "from_vertex_id", "to_vertex_id", "enabled"]
+
+
+class EdgeChunk(NamedTuple):
+    """A chunk of an edge table, with the same meaning as the edge arguments of GraphProcessor"""
+
+    edge_ids: np.ndarray
+    edge_vertex_id_pairs: np.ndarray
+    edge_enabled: np.ndarray
+
+
+class UnsupportedFileFormatError(Exception):
+    """Exception
+
+    Args:
+        Exception: more detailed description
+    """
+
+
+def count_records(path: str | Path) -> int:
+    """
+    Count the records in a CSV or JSON-lines file without parsing them.
+
+    Args:
+        path: path of the file
+
+    Returns:
+        The number of non-empty lines, excluding the header row of a CSV file.
+    """
+    file_format = _file_format(path)
+    with open(path, "rb") as file:
+        n_lines = sum(1 for line in file if line.strip())
+    return n_lines - 1 if file_format == "csv" and n_lines > 0 else n_lines
+
+
+def read_vertex_chunks(path: str | Path, chunk_size: int) -> Iterator[np.ndarray]:
+    """
+    Read the vertex ids of a vertex table in chunks.
+
+    Args:
+        path: path of a CSV or JSON-lines file
+        chunk_size: maximum number of records per chunk
+
+    Returns:
+        An iterator of int64 arrays of vertex ids.
+    """
+    for columns in _read_column_chunks(path, VERTEX_COLUMNS, chunk_size):
+        yield np.array(columns["id"], dtype=np.int64)
+
+
+def read_edge_chunks(path: str | Path, chunk_size: int) -> Iterator[EdgeChunk]:
+    """
+    Read an edge table in chunks.
+
+    The enabled column holds booleans, either true/false (in any case) or 1/0.
+
+    Args:
+        path: path of a CSV or JSON-lines file
+        chunk_size: maximum number of records per chunk
+
+    Returns:
+        An iterator of edge chunks.
+    """
+    for columns in _read_column_chunks(path, EDGE_COLUMNS, chunk_size):
+        yield EdgeChunk(
+            np.array(columns["id"], dtype=np.int64),
+            np.array([columns["from_vertex_id"], columns["to_vertex_id"]], dtype=np.int64).T,
+            np.array([_parse_bool(value) for value in columns["enabled"]], dtype=bool),
+        )
+
+
+def _file_format(path: str | Path) -> str:
+    """Return "csv" or "jsonl" from the suffix of the path"""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise UnsupportedFileFormatError(f"File format {suffix} is not supported, use .csv, .jsonl or .ndjson")
+
+
+def _read_column_chunks(path: str | Path, columns: List[str], chunk_size: int) -> Iterator[Dict[str, Sequence[Any]]]:
+    """Read chunks of at most chunk_size records and return each as sequences of values per column"""
+    if chunk_size < 1:
+        raise ValueError("chunk_size should be at least 1")
+
+    if _file_format(path) == "csv":
+        yield from _read_csv_column_chunks(path, columns, chunk_size)
+        return
+
+    with open(path, encoding="utf-8") as file:
+        records = (json.loads(line) for line in file if line.strip())
+        while chunk := list(islice(records, chunk_size)):
+            try:
+                values: Dict[str, Sequence[Any]] = {column: [record[column] for record in chunk] for column in columns}
+            except KeyError as error:
+                raise KeyError(f"Column {error} is missing in {path}") from error
+            yield values
+
+
+def _read_csv_column_chunks(
+    path: str | Path, columns: List[str], chunk_size: int
+) -> Iterator[Dict[str, Sequence[Any]]]:
+    """Read a CSV file in chunks, locating the columns by the header row; raise if a row has another number of fields"""
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        # the line number of every row, which is its last line if a quoted field spans several lines
+        rows = ((reader.line_num, row) for row in reader if row)
+        _, header = next(rows, (0, []))
+        if not header:
+            return
+        missing = [column for column in columns if column not in header]
+        if missing:
+            raise KeyError(f"Column {missing[0]!r} is missing in {path}")
+
+        while chunk := list(islice(rows, chunk_size)):
+            for line, row in chunk:
+                if len(row) != len(header):
+                    raise ValueError(f"Line {line} of {path} has {len(row)} fields instead of {len(header)}")
+            values = list(zip(*(row for _, row in chunk)))
+            yield {column: values[header.index(column)] for column in columns}
+
+
+def _parse_bool(value: Any) -> bool:
+    """Parse a boolean from JSON or from the text of a CSV field"""
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ("true", "1"):
+            return True
+        if value in ("false", "0"):
+            return False
+        raise ValueError(f"Cannot interpret {value!r} as a boolean")
+    return bool(value)
@@ -2,9 +2,17 @@
 This is for the graph processing assignment
 """
 
-from typing import List, Tuple
+import json
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Literal, NamedTuple, Tuple
 
-import networkx as nx
+import numpy as np
+
+from .graph_loading import EdgeChunk, count_records, read_edge_chunks, read_vertex_chunks
+from .graph_structures import CsrAdjacency, IdMapping, RootedTreeIndex, first_cycle_edge
 
 
 class IDNotFoundError(Exception):
@@ -55,6 +63,198 @@ class EdgeAlreadyDisabledError(Exception):
     """
 
 
+class EdgeAlreadyEnabledError(Exception):
+    """Exception
+
+    Args:
+        Exception: more detailed description
+    """
+
+
+class ContingencyTable(NamedTuple):
+    """
+    Result of the N-1 contingency analysis of all enabled edges, in compact CSR format.
+
+    Row k belongs to the enabled edge edge_ids[k]. Its downstream vertices are
+    downstream_vertex_ids[downstream_offsets[k]:downstream_offsets[k + 1]] (sorted) and its
+    alternative edges are alternative_edge_ids[alternative_offsets[k]:alternative_offsets[k + 1]].
+
+    Attributes:
+        edge_ids: ids of the enabled edges, one per row
+        downstream_offsets: row offsets into downstream_vertex_ids, of length len(edge_ids) + 1
+        downstream_vertex_ids: concatenated downstream vertex ids of all rows
+        alternative_offsets: row offsets into alternative_edge_ids, of length len(edge_ids) + 1
+        alternative_edge_ids: concatenated alternative edge ids of all rows
+    """
+
+    edge_ids: np.ndarray
+    downstream_offsets: np.ndarray
+    downstream_vertex_ids: np.ndarray
+    alternative_offsets: np.ndarray
+    alternative_edge_ids: np.ndarray
+
+
+def _downstream_chunk(
+    tree: RootedTreeIndex, vertex_ids: np.ndarray, vertices: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the subtree sizes and the per-subtree sorted member ids of vertices, to run in a worker"""
+    sizes, members = tree.subtrees(vertices)
+    rows = np.repeat(np.arange(len(vertices)), sizes)
+    member_ids = vertex_ids[members]
+    return sizes, member_ids[np.lexsort((member_ids, rows))]
+
+
+def _alternative_chunk(tree: RootedTreeIndex, edge_vertices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the tree edges which each of the (disabled) edges can replace, to run in a worker"""
+    return tree.path_edges(edge_vertices[:, 0], edge_vertices[:, 1])
+
+
+class _TreeGroups(NamedTuple):
+    """
+    Split of the pre-order of a forest into groups of whole trees of about equal size, to hand out to workers.
+
+    Attributes:
+        boundaries: boundaries of the groups in the pre-order, from 0 up to the number of vertices
+        trees: restricted tree index of every group, see RootedTreeIndex.restrict
+        vertex_ids: vertex ids of the vertices of every restricted tree index
+        n_workers: number of workers
+    """
+
+    boundaries: np.ndarray
+    trees: List[RootedTreeIndex]
+    vertex_ids: List[np.ndarray]
+    n_workers: int
+
+    def tasks(self, vertices: np.ndarray) -> List[Tuple[int, np.ndarray]]:
+        """
+        Assign items to the group containing their vertex, and split the items of every group into tasks
+        in proportion to the size of the group, so that a single large tree is still split over all workers.
+
+        Args:
+            vertices: pre-order position of the vertex of every item
+
+        Returns:
+            The group and the indices of the items of every task.
+        """
+        groups = np.searchsorted(self.boundaries, vertices, side="right") - 1
+        counts = np.bincount(groups, minlength=len(self.trees))
+        items = np.split(np.argsort(groups, kind="stable"), np.cumsum(counts)[:-1])
+        tasks = []
+        for group, group_items in enumerate(items):
+            group_size = self.boundaries[group + 1] - self.boundaries[group]
+            n_tasks = max(1, round(group_size * self.n_workers / self.boundaries[-1]))
+            tasks += [(group, task_items) for task_items in np.array_split(group_items, n_tasks)]
+        return tasks
+
+
+def _tree_groups(tree: RootedTreeIndex, vertex_ids: np.ndarray, n_workers: int) -> _TreeGroups:
+    """Split the forest of tree into at most n_workers groups of whole trees"""
+    n_vertices = len(tree.order)
+    tree_starts = np.append(tree.tree_starts(), n_vertices)
+    targets = np.arange(1, n_workers) * n_vertices / n_workers
+    boundaries = np.unique(np.concatenate([[0], tree_starts[np.searchsorted(tree_starts, targets)], [n_vertices]]))
+    ranges = list(zip(boundaries[:-1].tolist(), boundaries[1:].tolist()))
+    return _TreeGroups(
+        boundaries,
+        [tree.restrict(start, end) for start, end in ranges],
+        [vertex_ids[tree.order[start:end]] for start, end in ranges],
+        n_workers,
+    )
+
+
+def _rows_in_order(
+    n_rows: int, task_rows: np.ndarray, sizes: np.ndarray, values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Put the CSR rows computed per task back in the original row order.
+
+    Args:
+        n_rows: number of rows
+        task_rows: original row of every computed row, in the order of the tasks
+        sizes: size of every computed row
+        values: concatenated values of the computed rows
+
+    Returns:
+        The row offsets and the concatenated values in the original row order.
+    """
+    row_sizes = np.empty(n_rows, dtype=np.int64)
+    row_sizes[task_rows] = sizes
+    starts = np.empty(n_rows, dtype=np.int64)
+    starts[task_rows] = _offsets(sizes)[:-1]
+    offsets = _offsets(row_sizes)
+    return offsets, values[np.arange(offsets[-1]) + np.repeat(starts - offsets[:-1], row_sizes)]
+
+
+@contextmanager
+def _worker_map(n_workers: int) -> Iterator[Callable[..., Iterator[Any]]]:
+    """Provide a map function which runs in this process for 1 worker, or in a process pool otherwise"""
+    if n_workers == 1:
+        yield map
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        yield pool.map
+
+
+def _offsets(counts: np.ndarray) -> np.ndarray:
+    """Turn row counts into CSR row offsets"""
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _stream_vertex_ids(vertex_chunks: Iterable[np.ndarray], n_vertices: int) -> np.ndarray:
+    """Copy the vertex chunks into one preallocated array, checking the total length"""
+    vertex_ids = np.empty(n_vertices, dtype=np.int64)
+    n_read = 0
+    for chunk in vertex_chunks:
+        chunk = np.asarray(chunk).reshape(-1)
+        if n_read + len(chunk) > n_vertices:
+            raise InputLengthDoesNotMatchError(f"vertex_chunks contain more than {n_vertices} vertices")
+        vertex_ids[n_read : n_read + len(chunk)] = chunk
+        n_read += len(chunk)
+    if n_read != n_vertices:
+        raise InputLengthDoesNotMatchError(f"vertex_chunks contain {n_read} vertices instead of {n_vertices}")
+    return vertex_ids
+
+
+def _stream_edges(
+    vertex_index: IdMapping, edge_chunks: Iterable[Tuple[np.ndarray, np.ndarray, np.ndarray]], n_edges: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Copy the edge chunks into preallocated arrays, translating the vertex ids to positions chunk by chunk.
+
+    Returns:
+        The edge ids, the edge vertex positions of shape (n_edges, 2) and the enabled flags.
+    """
+    edge_ids = np.empty(n_edges, dtype=np.int64)
+    edge_vertices = np.empty((n_edges, 2), dtype=np.int64)
+    edge_enabled = np.empty(n_edges, dtype=bool)
+    n_read = 0
+    for chunk_ids, chunk_pairs, chunk_enabled in edge_chunks:
+        chunk_pairs = np.asarray(chunk_pairs).reshape(-1, 2)
+        if not len(chunk_ids) == len(chunk_pairs) == len(chunk_enabled):
+            raise InputLengthDoesNotMatchError("Edge chunk columns do not have the same length")
+        if n_read + len(chunk_ids) > n_edges:
+            raise InputLengthDoesNotMatchError(f"edge_chunks contain more than {n_edges} edges")
+
+        chunk_vertices, found = vertex_index.indices(chunk_pairs)
+        if not found.all():
+            missing = np.unique(chunk_pairs[~found]).tolist()
+            raise IDNotFoundError(f"Vertex ids in edge_vertex_id_pairs not found in vertex_ids: {missing}")
+
+        rows = slice(n_read, n_read + len(chunk_ids))
+        edge_ids[rows], edge_vertices[rows], edge_enabled[rows] = chunk_ids, chunk_vertices, chunk_enabled
+        n_read += len(chunk_ids)
+    if n_read != n_edges:
+        raise InputLengthDoesNotMatchError(f"edge_chunks contain {n_read} edges instead of {n_edges}")
+    return edge_ids, edge_vertices, edge_enabled
+
+
+SNAPSHOT_VERSION = 2
+
+
+# pylint: disable=too-many-instance-attributes
 class GraphProcessor:
     """
     A Graph Processor to check the graph validity, find downstream vertices and find alternative edges
@@ -63,66 +263,226 @@ class GraphProcessor:
     # pylint: disable=too-many-arguments,too-many-positional-arguments
     def __init__(
         self,
-        vertex_ids: List[int],
-        edge_ids: List[int],
-        edge_vertex_id_pairs: List[Tuple[int, int]],
-        edge_enabled: List[bool],
-        source_vertex_id: int,
+        vertex_ids: List[int] | np.ndarray,
+        edge_ids: List[int] | np.ndarray,
+        edge_vertex_id_pairs: List[Tuple[int, int]] | np.ndarray,
+        edge_enabled: List[bool] | np.ndarray,
+        source_vertex_id: int | List[int] | np.ndarray,
     ) -> None:
         """
         Initialize a graph processor object with an undirected graph.
         Only the edges which are enabled are taken into account.
         Check if the input is valid and raise exceptions if not.
 
+        The graph is stored in NumPy arrays: a CSR adjacency of all edges, the enabled flags
+        and the rooted tree index of the enabled edges. The input can be given as lists or
+        directly as arrays, with edge_vertex_id_pairs of shape (n_edges, 2).
+
+        For a network of independent radial feeders, give the list of their sources instead of
+        a single source vertex. The enabled edges then have to form a forest in which every tree
+        contains exactly one source, and all analyses work per feeder: the tree of every feeder
+        is indexed separately as a contiguous range of the pre-order.
+
         Args:
             vertex_ids: list of vertex ids
             edge_ids: list of edge ids
             edge_vertex_id_pairs: list of tuples of two integer
                 Each tuple is a vertex id pair of the edge.
             edge_enabled: list of bools indicating of an edge is enabled or not
-            source_vertex_id: vertex id of the source in the graph
+            source_vertex_id: vertex id of the source in the graph, or a list of the source vertex ids of all feeders
         """
-        if len(vertex_ids) > len(set(vertex_ids)):
+        vertex_ids = np.asarray(vertex_ids)
+        edge_ids = np.asarray(edge_ids)
+        edge_vertex_id_pairs = np.asarray(edge_vertex_id_pairs).reshape(-1, 2)
+
+        self._vertex_index = IdMapping.from_ids(vertex_ids)
+        if self._vertex_index.has_duplicates():
             raise IDNotUniqueError("Not all vertex_ids are unique")
 
-        if len(edge_ids) > len(set(edge_ids)):
+        self._edge_index = IdMapping.from_ids(edge_ids)
+        if self._edge_index.has_duplicates():
             raise IDNotUniqueError("Not all edge_ids are unique")
 
         if len(edge_ids) != len(edge_vertex_id_pairs):
             raise InputLengthDoesNotMatchError("edge_ids should be the same length as edge_vertex_id_pairs")
 
-        edge_vertex_ids_1, edge_vertex_ids_2 = zip(*edge_vertex_id_pairs)
-        edge_vertex_ids_all = edge_vertex_ids_1 + edge_vertex_ids_2
-        if not set(edge_vertex_ids_all).issubset(vertex_ids):
+        edge_vertices, found = self._vertex_index.indices(edge_vertex_id_pairs)
+        if not found.all():
             raise IDNotFoundError("One of values in edge_vertex_id_pairs not found in vertex_ids")
 
         if len(edge_ids) != len(edge_enabled):
             raise InputLengthDoesNotMatchError("edge_ids should be the same length as edge_enabled")
 
-        if source_vertex_id not in vertex_ids:
-            raise IDNotFoundError("source_vertex_id not found in vertex_ids")
+        sources = self._source_positions(source_vertex_id)
+        self._set_graph(edge_vertices, np.array(edge_enabled, dtype=bool), sources)
 
-        network = nx.Graph()
-        network.add_nodes_from(vertex_ids)
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    @classmethod
+    def from_chunks(
+        cls,
+        vertex_chunks: Iterable[np.ndarray],
+        n_vertices: int,
+        edge_chunks: Iterable[EdgeChunk | Tuple[np.ndarray, np.ndarray, np.ndarray]],
+        n_edges: int,
+        source_vertex_id: int | List[int] | np.ndarray,
+    ) -> "GraphProcessor":
+        """
+        Initialize a graph processor from vertex and edge tables given in chunks.
 
-        for i, vertex_pair in enumerate(edge_vertex_id_pairs):
-            if not edge_enabled[i]:
-                continue
+        The chunks are copied into arrays allocated once for n_vertices and n_edges, so the
+        peak memory is the final arrays plus one chunk. All vertex chunks are read first;
+        every edge chunk is then checked against the vertex ids as it arrives.
+        The validation and the exceptions are the same as in the constructor.
 
-            network.add_edge(vertex_pair[0], vertex_pair[1], id=edge_ids[i])
+        Args:
+            vertex_chunks: iterable of arrays of vertex ids
+            n_vertices: total number of vertices in all vertex chunks
+            edge_chunks: iterable of edge chunks, or tuples of edge ids, vertex id pairs and enabled flags
+            n_edges: total number of edges in all edge chunks
+            source_vertex_id: vertex id of the source in the graph, or a list of the source vertex ids of all feeders
 
-        if not nx.is_connected(network):
-            raise GraphNotFullyConnectedError()
+        Returns:
+            The graph processor.
+        """
+        graph_processor = cls.__new__(cls)
+        graph_processor._vertex_index = IdMapping.from_ids(_stream_vertex_ids(vertex_chunks, n_vertices))
+        if graph_processor._vertex_index.has_duplicates():
+            raise IDNotUniqueError("Not all vertex_ids are unique")
 
-        if len(list(nx.simple_cycles(network))) > 0:
-            raise GraphCycleError()
+        edge_ids, edge_vertices, edge_enabled = _stream_edges(graph_processor._vertex_index, edge_chunks, n_edges)
+        graph_processor._edge_index = IdMapping.from_ids(edge_ids)
+        if graph_processor._edge_index.has_duplicates():
+            raise IDNotUniqueError("Not all edge_ids are unique")
 
-        self._network = network
+        sources = graph_processor._source_positions(source_vertex_id)
+        graph_processor._set_graph(edge_vertices, edge_enabled, sources)
+        return graph_processor
+
+    @classmethod
+    def from_files(
+        cls,
+        vertex_path: str | Path,
+        edge_path: str | Path,
+        source_vertex_id: int | List[int] | np.ndarray,
+        chunk_size: int = 100_000,
+    ) -> "GraphProcessor":
+        """
+        Initialize a graph processor from a vertex and an edge table in CSV or JSON-lines files.
+
+        The files are read twice: once to count the records and once in chunks of chunk_size
+        records, see from_chunks and the graph_loading module for the file layout.
+
+        Args:
+            vertex_path: path of the vertex table
+            edge_path: path of the edge table
+            source_vertex_id: vertex id of the source in the graph, or a list of the source vertex ids of all feeders
+            chunk_size: number of records read at a time
 
-        self._edge_ids = edge_ids
+        Returns:
+            The graph processor.
+        """
+        return cls.from_chunks(
+            read_vertex_chunks(vertex_path, chunk_size),
+            count_records(vertex_path),
+            read_edge_chunks(edge_path, chunk_size),
+            count_records(edge_path),
+            source_vertex_id,
+        )
+
+    def _source_positions(self, source_vertex_id: int | List[int] | np.ndarray) -> np.ndarray:
+        """Return the positions of one or more unique source vertex ids, raise if they do not exist"""
+        source_vertex_ids = np.asarray(source_vertex_id)
+        sources, found = self._vertex_index.indices(source_vertex_ids.reshape(-1))
+        if source_vertex_ids.ndim == 0 and not found[0]:
+            raise IDNotFoundError("source_vertex_id not found in vertex_ids")
+        if not found.all():
+            raise IDNotFoundError(f"Source vertex ids not found in vertex_ids: {source_vertex_ids[~found].tolist()}")
+        if len(sources) == 0:
+            raise IDNotFoundError("No source vertex ids given")
+        if IdMapping.from_ids(sources).has_duplicates():
+            raise IDNotUniqueError("Not all source vertex ids are unique")
+        return sources
+
+    def _set_graph(self, edge_vertices: np.ndarray, edge_enabled: np.ndarray, sources: np.ndarray) -> None:
+        """Build the adjacency and the tree index once the id mappings are set and the input is checked"""
+        self._vertex_ids = self._vertex_index.ids
+        self._edge_ids = self._edge_index.ids
+        self._edge_vertices = edge_vertices
         self._edge_enabled = edge_enabled
-        self._edge_vertex_id_pairs = edge_vertex_id_pairs
-        self._source_vertex_id = source_vertex_id
+        self._adjacency = CsrAdjacency.from_edges(len(self._vertex_ids), edge_vertices)
+        self._sources = sources
+        self._tree = self._build_tree(sources)
+        self._disabled_edge_cache: np.ndarray | None = None
+
+    def _build_tree(self, sources: np.ndarray) -> RootedTreeIndex:
+        """
+        Check that the enabled edges form a single tree spanning all vertices and index it, in O(V log(V) + E).
+        With several sources, check that they form a forest of one tree per source instead.
+
+        Connectivity takes precedence over cycles: a graph which is both disconnected and cyclic
+        raises GraphNotFullyConnectedError. A parallel edge or a self-loop counts as a cycle,
+        and so does a path between two sources.
+
+        Args:
+            sources: positions of the source vertices
+
+        Raises:
+            GraphNotFullyConnectedError: if not all vertices are connected to a source vertex
+            GraphCycleError: if the enabled edges contain a cycle, reporting the first edge closing it
+        """
+        n_vertices = len(self._vertex_ids)
+        n_trees = len(sources)
+        n_enabled = np.count_nonzero(self._edge_enabled)
+        if n_enabled < n_vertices - n_trees:
+            # too few edges to span all vertices, no need to look at them
+            raise GraphNotFullyConnectedError(f"{n_enabled} enabled edges cannot connect {n_vertices} vertices")
+
+        order, parent, parent_edge = self._adjacency.spanning_tree(self._edge_enabled, sources)
+        if len(order) < n_vertices:
+            reached = np.zeros(n_vertices, dtype=bool)
+            reached[order] = True
+            source_text = f"source vertex {self._vertex_ids[sources[0]]}" if n_trees == 1 else "any source vertex"
+            raise GraphNotFullyConnectedError(
+                f"Vertex {self._vertex_ids[np.argmin(reached)]} is not connected to {source_text}"
+            )
+
+        connected_sources = sources[parent[sources] >= 0]
+        if len(connected_sources) > 0:
+            raise GraphCycleError(
+                f"Source vertex {self._vertex_ids[connected_sources[0]]} is connected to another source"
+            )
+
+        if n_enabled > n_vertices - n_trees:
+            # every vertex is connected to exactly one source with more than V-1 edges per tree
+            i = first_cycle_edge(n_vertices, self._edge_vertices, self._edge_enabled)
+            raise GraphCycleError(f"Edge {self._edge_ids[i]} closes a cycle")
+
+        return RootedTreeIndex.from_dfs(order, parent, parent_edge)
+
+    @property
+    def vertex_ids(self) -> np.ndarray:
+        """The vertex ids in the order they were given, which is the order of the vertex positions"""
+        return self._vertex_ids
+
+    @property
+    def edge_ids(self) -> np.ndarray:
+        """The edge ids in the order they were given, which is the order of the edge positions"""
+        return self._edge_ids
+
+    @property
+    def tree(self) -> RootedTreeIndex:
+        """
+        The rooted tree index of the enabled edges in vertex and edge positions, rooted at the source
+        vertex, or a forest rooted at the source vertices. It changes in place when edges are switched.
+        """
+        return self._tree
+
+    @property
+    def _disabled_edges(self) -> np.ndarray:
+        """The sorted positions of the disabled edges, kept until the next switch so that a switch stays O(1) in them"""
+        if self._disabled_edge_cache is None:
+            self._disabled_edge_cache = np.flatnonzero(~self._edge_enabled)
+        return self._disabled_edge_cache
 
     def find_downstream_vertices(self, edge_id: int) -> List[int]:
         """
@@ -143,10 +503,8 @@ class GraphProcessor:
         Call find_downstream_vertices with edge_id=3 will return [4]
 
         Steps:
-        1. shortest path from one of the vertices to source vertex
-        2. find downstream vertex of given edge
-        3. disconnect edge
-        4. find nodes left in subnetwork
+        1. find downstream vertex of given edge, the endpoint whose parent edge it is
+        2. take the subtree of the downstream vertex from the pre-order of the tree index
 
         Args:
             edge_id: edge id to be searched
@@ -155,24 +513,12 @@ class GraphProcessor:
             A list of all downstream vertices.
         """
 
-        if edge_id not in self._edge_ids:
-            raise IDNotFoundError("edge_id not found in edge_ids")
-
-        i = self._edge_ids.index(edge_id)
+        i = self._edge_position(edge_id, "edge_id not found in edge_ids")
 
         if not self._edge_enabled[i]:
             return []
 
-        vertices = self._edge_vertex_id_pairs[i]
-
-        path = nx.shortest_path(self._network, self._source_vertex_id, vertices[1])
-
-        downstream_vertex = vertices[1] if vertices[0] in path else vertices[0]
-
-        network_sub = self._network.copy()
-        network_sub.remove_edge(vertices[0], vertices[1])
-
-        return sorted(nx.descendants(network_sub, downstream_vertex) | {downstream_vertex})
+        return np.sort(self._vertex_ids[self._tree.subtree(self._downstream_vertex(i))]).tolist()
 
     def find_alternative_edges(self, disabled_edge_id: int) -> List[int]:
         """
@@ -209,29 +555,356 @@ class GraphProcessor:
         Returns:
             A list of alternative edge ids.
         """
-        if disabled_edge_id not in self._edge_ids:
-            raise IDNotFoundError("disabled_edge_id not found in edge_ids")
-
-        i = self._edge_ids.index(disabled_edge_id)
+        i = self._edge_position(disabled_edge_id, "disabled_edge_id not found in edge_ids")
         if not self._edge_enabled[i]:
             raise EdgeAlreadyDisabledError
 
-        network = self._network.copy()
+        # a disabled edge reconnects the cut-off subtree exactly when one of its endpoints is inside of it
+        alternative_vertices = self._edge_vertices[self._disabled_edges]
+        downstream_vertex = self._downstream_vertex(i)
+        inside_1 = self._tree.in_subtree(downstream_vertex, alternative_vertices[:, 0])
+        inside_2 = self._tree.in_subtree(downstream_vertex, alternative_vertices[:, 1])
+
+        return self._edge_ids[self._disabled_edges[inside_1 != inside_2]].tolist()
+
+    def find_contingencies(self, edge_ids: np.ndarray | None = None, n_workers: int = 1) -> ContingencyTable:
+        """
+        Do the analysis of find_downstream_vertices and find_alternative_edges for many enabled edges at once.
+
+        The downstream vertices of an edge are the subtree of its downstream vertex, and a disabled edge
+        is an alternative for exactly the enabled edges on the tree path between its endpoints.
+        Both are computed with vectorized operations over all edges, in time proportional to the output.
+
+        For example, for the graph of find_alternative_edges the row of edge 3 has
+        downstream vertex ids [4, 6] and alternative edge ids [7, 8].
+
+        Args:
+            edge_ids: array of unique ids of enabled edges to analyse, all enabled edges if None
+            n_workers: number of processes to split the work over, 1 to run in this process
+
+        Returns:
+            The contingency table with a row for every edge, in the order of edge_ids.
+
+        Raises:
+            ValueError: if n_workers is not a positive integer
+            IDNotFoundError: if edges do not exist, reporting all of them
+            IDNotUniqueError: if not all edge_ids are unique
+            EdgeAlreadyDisabledError: if edges are disabled, reporting all of them
+        """
+        if not isinstance(n_workers, (int, np.integer)) or isinstance(n_workers, bool) or n_workers < 1:
+            raise ValueError("Argument n_workers should be a positive integer!")
+
+        if edge_ids is None:
+            enabled_edges = np.flatnonzero(self._edge_enabled)
+        else:
+            enabled_edges = self._enabled_edge_positions(np.asarray(edge_ids))
+
+        groups = _tree_groups(self._tree, self._vertex_ids, n_workers)
+        with _worker_map(n_workers) as worker_map:
+            downstream_offsets, downstream_vertex_ids = self._bulk_downstream_vertices(
+                enabled_edges, groups, worker_map
+            )
+            alternative_offsets, alternative_edges = self._bulk_alternative_edges(enabled_edges, groups, worker_map)
+
+        return ContingencyTable(
+            edge_ids=self._edge_ids[enabled_edges],
+            downstream_offsets=downstream_offsets,
+            downstream_vertex_ids=downstream_vertex_ids,
+            alternative_offsets=alternative_offsets,
+            alternative_edge_ids=self._edge_ids[alternative_edges],
+        )
+
+    def _bulk_downstream_vertices(
+        self, enabled_edges: np.ndarray, groups: "_TreeGroups", worker_map: Callable[..., Iterator[Any]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the CSR rows of sorted downstream vertex ids of the enabled edges, computed per group of trees"""
+        # in the restricted indexes a vertex is its pre-order position minus the start of its group
+        vertices = self._tree.entry[self._downstream_vertices(enabled_edges)]
+        tasks = groups.tasks(vertices)
+        parts = list(
+            worker_map(
+                _downstream_chunk,
+                [groups.trees[group] for group, _ in tasks],
+                [groups.vertex_ids[group] for group, _ in tasks],
+                [vertices[rows] - groups.boundaries[group] for group, rows in tasks],
+            )
+        )
+        return _rows_in_order(
+            len(enabled_edges),
+            np.concatenate([rows for _, rows in tasks], dtype=np.int64),
+            np.concatenate([sizes for sizes, _ in parts], dtype=np.int64),
+            np.concatenate([ids for _, ids in parts], dtype=self._vertex_ids.dtype),
+        )
+
+    def _bulk_alternative_edges(
+        self, enabled_edges: np.ndarray, groups: "_TreeGroups", worker_map: Callable[..., Iterator[Any]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the CSR rows of sorted alternative edge positions of the enabled edges, computed per group of trees"""
+        pair_vertices, pair_edges = self._alternative_pairs()
+        tasks = groups.tasks(pair_vertices[:, 0])
+        parts = list(
+            worker_map(
+                _alternative_chunk,
+                [groups.trees[group] for group, _ in tasks],
+                [pair_vertices[pairs] - groups.boundaries[group] for group, pairs in tasks],
+            )
+        )
+
+        row_of_edge = np.full(len(self._edge_ids), -1, dtype=np.int64)
+        row_of_edge[enabled_edges] = np.arange(len(enabled_edges))
+        rows = row_of_edge[np.concatenate([edges for edges, _ in parts], dtype=np.int64)]
+        alternatives = np.concatenate(
+            [pair_edges[pairs][part_pairs] for (_, pairs), (_, part_pairs) in zip(tasks, parts)], dtype=np.int64
+        )
+        rows, alternatives = rows[rows >= 0], alternatives[rows >= 0]
+        sort_order = np.lexsort((alternatives, rows))
+        return _offsets(np.bincount(rows, minlength=len(enabled_edges))), alternatives[sort_order]
+
+    def _alternative_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return pairs of vertices, as pre-order positions, whose tree path a disabled edge can replace.
+
+        Within a tree that is the path between the endpoints of the disabled edge. An edge between
+        two trees of a forest replaces the paths from both endpoints up to their roots instead.
+
+        Returns:
+            The (n_pairs, 2) array of pairs, both in the same tree, and the disabled edge of every pair.
+        """
+        vertices = self._tree.entry[self._edge_vertices[self._disabled_edges]].reshape(-1, 2)
+        tree_starts = self._tree.tree_starts()
+        roots = tree_starts[np.searchsorted(tree_starts, vertices, side="right") - 1]
+        between = roots[:, 0] != roots[:, 1]
+        first = np.concatenate([vertices[:, 0], vertices[between, 1]])
+        second = np.concatenate([np.where(between, roots[:, 0], vertices[:, 1]), roots[between, 1]])
+        return np.stack([first, second], axis=1), np.concatenate([self._disabled_edges, self._disabled_edges[between]])
+
+    def save(self, path: str | Path) -> None:
+        """
+        Save the processor with all its indexes as a snapshot in the directory path.
+
+        The snapshot holds one .npy file per array and a JSON header with the format version
+        and a CRC32 checksum of all array data.
+
+        Args:
+            path: directory to write the snapshot to, it is created if it does not exist
+        """
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
 
-        vertices = self._edge_vertex_id_pairs[i]
-        network.remove_edge(vertices[0], vertices[1])  # disconnect
+        checksum = 0
+        arrays = self._arrays()
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            np.save(directory / f"{name}.npy", array)
+            checksum = zlib.crc32(array.data, checksum)
 
-        all_alternatives_i = [i for i, x in enumerate(self._edge_enabled) if not x]
+        header = {"version": SNAPSHOT_VERSION, "checksum": checksum, "arrays": list(arrays)}
+        (directory / "header.json").write_text(json.dumps(header, indent=2), encoding="utf-8")
 
-        good_alternatives = []
-        for alternative_i in all_alternatives_i:
-            alternative_vertices = self._edge_vertex_id_pairs[alternative_i]
-            network.add_edge(alternative_vertices[0], alternative_vertices[1])
+    @classmethod
+    def load(cls, path: str | Path, mmap_mode: Literal["r", "c"] | None = "c") -> "GraphProcessor":
+        """
+        Load a processor from a snapshot written by save.
 
-            if nx.is_connected(network) & (len(list(nx.simple_cycles(network))) == 0):
-                # all connected and not cyclic
-                good_alternatives.append(self._edge_ids[alternative_i])
+        The arrays are memory-mapped, so processes loading the same snapshot share the memory
+        and loading takes no time in proportion to the size apart from the checksum.
+        If the checksum matches, the graph is not validated again; otherwise the processor is
+        built again from the vertices and edges in the snapshot, which validates them.
 
-            network.remove_edge(alternative_vertices[0], alternative_vertices[1])
+        Args:
+            path: directory of the snapshot
+            mmap_mode: "c" to map copy-on-write so switching is possible, "r" to map read-only
+                or None to read the arrays into memory
 
-        return good_alternatives
+        Returns:
+            The loaded graph processor.
+        """
+        directory = Path(path)
+        header = json.loads((directory / "header.json").read_text(encoding="utf-8"))
+        if header["version"] != SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot version {header['version']} is not supported, expected {SNAPSHOT_VERSION}")
+
+        checksum = 0
+        arrays = {}
+        for name in header["arrays"]:
+            arrays[name] = np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+            checksum = zlib.crc32(arrays[name].data, checksum)
+
+        vertex_ids = arrays["vertex_index.ids"]
+        if checksum != header["checksum"]:
+            return cls(
+                vertex_ids,
+                arrays["edge_index.ids"],
+                vertex_ids[arrays["edge_vertices"]],
+                arrays["edge_enabled"],
+                vertex_ids[arrays["sources"]],
+            )
+
+        graph_processor = cls.__new__(cls)
+        graph_processor._restore(arrays)
+        return graph_processor
+
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        """Return all arrays of the processor by name"""
+        arrays = {"edge_vertices": self._edge_vertices, "edge_enabled": self._edge_enabled, "sources": self._sources}
+        structures: List[Tuple[str, IdMapping | CsrAdjacency | RootedTreeIndex]] = [
+            ("vertex_index", self._vertex_index),
+            ("edge_index", self._edge_index),
+            ("adjacency", self._adjacency),
+            ("tree", self._tree),
+        ]
+        for prefix, structure in structures:
+            arrays.update({f"{prefix}.{name}": array for name, array in structure.arrays().items()})
+        return arrays
+
+    def _restore(self, arrays: Dict[str, np.ndarray]) -> None:
+        """Set all members from the arrays returned by _arrays, without any validation"""
+
+        def structure_arrays(prefix: str) -> Dict[str, np.ndarray]:
+            prefix = f"{prefix}."
+            return {name.removeprefix(prefix): array for name, array in arrays.items() if name.startswith(prefix)}
+
+        self._vertex_index = IdMapping(**structure_arrays("vertex_index"))
+        self._edge_index = IdMapping(**structure_arrays("edge_index"))
+        self._vertex_ids = self._vertex_index.ids
+        self._edge_ids = self._edge_index.ids
+        self._edge_vertices = arrays["edge_vertices"]
+        self._edge_enabled = arrays["edge_enabled"]
+        self._adjacency = CsrAdjacency(**structure_arrays("adjacency"))
+        self._sources = arrays["sources"]
+        self._tree = RootedTreeIndex(**structure_arrays("tree"))
+        self._disabled_edge_cache = None
+
+    def switch(self, disabled_edge_id: int, enabled_edge_id: int) -> None:
+        """
+        Disable an enabled edge and enable one of its alternative edges, see find_alternative_edges.
+
+        The rooted tree index is updated in place: the cut-off subtree is re-rooted at the endpoint
+        of the enabled edge and re-numbered, instead of rebuilding and re-validating the whole graph.
+        The graph stays fully connected and acyclic, otherwise an exception is raised and nothing changes.
+
+        For example, for the graph of find_alternative_edges, switch(3, 8) moves vertex 4
+        from the source to below vertex 6.
+
+        Args:
+            disabled_edge_id: id of the enabled edge to disable
+            enabled_edge_id: id of the disabled edge to enable
+
+        Raises:
+            IDNotFoundError: if one of the edges does not exist
+            EdgeAlreadyDisabledError: if disabled_edge_id is already disabled
+            EdgeAlreadyEnabledError: if enabled_edge_id is already enabled
+            GraphNotFullyConnectedError: if enabled_edge_id does not reconnect the cut-off vertices
+        """
+        i = self._edge_position(disabled_edge_id, "disabled_edge_id not found in edge_ids")
+        j = self._edge_position(enabled_edge_id, "enabled_edge_id not found in edge_ids")
+        if not self._edge_enabled[i]:
+            raise EdgeAlreadyDisabledError
+        if self._edge_enabled[j]:
+            raise EdgeAlreadyEnabledError
+
+        if not self._switch(i, j):
+            raise GraphNotFullyConnectedError(
+                f"Edge {enabled_edge_id} does not reconnect the vertices downstream of edge {disabled_edge_id}"
+            )
+
+    def toggle_edges(self, edge_ids: List[int] | np.ndarray) -> None:
+        """
+        Disable all given enabled edges and enable all given disabled edges at once.
+
+        The changes are applied as a sequence of switches, so the tree index is updated incrementally.
+        The graph has to stay fully connected and acyclic, otherwise an exception is raised and nothing changes.
+
+        Args:
+            edge_ids: ids of the edges to toggle
+
+        Raises:
+            IDNotFoundError: if edges do not exist, reporting all of them
+            IDNotUniqueError: if not all edge_ids are unique
+            GraphNotFullyConnectedError: if the resulting graph is not fully connected
+            GraphCycleError: if the resulting graph contains a cycle
+        """
+        positions = self._edge_positions(np.asarray(edge_ids))
+        was_enabled = self._edge_enabled[positions]
+        to_disable = positions[was_enabled]
+        to_enable = positions[~was_enabled]
+        if len(to_disable) == len(to_enable) and self._switch_all(to_disable, to_enable):
+            return
+
+        # by the exchange property of spanning trees the pairing only fails if the result is not radial,
+        # so building the tree of the result raises the matching exception
+        self._edge_enabled[positions] = ~was_enabled
+        try:
+            self._build_tree(self._sources)
+        finally:
+            self._edge_enabled[positions] = was_enabled
+            self._tree = self._build_tree(self._sources)
+            self._disabled_edge_cache = None
+
+    def _switch_all(self, to_disable: np.ndarray, to_enable: np.ndarray) -> bool:
+        """
+        Pair every enabled edge to disable with the first disabled edge to enable that reconnects it and switch them.
+        Return False as soon as there is no such edge, keeping the switches done so far.
+        """
+        for i in to_disable.tolist():
+            vertices = self._edge_vertices[to_enable]
+            downstream_vertex = self._downstream_vertex(i)
+            inside_1 = self._tree.in_subtree(downstream_vertex, vertices[:, 0])
+            inside_2 = self._tree.in_subtree(downstream_vertex, vertices[:, 1])
+            if not (inside_1 != inside_2).any():
+                return False
+
+            j = int(np.argmax(inside_1 != inside_2))
+            self._switch(i, int(to_enable[j]))
+            to_enable = np.delete(to_enable, j)
+        return True
+
+    def _switch(self, i: int, j: int) -> bool:
+        """
+        Disable the enabled edge at position i and enable the disabled edge at position j if that keeps
+        the graph radial, updating the tree index in place. Return whether the switch is done.
+        """
+        downstream_vertex = self._downstream_vertex(i)
+        inside = self._tree.in_subtree(downstream_vertex, self._edge_vertices[j])
+        if inside[0] == inside[1]:
+            return False
+
+        new_root, new_parent = self._edge_vertices[j] if inside[0] else self._edge_vertices[j, ::-1]
+        self._tree.move_subtree(downstream_vertex, int(new_root), int(new_parent), j)
+        self._edge_enabled[i] = False
+        self._edge_enabled[j] = True
+        self._disabled_edge_cache = None
+        return True
+
+    def _edge_position(self, edge_id: int, message: str) -> int:
+        """Return the position of edge_id in edge_ids, raise IDNotFoundError with message if it does not exist"""
+        i = self._edge_index.index(edge_id)
+        if i < 0:
+            raise IDNotFoundError(message)
+        return i
+
+    def _edge_positions(self, edge_ids: np.ndarray) -> np.ndarray:
+        """Return the positions of an array of unique edge ids, raise IDNotFoundError with all ids that do not exist"""
+        positions, found = self._edge_index.indices(edge_ids)
+        if not found.all():
+            raise IDNotFoundError(f"Edge ids not found in edge_ids: {edge_ids[~found].tolist()}")
+        if IdMapping.from_ids(positions).has_duplicates():
+            raise IDNotUniqueError("Not all edge_ids are unique")
+        return positions
+
+    def _enabled_edge_positions(self, edge_ids: np.ndarray) -> np.ndarray:
+        """Return the positions of an array of unique enabled edge ids, raise for all ids which are not"""
+        positions = self._edge_positions(edge_ids)
+        disabled = ~self._edge_enabled[positions]
+        if disabled.any():
+            raise EdgeAlreadyDisabledError(f"Edge ids already disabled: {edge_ids[disabled].tolist()}")
+        return positions
+
+    def _downstream_vertex(self, i: int) -> int:
+        """Return the endpoint of the enabled edge at position i which is farthest from the source"""
+        return int(self._downstream_vertices(np.array([i]))[0])
+
+    def _downstream_vertices(self, edges: np.ndarray) -> np.ndarray:
+        """Return for each of the enabled edges the endpoint which is farthest from the source"""
+        vertices = self._edge_vertices[edges]
+        return np.where(self._tree.parent_edge[vertices[:, 1]] == edges, vertices[:, 1], vertices[:, 0])
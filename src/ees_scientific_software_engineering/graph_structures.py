@@ -0,0 +1,584 @@
+"""
+Array-backed data structures used by the graph processor: id mapping, CSR adjacency and rooted tree index.
+
+All of them work on dense vertex and edge positions, the translation from and to ids is done by IdMapping.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+import scipy
+
+
+class UnionFind:
+    """Disjoint set of dense indices with path halving and union by size"""
+
+    def __init__(self, n: int) -> None:
+        self._parent = list(range(n))
+        self._size = [1] * n
+
+    def find(self, i: int) -> int:
+        """Return the representative of the set containing i"""
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> bool:
+        """Merge the sets containing i and j. Return False if they were already the same set."""
+        root_i = self.find(i)
+        root_j = self.find(j)
+        if root_i == root_j:
+            return False
+
+        if self._size[root_i] < self._size[root_j]:
+            root_i, root_j = root_j, root_i
+        self._parent[root_j] = root_i
+        self._size[root_i] += self._size[root_j]
+        return True
+
+
+def first_cycle_edge(n_vertices: int, edge_vertices: np.ndarray, edge_enabled: np.ndarray) -> int:
+    """
+    Return the position of the first enabled edge which closes a cycle, the enabled edges must contain one.
+
+    Args:
+        n_vertices: number of vertices
+        edge_vertices: (n_edges, 2) array of vertex positions of every edge
+        edge_enabled: boolean array indicating if an edge is enabled or not
+    """
+    components = UnionFind(n_vertices)
+    return next(i for i in np.flatnonzero(edge_enabled).tolist() if not components.union(*edge_vertices[i].tolist()))
+
+
+def index_dtype(n: int) -> type:
+    """Smallest signed integer type which can hold the positions 0 ... n"""
+    return np.int32 if n < np.iinfo(np.int32).max else np.int64
+
+
+class CsrAdjacency:
+    """
+    Adjacency of all (enabled and disabled) edges in compressed sparse row format.
+
+    The neighbours of vertex v are neighbours[indptr[v]:indptr[v + 1]], connected by the edges
+    at the same positions in edges. Whether an edge is enabled is kept outside of this structure,
+    so switching an edge does not change it.
+    """
+
+    def __init__(self, indptr: np.ndarray, neighbours: np.ndarray, edges: np.ndarray) -> None:
+        """
+        Args:
+            indptr: row offsets of every vertex into neighbours and edges
+            neighbours: neighbour vertex of every entry
+            edges: edge of every entry
+        """
+        self.indptr = indptr
+        self.neighbours = neighbours
+        self.edges = edges
+
+    @classmethod
+    def from_edges(cls, n_vertices: int, edge_vertices: np.ndarray) -> "CsrAdjacency":
+        """
+        Build the adjacency in O(V+E) from the vertex positions of the edges.
+
+        Args:
+            n_vertices: number of vertices
+            edge_vertices: (n_edges, 2) array of vertex positions of every edge
+        """
+        dtype = index_dtype(max(n_vertices, 2 * len(edge_vertices)))
+        vertices = edge_vertices.ravel()
+        sort_order = np.argsort(vertices, kind="stable")
+
+        indptr: np.ndarray = np.zeros(n_vertices + 1, dtype=dtype)
+        np.cumsum(np.bincount(vertices, minlength=n_vertices), out=indptr[1:])
+        return cls(indptr, edge_vertices[:, ::-1].ravel()[sort_order].astype(dtype), (sort_order // 2).astype(dtype))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Return the arrays of the adjacency by name, to construct it again with cls(**arrays)"""
+        return {"indptr": self.indptr, "neighbours": self.neighbours, "edges": self.edges}
+
+    def nbytes(self) -> int:
+        """Return the memory used by the arrays in bytes"""
+        return self.indptr.nbytes + self.neighbours.nbytes + self.edges.nbytes
+
+    def spanning_tree(self, edge_enabled: np.ndarray, roots: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Build a spanning tree over the enabled edges only, from each of the roots in turn.
+
+        The tree is found with a breadth-first search in O(V+E) and put in DFS pre-order with
+        vectorized pointer jumping in O(V log(V)). A depth-first search itself rescans the
+        neighbours of a vertex every time it returns to it, which is quadratic in its degree.
+
+        Args:
+            edge_enabled: boolean array indicating if an edge is enabled or not
+            roots: vertex positions to start from
+
+        Returns:
+            The reached vertices in DFS pre-order, and the parent vertex and parent edge of
+            every vertex, which are -1 for the roots and for vertices which are not reached.
+            A root which is reached from an earlier root gets that as its ancestor instead.
+        """
+        # pylint: disable=too-many-locals
+        n_vertices = len(self.indptr) - 1
+        enabled = edge_enabled[self.edges]
+        rows = np.repeat(np.arange(n_vertices, dtype=self.neighbours.dtype), np.diff(self.indptr))[enabled]
+        # only the first root of every component is a root of the tree, the others are reached from it
+        _, component = scipy.sparse.csgraph.connected_components(
+            scipy.sparse.csr_array(
+                (np.ones(len(rows), dtype=np.int8), self.neighbours[enabled], self._indptr(rows)),
+                shape=(n_vertices, n_vertices),
+            ),
+            directed=True,
+            connection="weak",
+        )
+        _, first = np.unique(component[roots], return_index=True)
+        tree_roots = roots[np.sort(first)].astype(rows.dtype)
+
+        # a virtual vertex n_vertices links to the tree roots, so one search covers all of them
+        virtual_rows = np.concatenate([rows, np.full(len(tree_roots), n_vertices, dtype=rows.dtype)])
+        matrix = scipy.sparse.csr_array(
+            (
+                np.ones(len(virtual_rows), dtype=np.int8),
+                np.concatenate([self.neighbours[enabled], tree_roots]),
+                self._indptr(virtual_rows, n_vertices + 1),
+            ),
+            shape=(n_vertices + 1, n_vertices + 1),
+        )
+        # both directions of every edge are stored, so a directed search covers the undirected graph
+        reached, predecessors = scipy.sparse.csgraph.breadth_first_order(
+            matrix, n_vertices, directed=True, return_predecessors=True
+        )
+        reached = reached[1:].astype(np.int64)
+        predecessors = predecessors[:n_vertices]
+        parent = np.where((predecessors < 0) | (predecessors == n_vertices), -1, predecessors).astype(np.int64)
+
+        # the parent edge of a vertex is the enabled edge to its parent; for parallel edges any of them
+        is_parent = self.neighbours[enabled] == parent[rows]
+        parent_edge = np.full(n_vertices, -1, dtype=np.int64)
+        parent_edge[rows[is_parent]] = self.edges[enabled][is_parent]
+        return _pre_order(reached, parent, tree_roots.astype(np.int64)), parent, parent_edge
+
+    def _indptr(self, rows: np.ndarray, n_rows: int | None = None) -> np.ndarray:
+        """Return the csr index pointer of sorted rows, by default one per vertex"""
+        n_rows = len(self.indptr) - 1 if n_rows is None else n_rows
+        indptr = np.zeros(n_rows + 1, dtype=self.indptr.dtype)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        return indptr
+
+
+def _pre_order(reached: np.ndarray, parent: np.ndarray, roots: np.ndarray) -> np.ndarray:
+    """
+    Order the reached vertices of a forest in DFS pre-order, the trees in the order of their roots.
+
+    Every vertex is entered and left once in an Euler tour of the forest, and its position in the
+    pre-order is the number of vertices entered before it, which pointer jumping along the tour gives.
+    """
+    # pylint: disable=too-many-locals
+    n_vertices = len(parent)
+    # the children of every vertex, the roots being the children of a virtual vertex n_vertices
+    children = reached[parent[reached] >= 0]
+    children = children[np.argsort(parent[children], kind="stable")]
+    siblings = np.concatenate([roots, children])
+    sibling_parent = np.concatenate([np.full(len(roots), n_vertices), parent[children]])
+    is_last = np.append(sibling_parent[1:] != sibling_parent[:-1], True)
+    is_first = np.insert(is_last[:-1], 0, True)
+
+    # tour steps: entering vertex v is step v, leaving it is step n_vertices + v and the end is 2 * n_vertices
+    end = 2 * n_vertices
+    link = np.full(end + 1, end)
+    # entering a vertex continues with its first child, or with leaving it if it has none
+    link[reached] = n_vertices + reached
+    down = is_first & (sibling_parent < n_vertices)
+    link[sibling_parent[down]] = siblings[down]
+    # leaving a vertex continues with its next sibling, or with leaving its parent if it is the last
+    link[n_vertices + siblings[~is_last]] = siblings[1:][~is_last[:-1]]
+    up = is_last & (sibling_parent < n_vertices)
+    link[n_vertices + siblings[up]] = n_vertices + sibling_parent[up]
+    weight = np.zeros(end + 1, dtype=np.int64)
+    weight[reached] = 1
+
+    _, entered_after = pointer_jump(link, weight)
+    order = np.empty(len(reached), dtype=np.int64)
+    order[len(reached) - entered_after[reached]] = reached
+    return order
+
+
+def pointer_jump(link: np.ndarray, weight: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Follow the links of a forest to their roots for all vertices at once, in O(V log(depth)).
+
+    Args:
+        link: next vertex of every vertex, the roots link to themselves
+        weight: weight of every vertex, 0 for the roots
+
+    Returns:
+        The root reached from every vertex and the total weight along the way.
+    """
+    total = weight.copy()
+    while True:
+        next_link = link[link]
+        if np.array_equal(next_link, link):
+            return link, total
+        total += total[link]
+        link = next_link
+
+
+# empty slot of the Euler tour of a RootedTreeIndex
+_EMPTY = np.iinfo(np.int64).min
+
+
+class RootedTreeIndex:
+    """
+    Index of a spanning tree rooted at the source vertex, all in dense vertex/edge positions.
+
+    The vertices are stored in DFS pre-order, so the subtree of a vertex v is the contiguous
+    slice order[entry[v]:exit[v]] and u is in the subtree of v if entry[v] <= entry[u] < exit[v].
+    A spanning forest with one root per tree is stored the same way, one tree after the other,
+    as if the roots were the children of a virtual parent -1.
+
+    Moving a subtree in the pre-order would shift all vertices in between, so from the first move_subtree on
+    the index also keeps the Euler tour of the tree: the open event v and the close event ~v of every vertex,
+    spread over an array with gaps like a packed-memory array. A move only rewrites the events of the moved
+    subtree, and order, entry and exit are rebuilt from the tour in O(V) when they are used again.
+
+    Attributes:
+        parent: parent vertex of every vertex, -1 for the root
+        parent_edge: edge connecting every vertex to its parent, -1 for the root
+        order: vertices in DFS pre-order
+        entry: DFS entry time (position in order) of every vertex
+        exit: DFS exit time of every vertex, i.e. entry plus the size of its subtree
+        depth: number of edges between every vertex and the root
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        parent: np.ndarray,
+        parent_edge: np.ndarray,
+        order: np.ndarray,
+        entry: np.ndarray,
+        exit: np.ndarray,  # pylint: disable=redefined-builtin
+        depth: np.ndarray,
+    ) -> None:
+        """
+        Args:
+            parent: parent vertex of every vertex, -1 for the root
+            parent_edge: edge connecting every vertex to its parent, -1 for the root
+            order: vertices in DFS pre-order
+            entry: DFS entry time of every vertex
+            exit: DFS exit time of every vertex
+            depth: number of edges between every vertex and the root
+        """
+        self.parent = parent
+        self.parent_edge = parent_edge
+        self.depth = depth
+        self._pre_order: Tuple[np.ndarray, np.ndarray, np.ndarray] | None = (order, entry, exit)
+        # the Euler tour with gaps and the slots of the open and close event of every vertex, see move_subtree
+        self._events = np.empty(0, dtype=np.int64)
+        self._open = np.empty(0, dtype=np.int64)
+        self._close = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_dfs(cls, order: np.ndarray, parent: np.ndarray, parent_edge: np.ndarray) -> "RootedTreeIndex":
+        """
+        Build the index from the result of a DFS with vectorized pointer jumping, in O(V log(depth)).
+
+        Args:
+            order: vertices in DFS pre-order
+            parent: parent vertex of every vertex, -1 for the root
+            parent_edge: edge connecting every vertex to its parent, -1 for the root
+        """
+        n_vertices = len(order)
+        vertices = np.arange(n_vertices)
+        is_root = parent < 0
+        entry = np.empty(n_vertices, dtype=np.int64)
+        entry[order] = vertices
+
+        _, depth = pointer_jump(np.where(is_root, vertices, parent), (~is_root).astype(np.int64))
+
+        # a subtree ends where the next sibling starts; the subtree of a last child ends with its parent's
+        siblings = order[np.argsort(parent[order], kind="stable")]
+        has_next = parent[siblings[:-1]] == parent[siblings[1:]]
+        end = np.full(n_vertices, n_vertices, dtype=np.int64)
+        end[siblings[:-1][has_next]] = entry[siblings[1:][has_next]]
+        link = np.where(is_root, vertices, parent)
+        link[siblings[:-1][has_next]] = siblings[:-1][has_next]
+        last, _ = pointer_jump(link, np.zeros(n_vertices, dtype=np.int64))
+        return cls(parent, parent_edge, order, entry, end[last], depth)
+
+    @property
+    def order(self) -> np.ndarray:
+        """Vertices in DFS pre-order"""
+        return self._dfs_times()[0]
+
+    @property
+    def entry(self) -> np.ndarray:
+        """DFS entry time (position in order) of every vertex"""
+        return self._dfs_times()[1]
+
+    @property
+    def exit(self) -> np.ndarray:
+        """DFS exit time of every vertex, i.e. entry plus the size of its subtree"""
+        return self._dfs_times()[2]
+
+    def _dfs_times(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return order, entry and exit, rebuilding them from the Euler tour after a move in O(V)"""
+        if self._pre_order is None:
+            is_open = self._events >= 0
+            order = self._events[is_open]
+            entry = np.empty(len(order), dtype=np.int64)
+            entry[order] = np.arange(len(order))
+            # a vertex exits after the open events of all vertices in its subtree
+            self._pre_order = (order, entry, np.cumsum(is_open)[self._close])
+        return self._pre_order
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Return the arrays of the index by name, to construct it again with cls(**arrays)"""
+        return {
+            "parent": self.parent,
+            "parent_edge": self.parent_edge,
+            "order": self.order,
+            "entry": self.entry,
+            "exit": self.exit,
+            "depth": self.depth,
+        }
+
+    def tree_starts(self) -> np.ndarray:
+        """Return the positions in order where the trees of the forest start, i.e. the entry times of the roots"""
+        return np.flatnonzero(self.parent[self.order] < 0)
+
+    def restrict(self, start: int, end: int) -> "RootedTreeIndex":
+        """
+        Return the index of only the trees in order[start:end], which has to begin and end at tree boundaries.
+
+        The vertices of the restricted index are renumbered by their position in order minus start,
+        so vertex v becomes entry[v] - start and its subtree is again a slice. The edges keep their positions.
+        """
+        vertices = self.order[start:end]
+        parent = self.parent[vertices]
+        local_parent = np.where(parent < 0, -1, self.entry[parent] - start)
+        local_order = np.arange(end - start, dtype=np.int64)
+        return RootedTreeIndex(
+            local_parent,
+            self.parent_edge[vertices],
+            local_order,
+            local_order.copy(),
+            self.exit[vertices] - start,
+            self.depth[vertices],
+        )
+
+    def subtree(self, vertex: int) -> np.ndarray:
+        """Return the vertices in the subtree of vertex (including itself) in pre-order, also right after a move"""
+        if self._pre_order is None:
+            events = self._events[self._open[vertex] : self._close[vertex]]
+            return events[events >= 0]
+        order, entry, exit_ = self._pre_order
+        return order[entry[vertex] : exit_[vertex]]
+
+    def in_subtree(self, vertex: int, vertices: np.ndarray) -> np.ndarray:
+        """Return a boolean mask telling which of the vertices are in the subtree of vertex, in O(1) each"""
+        if self._pre_order is None:
+            start, end = self._open, self._close
+        else:
+            _, start, end = self._pre_order
+        entry = start[vertices]
+        return (start[vertex] <= entry) & (entry < end[vertex])
+
+    def subtrees(self, vertices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the subtrees of many vertices at once, concatenated in pre-order.
+
+        Args:
+            vertices: array of vertices
+
+        Returns:
+            The subtree sizes and the concatenated subtree members.
+        """
+        sizes = self.exit[vertices] - self.entry[vertices]
+        starts = np.cumsum(sizes) - sizes
+        positions = np.arange(sizes.sum()) + np.repeat(self.entry[vertices] - starts, sizes)
+        return sizes, self.order[positions]
+
+    def move_subtree(self, vertex: int, new_root: int, new_parent: int, new_parent_edge: int) -> None:
+        """
+        Cut the subtree of vertex from its parent, re-root it at new_root and attach that to new_parent.
+
+        The new Euler tour of the subtree is assembled from slices of its old one along the path from new_root
+        up to vertex, and inserted after the open event of new_parent, see _insert_events. As the tour stores
+        no subtree sizes, no other vertex changes: the work depends on the slots of the subtree, the path
+        and the window spread out by the insertion, not on how far the subtree moves in the pre-order.
+
+        Args:
+            vertex: root of the subtree to move
+            new_root: vertex in the subtree of vertex which becomes its root
+            new_parent: vertex outside of the subtree of vertex to attach it to
+            new_parent_edge: edge between new_root and new_parent
+        """
+        # pylint: disable=too-many-locals
+        if len(self._events) == 0:
+            self._build_euler_tour()
+        events, open_, close = self._events, self._open, self._close
+        path = [new_root]
+        while path[-1] != vertex:
+            path.append(int(self.parent[path[-1]]))
+
+        # old tour of new_root, then for every next vertex up the path its old tour minus that of the previous one,
+        # all without their close events, which follow in reverse to nest every next vertex in the previous one
+        segments = [events[open_[new_root] : close[new_root]]]
+        depth_shift = [self.depth[new_parent] + 1 - self.depth[new_root]]
+        for i, (below, above) in enumerate(zip(path, path[1:]), start=1):
+            segments.append(events[open_[above] : open_[below]])
+            segments.append(events[close[below] + 1 : close[above]])
+            depth_shift += 2 * [self.depth[new_parent] + 1 + i - self.depth[above]]
+        block = np.concatenate(segments)
+        is_open = block >= 0
+        self.depth[block[is_open]] += np.repeat(depth_shift, [len(segment) for segment in segments])[is_open]
+        block = np.concatenate([block[block != _EMPTY], ~np.array(path[::-1], dtype=np.int64)])
+
+        path_edges = self.parent_edge[path].copy()
+        self.parent[path[1:]] = path[:-1]
+        self.parent_edge[path[1:]] = path_edges[:-1]
+        self.parent[new_root] = new_parent
+        self.parent_edge[new_root] = new_parent_edge
+
+        events[open_[vertex] : close[vertex] + 1] = _EMPTY
+        self._insert_events(int(open_[new_parent]) + 1, block)
+        self._pre_order = None
+
+    def _build_euler_tour(self) -> None:
+        """Spread the Euler tour over twice as many slots as it has events, leaving a gap after every event"""
+        _, entry, exit_ = self._dfs_times()
+        vertices = np.arange(len(entry))
+        # the open event of v follows the open events of the vertices before it and the close events of all of
+        # them but its ancestors, its close event follows the other events of its subtree
+        self._open = 2 * (2 * entry - self.depth)
+        self._close = self._open + 2 * (2 * (exit_ - entry) - 1)
+        self._events = np.full(4 * len(entry), _EMPTY, dtype=np.int64)
+        self._events[self._open] = vertices
+        self._events[self._close] = ~vertices
+
+    def _insert_events(self, position: int, block: np.ndarray) -> None:
+        """
+        Insert the events of block at the slot position of the Euler tour, before the events after it.
+
+        As in a packed-memory array, the events of the smallest aligned window around the position that stays
+        below its density bound are spread over it evenly together with the block. The bound goes from 1 for
+        a single slot down to 1/2 for all slots, which the tour always meets, so gaps remain near every event
+        and the amortized number of events spread out per inserted event is O(log(V)^2).
+        """
+        events = self._events
+        levels = np.log2(len(events))
+        width = 1 << (len(block) - 1).bit_length()
+        while True:
+            start = position // width * width
+            end = min(start + width, len(events))
+            window = events[start:end]
+            n_events = np.count_nonzero(window != _EMPTY) + len(block)
+            if end - start == len(events) or n_events <= (end - start) * (1 - np.log2(width) / levels / 2):
+                break
+            width *= 2
+
+        before, after = window[: position - start], window[position - start :]
+        merged = np.concatenate([before[before != _EMPTY], block, after[after != _EMPTY]])
+        slots = start + np.arange(len(merged)) * (end - start) // len(merged)
+        window[:] = _EMPTY
+        events[slots] = merged
+        is_open = merged >= 0
+        self._open[merged[is_open]] = slots[is_open]
+        self._close[~merged[~is_open]] = slots[~is_open]
+
+    def path_edges(self, vertices_1: np.ndarray, vertices_2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the tree edges on the paths between many pairs of vertices at once.
+
+        All pairs climb towards their lowest common ancestor together, one level per step,
+        so the work is the total path length plus one vectorized step per level.
+        For a pair in different trees of a forest these are the edges from both vertices up to their roots.
+
+        Args:
+            vertices_1: array of first vertices of the pairs
+            vertices_2: array of second vertices of the pairs
+
+        Returns:
+            The tree edges and for each of them the index of the pair whose path it is on.
+        """
+        vertex_1 = np.array(vertices_1, dtype=np.int64)
+        vertex_2 = np.array(vertices_2, dtype=np.int64)
+        pair = np.arange(len(vertex_1))
+        edges = [np.empty(0, dtype=np.int64)]
+        pairs = [np.empty(0, dtype=np.int64)]
+        while True:
+            active = vertex_1 != vertex_2
+            vertex_1, vertex_2, pair = vertex_1[active], vertex_2[active], pair[active]
+            if len(pair) == 0:
+                break
+
+            depth_1 = self.depth[vertex_1]
+            depth_2 = self.depth[vertex_2]
+            for vertex, move in ((vertex_1, depth_1 >= depth_2), (vertex_2, depth_2 >= depth_1)):
+                edges.append(self.parent_edge[vertex[move]])
+                pairs.append(pair[move])
+                vertex[move] = self.parent[vertex[move]]
+
+        # pairs in different trees step from both roots to the virtual parent -1 together
+        edges_array = np.concatenate(edges, dtype=np.int64)
+        pairs_array = np.concatenate(pairs, dtype=np.int64)
+        return edges_array[edges_array >= 0], pairs_array[edges_array >= 0]
+
+
+class IdMapping:
+    """
+    Mapping of external ids to dense positions 0 ... n-1.
+
+    Ids are looked up with a binary search in the sorted ids, in O(log n) for a single id and in bulk
+    for arrays of ids. Nothing is built per process, so a memory-mapped mapping is ready to use.
+    """
+
+    def __init__(self, ids: np.ndarray, sorter: np.ndarray, sorted_ids: np.ndarray) -> None:
+        """
+        Args:
+            ids: array of ids, the position of an id is its index in this array
+            sorter: permutation which sorts ids
+            sorted_ids: ids in sorted order
+        """
+        self.ids = ids
+        self._sorter = sorter
+        self._sorted_ids = sorted_ids
+
+    @classmethod
+    def from_ids(cls, ids: np.ndarray) -> "IdMapping":
+        """Build the mapping by sorting the ids, in O(n log n)"""
+        sorter = np.argsort(ids, kind="stable")
+        return cls(ids, sorter, ids[sorter])
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Return the arrays of the mapping by name, to construct it again with cls(**arrays)"""
+        return {"ids": self.ids, "sorter": self._sorter, "sorted_ids": self._sorted_ids}
+
+    def has_duplicates(self) -> bool:
+        """Check if not all ids are unique"""
+        return bool((self._sorted_ids[1:] == self._sorted_ids[:-1]).any())
+
+    def index(self, value: int) -> int:
+        """Return the position of a single id, -1 if it does not exist"""
+        position = int(np.searchsorted(self._sorted_ids, value))
+        if position == len(self._sorted_ids) or self._sorted_ids[position] != value:
+            return -1
+        return int(self._sorter[position])
+
+    def indices(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the positions of an array of ids in bulk.
+
+        Args:
+            values: array of ids of any shape
+
+        Returns:
+            The positions of the ids (0 where not found) and a boolean mask of which ids exist.
+        """
+        if len(self.ids) == 0:
+            return np.zeros(np.shape(values), dtype=np.int64), np.zeros(np.shape(values), dtype=bool)
+
+        positions = np.searchsorted(self._sorted_ids, values).clip(max=len(self.ids) - 1)
+        return self._sorter[positions].astype(np.int64), self._sorted_ids[positions] == values
@@ -0,0 +1,97 @@
+"""
+Thread pools that do not fight with the threads of the BLAS library.
+
+NumPy and SciPy call a multithreaded BLAS (e.g. OpenBLAS), which by default starts one thread per core
+for every call. Calling it from several Python threads at once then runs more threads than cores.
+limit_blas_threads caps the BLAS threads while a block runs, and thread_map uses it to give every
+worker of a thread pool its share of the cores. Changing the BLAS threads at runtime needs the optional
+dependency threadpoolctl; without it the limits have no effect.
+
+threadpoolctl and the thread pool are imported on first use, as importing them takes longer than the
+rest of the module and e.g. rms only needs them for large arrays.
+"""
+
+import os
+from contextlib import contextmanager
+from importlib import import_module
+from types import ModuleType
+from typing import Callable, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def available_cores() -> int:
+    """Return the number of cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1  # pragma: no cover
+
+
+@contextmanager
+def limit_blas_threads(n_threads: int | None) -> Iterator[bool]:
+    """
+    Limit the number of threads of the BLAS libraries of the process while the block runs.
+    The limit is global, so it also applies to BLAS calls from other threads meanwhile.
+
+    Args:
+        n_threads: maximum number of BLAS threads, None to leave them as they are
+
+    Returns:
+        A context manager which yields whether the limit is applied, False without threadpoolctl.
+    """
+    if n_threads is not None and n_threads < 1:
+        raise ValueError("n_threads should be at least 1")
+
+    threadpoolctl = _import_threadpoolctl() if n_threads is not None else None
+    if threadpoolctl is None:
+        yield False
+        return
+
+    with threadpoolctl.threadpool_limits(limits=n_threads, user_api="blas"):
+        yield True
+
+
+def thread_map(
+    function: Callable[[T], R], items: Iterable[T], n_workers: int | None = None, blas_threads: int | None = None
+) -> List[R]:
+    """
+    Apply the function to all items in a pool of threads, returning the results in order.
+
+    The BLAS threads are limited to blas_threads while the pool runs, by default the available cores
+    divided over the workers, so that the workers together use every core once. The function has to
+    release the GIL for the workers to run at the same time, as NumPy and SciPy do in BLAS and LAPACK.
+
+    Args:
+        function: function of one item
+        items: items to apply the function to
+        n_workers: number of threads, by default the number of available cores; 1 runs in this thread
+        blas_threads: number of BLAS threads while the pool runs
+
+    Returns:
+        The list of results.
+    """
+    if n_workers is None:
+        n_workers = available_cores()
+    if n_workers < 1:
+        raise ValueError("n_workers should be at least 1")
+    if blas_threads is None:
+        blas_threads = max(1, available_cores() // n_workers)
+
+    with limit_blas_threads(blas_threads):
+        if n_workers == 1:
+            return [function(item) for item in items]
+
+        # pylint: disable=import-outside-toplevel
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            return list(pool.map(function, items))
+
+
+def _import_threadpoolctl() -> ModuleType | None:
+    """Return the optional threadpoolctl module, None if it is not installed"""
+    try:
+        return import_module("threadpoolctl")
+    except ImportError:
+        return None
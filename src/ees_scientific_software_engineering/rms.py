@@ -1,14 +1,41 @@
 """A module that calculates the root mean square
 """
 
+from functools import reduce
+from pathlib import Path
+from typing import Iterable, Tuple
+
 import numpy as np
 
+from .parallel import available_cores, thread_map
+
+# number of values of rms squared and checked at a time
+BLOCK_SIZE = 1 << 16
+
+# number of values from which rms runs on all available cores by default
+PARALLEL_RMS_THRESHOLD = 1 << 22
+
+# number of windows of rolling_rms whose squares are summed at a time
+ROLLING_BLOCK_SIZE = 1 << 16
+
+# a sum of squares of this size per value loses less than eps to the squares that underflow
+_NO_UNDERFLOW = float(np.finfo(np.float64).tiny / np.finfo(np.float64).eps)  # pylint: disable=no-member
+
+# a sum of squares of at most this size can be added to 2**500 others without overflowing
+_NO_OVERFLOW = 2.0**512
 
-def rms(input_array: np.ndarray) -> float:
+
+def rms(input_array: np.ndarray, n_workers: int | None = None) -> float:
     """calculating rms
 
+    The squares are summed per block of BLOCK_SIZE values, without overflowing or underflowing:
+    blocks of values whose squares do not fit in a float are scaled first, like LAPACK nrm2 does.
+    The blocks are divided over a pool of threads, by default all available cores for arrays of at
+    least PARALLEL_RMS_THRESHOLD values.
+
     Args:
         input_array: numpy array containing floats
+        n_workers: number of threads, by default 1 or the available cores depending on the size
 
     Returns:
         rms of numbers in array
@@ -25,11 +52,363 @@ def rms(input_array: np.ndarray) -> float:
     if len(input_array) == 0:
         raise ValueError("Argument numpy array should contain at least one value!")
 
-    if np.isinf(input_array).any():
+    if n_workers is None:
+        n_workers = available_cores() if len(input_array) >= PARALLEL_RMS_THRESHOLD else 1
+    if n_workers < 1:
+        raise ValueError("Argument n_workers should be at least 1!")
+
+    if n_workers == 1:
+        scale, sum_squares = _scaled_sum_squares(input_array, input_array)
+    else:
+        chunks = np.array_split(input_array, n_workers)
+        scale, sum_squares = reduce(
+            _combine, thread_map(lambda chunk: _scaled_sum_squares(chunk, input_array), chunks, n_workers=n_workers)
+        )
+    return scale * float(np.sqrt(sum_squares / len(input_array)))
+
+
+def _scaled_sum_squares(values: np.ndarray, array: np.ndarray) -> Tuple[float, float]:
+    """Return the scale and sum of squares of the values, part of array, per block, combined like in LAPACK nrm2"""
+    return reduce(
+        _combine,
+        (
+            _block_scaled_sum_squares(values[start : start + BLOCK_SIZE], array)
+            for start in range(0, len(values), BLOCK_SIZE)
+        ),
+        (0.0, 0.0),
+    )
+
+
+def _block_scaled_sum_squares(block: np.ndarray, array: np.ndarray) -> Tuple[float, float]:
+    """Return the scale and sum of squares of a block of array, the squares summing to scale**2 * sum of squares"""
+    # the dot product has no temporaries and is finite if all values are, unless it overflows
+    with np.errstate(over="ignore"):
+        sum_squares = float(np.dot(block, block))
+    if _NO_UNDERFLOW * len(block) <= sum_squares <= _NO_OVERFLOW:
+        return 1.0, sum_squares
+    if not np.isfinite(sum_squares):
+        _check_finite(block, array)
+
+    largest = max(float(block.max()), -float(block.min()))
+    if largest == 0.0:
+        return 0.0, 0.0
+    scale = float(_scale(largest))
+    scaled = block / scale
+    return scale, float(np.dot(scaled, scaled))
+
+
+def _scale(largest: np.ndarray | float) -> np.ndarray:
+    """Return the power of two, so that the scaling is exact, for which values up to largest are below 2"""
+    return np.ldexp(1.0, np.frexp(largest)[1] - 1)
+
+
+def _rescaled_rms(values: np.ndarray) -> np.ndarray:
+    """Return the rms along the last axis of sets of values whose squares overflow or underflow, scaled like in rms"""
+    scale = _scale(np.maximum(values.max(axis=-1), -values.min(axis=-1)))
+    scaled = values / scale[..., None]
+    return scale * np.sqrt(np.einsum("...i,...i->...", scaled, scaled) / values.shape[-1])
+
+
+def _combine(first: Tuple[float, float], second: Tuple[float, float]) -> Tuple[float, float]:
+    """Add two scaled sums of squares, in the scale of the largest"""
+    if first[0] < second[0]:
+        first, second = second, first
+    if second[0] == 0.0:
+        return first
+    return first[0], first[1] + second[1] * (second[0] / first[0]) ** 2
+
+
+def batched_rms(input_array: np.ndarray, axis: int = -1) -> np.ndarray:
+    """calculating the rms along one axis of an array, e.g. per channel of a multichannel signal
+
+    The squares are summed along the axis without an array of squares of the size of the input. Only
+    the sets of values whose squares overflow or underflow are scaled first, like in rms.
+
+    Args:
+        input_array: numpy array containing floats, of at least one dimension
+        axis: axis to calculate the rms along
+
+    Returns:
+        rms of the numbers along the axis, with the shape of input_array without the axis
+    """
+    signals = _signals_along_axis(input_array, axis)
+    if signals.shape[-1] == 0:
+        raise ValueError("Argument numpy array should contain at least one value!")
+
+    result = np.empty(signals.shape[:-1])
+    with np.errstate(over="ignore"):
+        np.einsum("...i,...i->...", signals, signals, out=result)
+    # the sums are finite if all values are, unless the squares overflow, and only tiny sums lose squares that underflow
+    rescale = ~np.isfinite(result) | (result < _NO_UNDERFLOW * signals.shape[-1])
+    result /= signals.shape[-1]
+    np.sqrt(result, out=result)
+    if rescale.any():
+        _check_finite(signals[rescale], signals)
+        result[rescale] = _rescaled_rms(signals[rescale])
+    return result[()]
+
+
+def rolling_rms(input_array: np.ndarray, window: int, step: int = 1, axis: int = -1) -> np.ndarray:
+    """calculating the rms of sliding windows along one axis of an array, e.g. per cycle of a waveform
+
+    The signal is cut into pieces of window values, and the sum of squares of a window is the sum of
+    a suffix of one piece and a prefix of the next, which takes O(n) instead of O(n * window)
+    operations. As no sums are subtracted, the rounding errors are relative to the window itself,
+    also after a large transient. Windows which do not overlap are summed directly, and only the
+    windows whose squares overflow or underflow are scaled first, like in rms. The signal is handled per block of
+    ROLLING_BLOCK_SIZE windows, so only a block of squares is in memory at a time.
+
+    Args:
+        input_array: numpy array containing floats, of at least one dimension
+        window: number of values per window
+        step: number of values between the starts of consecutive windows, window for adjacent windows
+        axis: axis to slide the windows along
+
+    Returns:
+        rms of the windows in order of their start, with the axis of input_array replaced by the last
+        axis; (n - window) // step + 1 windows for n values along the axis
+    """
+    signals = _signals_along_axis(input_array, axis)
+    for name, value in (("window", window), ("step", step)):
+        if not isinstance(value, (int, np.integer)) or isinstance(value, bool) or value < 1:
+            raise ValueError(f"Argument {name} should be a positive integer!")
+
+    n_starts = signals.shape[-1] - window + 1
+    if n_starts < 1:
+        raise ValueError("Argument window should not be longer than the array!")
+
+    # a multiple of step, so that every block starts with a window
+    block = -(-max(ROLLING_BLOCK_SIZE, window) // step) * step
+    result = np.empty(signals.shape[:-1] + ((n_starts - 1) // step + 1,))
+    for start in range(0, n_starts, block):
+        segment = signals[..., start : min(start + block, n_starts) + window - 1]
+        values = _window_rms(segment, window, step, signals)
+        result[..., start // step : start // step + values.shape[-1]] = values
+    return result
+
+
+def _window_rms(segment: np.ndarray, window: int, step: int, signals: np.ndarray) -> np.ndarray:
+    """Return the rms of the windows of a block of the signals of rolling_rms along the last axis"""
+    with np.errstate(over="ignore"):
+        sum_squares = _window_sum_squares(segment, window, step)
+
+    # the sums are finite if all values are, unless the squares overflow, and only tiny sums lose squares that underflow
+    rescale = ~np.isfinite(sum_squares) | (sum_squares < _NO_UNDERFLOW * window)
+    sum_squares /= window
+    np.sqrt(sum_squares, out=sum_squares)
+    if rescale.any():
+        _check_finite(segment, signals)
+        scale, scaled_sum_squares = _scaled_window_sum_squares(segment, window, step)
+        sum_squares[rescale] = scale[rescale] * np.sqrt(scaled_sum_squares[rescale] / window)
+    return sum_squares
+
+
+def _window_sum_squares(segment: np.ndarray, window: int, step: int) -> np.ndarray:
+    """Sum the squares of the windows of a block of rolling_rms along the last axis"""
+    length = segment.shape[-1]
+    if step >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(segment, window, axis=-1)[..., ::step, :]
+        sum_squares = np.einsum("...ij,...ij->...i", windows, windows)
+    else:
+        # the squares in pieces of window values, padded with zeros to whole pieces
+        flat_shape = segment.shape[:-1] + (-1,)
+        pieces = np.zeros(segment.shape[:-1] + (-(-length // window), window))
+        np.square(segment, out=pieces.reshape(flat_shape)[..., :length])
+        prefixes, suffixes = _piece_sums(pieces)
+
+        # a window is the rest of the piece it starts in plus the start of the next, unless it is a whole piece
+        end = length - window + 1
+        sum_squares = suffixes[..., :end:step] + prefixes[..., window - 1 : end + window - 1 : step]
+        whole = int(np.lcm(step, window))
+        sum_squares[..., :: whole // step] = suffixes[..., :end:whole]
+    return sum_squares
+
+
+def _piece_sums(pieces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the cumulative sums of every piece of squares along the last axis from its start and from its
+    end, flattened along the pieces; the squares are overwritten"""
+    suffixes = np.empty_like(pieces)
+    np.cumsum(pieces[..., ::-1], axis=-1, out=suffixes[..., ::-1])
+    prefixes = np.cumsum(pieces, axis=-1, out=pieces)
+    flat_shape = pieces.shape[:-2] + (-1,)
+    return prefixes.reshape(flat_shape), suffixes.reshape(flat_shape)
+
+
+def _scaled_window_sum_squares(segment: np.ndarray, window: int, step: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum the squares of the windows like _window_sum_squares, with every piece of window values scaled
+    like in rms; return the scale of every window and its sum of squares in that scale"""
+    length = segment.shape[-1]
+    flat_shape = segment.shape[:-1] + (-1,)
+    pieces = np.zeros(segment.shape[:-1] + (-(-length // window), window))
+    pieces.reshape(flat_shape)[..., :length] = segment
+    scales = _scale(np.maximum(pieces.max(axis=-1), -pieces.min(axis=-1)))
+    pieces /= scales[..., None]
+    prefixes, suffixes = _piece_sums(np.square(pieces, out=pieces))
+
+    # a window in the larger scale of the two pieces it covers, the ratios are powers of two
+    starts = np.arange(0, length - window + 1, step)
+    inside = starts % window != 0
+    first = scales[..., starts // window]
+    second = np.where(inside, scales[..., np.minimum(starts // window + 1, scales.shape[-1] - 1)], 0.0)
+    scale = np.maximum(first, second)
+    sum_squares = suffixes[..., starts] * (first / scale) ** 2
+    sum_squares += np.where(inside, prefixes[..., starts + window - 1], 0.0) * (second / scale) ** 2
+    return scale, sum_squares
+
+
+def _signals_along_axis(input_array: np.ndarray, axis: int) -> np.ndarray:
+    """Validate the array like rms, but of any dimension, and view it with the axis last"""
+    if not isinstance(input_array, np.ndarray):
+        raise TypeError("Argument should be a numpy array!")
+
+    if input_array.ndim == 0:
+        raise TypeError("Argument should be at least one dimensional array!")
+
+    if input_array.dtype != np.float64:
+        raise TypeError("Argument numpy array should contain float64 values!")
+
+    if not isinstance(axis, (int, np.integer)) or not -input_array.ndim <= axis < input_array.ndim:
+        raise ValueError("Argument axis should be an axis of the array!")
+
+    return np.moveaxis(input_array, axis, -1)
+
+
+class RmsAccumulator:
+    """Accumulate the rms of a signal which is given in chunks, in constant memory
+
+    The accumulator keeps the number of values and their sum of squares, scaled like in rms so that
+    it does not overflow or underflow. Chunks are added with
+    update, also from memory-mapped arrays, and accumulators of different parts of a signal are
+    combined with merge, e.g. after a parallel or distributed reduction. The values are validated
+    like in rms.
+    """
+
+    def __init__(self) -> None:
+        self._count = 0
+        # Neumaier compensated sum of the scaled squares of the blocks of BLOCK_SIZE values, the
+        # squares summing to scale**2 * (sum of squares + compensation)
+        self._scale = 0.0
+        self._sum_squares = 0.0
+        self._compensation = 0.0
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[np.ndarray]) -> "RmsAccumulator":
+        """Accumulate all chunks of an iterable
+
+        Args:
+            chunks: iterable of one dimensional numpy arrays containing floats
+
+        Returns:
+            the accumulator
+        """
+        accumulator = cls()
+        for chunk in chunks:
+            accumulator.update(chunk)
+        return accumulator
+
+    @classmethod
+    def from_npy(cls, path: str | Path) -> "RmsAccumulator":
+        """Accumulate a one dimensional array in a .npy file, memory-mapped and read block by block
+
+        Args:
+            path: path of the .npy file
+
+        Returns:
+            the accumulator
+        """
+        return cls().update(np.load(path, mmap_mode="r"))
+
+    @property
+    def count(self) -> int:
+        """number of values accumulated so far"""
+        return self._count
+
+    def update(self, chunk: np.ndarray) -> "RmsAccumulator":
+        """Add a chunk of the signal
+
+        Args:
+            chunk: one dimensional numpy array containing floats, may be empty or memory-mapped
+
+        Returns:
+            the accumulator itself
+        """
+        if not isinstance(chunk, np.ndarray):
+            raise TypeError("Argument should be a numpy array!")
+
+        if len(chunk.shape) != 1:
+            raise TypeError("Argument should be one dimensional array!")
+
+        if chunk.dtype != np.float64:
+            raise TypeError("Argument numpy array should contain float64 values!")
+
+        for start in range(0, len(chunk), BLOCK_SIZE):
+            block = np.asarray(chunk[start : start + BLOCK_SIZE])
+            self._add(*_block_scaled_sum_squares(block, chunk), 0.0)
+            self._count += len(block)
+        return self
+
+    def merge(self, other: "RmsAccumulator") -> "RmsAccumulator":
+        """Add the values accumulated by another accumulator
+
+        Args:
+            other: accumulator of another part of the signal
+
+        Returns:
+            the accumulator itself
+        """
+        if not isinstance(other, RmsAccumulator):
+            raise TypeError("Argument should be an RmsAccumulator!")
+
+        # pylint: disable=protected-access
+        self._add(other._scale, other._sum_squares, other._compensation)
+        self._count += other._count
+        return self
+
+    def result(self) -> float:
+        """calculating the rms of all values accumulated so far
+
+        Returns:
+            rms of the accumulated values
+        """
+        if self._count == 0:
+            raise ValueError("Argument numpy array should contain at least one value!")
+
+        return self._scale * float(np.sqrt((self._sum_squares + self._compensation) / self._count))
+
+    def _add(self, scale: float, value: float, compensation: float) -> None:
+        """Add a scaled value to the compensated sum of squares, in the scale of the largest like _combine"""
+        # the scales are powers of two, so the rescaling is exact unless it underflows
+        if scale > self._scale:
+            ratio = (self._scale / scale) ** 2
+            self._scale = scale
+            self._sum_squares *= ratio
+            self._compensation *= ratio
+        elif scale < self._scale:
+            ratio = (scale / self._scale) ** 2
+            value, compensation = value * ratio, compensation * ratio
+
+        total = self._sum_squares + value
+        if abs(self._sum_squares) >= abs(value):
+            self._compensation += (self._sum_squares - total) + value
+        else:
+            self._compensation += (value - total) + self._sum_squares
+        self._compensation += compensation
+        self._sum_squares = total
+
+
+def _check_finite(block: np.ndarray, array: np.ndarray) -> None:
+    """
+    Raise the errors of rms if the block contains inf or nan values.
+
+    An inf anywhere in array, the whole array the block is part of, takes precedence over a nan in the
+    block, as if the whole array is checked for inf before it is checked for nan. The array is checked
+    per block of BLOCK_SIZE values along its first axis.
+    """
+    if np.isinf(block).any():
         raise ValueError("Argument array should not contain inf!")
 
-    if np.isnan(input_array).any():
+    if np.isnan(block).any():
+        for start in range(0, len(array), BLOCK_SIZE):
+            if np.isinf(array[start : start + BLOCK_SIZE]).any():
+                raise ValueError("Argument array should not contain inf!")
         raise ValueError("Argument array should not contain nan!")
-
-    input_array_squared = input_array**2
-    return np.sqrt(np.mean(input_array_squared))
@@ -2,6 +2,13 @@
 A module with simple function
 """
 
+import operator
+from typing import Callable, Iterable
+
+import numpy as np
+
+_INT64 = np.iinfo(np.int64)
+
 
 def add(a: int, b: int) -> int:
     """Add two numbers
@@ -21,3 +28,90 @@ def add(a: int, b: int) -> int:
 def multiply(a: int, b: int) -> int:
     """Multiply two numbers"""
     return a * b
+
+
+def add_arrays(a: np.ndarray | int, b: np.ndarray | int) -> np.ndarray:
+    """Add integer numpy arrays or integers elementwise, with broadcasting
+
+    Args:
+        a: numpy array of integers or integer
+        b: numpy array of integers or integer
+
+    Returns:
+        numpy array of the sums, of int64 or, if a sum does not fit in int64, of exact Python integers
+    """
+    array_a, array_b = _as_integer_array(a), _as_integer_array(b)
+    if object not in (array_a.dtype, array_b.dtype):
+        with np.errstate(over="ignore"):
+            result = array_a + array_b
+        # a sum overflows if and only if its sign differs from the signs of both terms
+        return _with_exact(
+            np.asarray(result), operator.add, array_a, array_b, (array_a ^ result) & (array_b ^ result) < 0
+        )
+    return _narrowed(np.array(array_a.astype(object) + array_b.astype(object), dtype=object))
+
+
+def multiply_arrays(a: np.ndarray | int, b: np.ndarray | int) -> np.ndarray:
+    """Multiply integer numpy arrays or integers elementwise, with broadcasting
+
+    Args:
+        a: numpy array of integers or integer
+        b: numpy array of integers or integer
+
+    Returns:
+        numpy array of the products, of int64 or, if a product does not fit in int64, of exact Python integers
+    """
+    array_a, array_b = _as_integer_array(a), _as_integer_array(b)
+    if object not in (array_a.dtype, array_b.dtype):
+        with np.errstate(over="ignore"):
+            result = array_a * array_b
+        # a product can only overflow where its floating point estimate, accurate to eps, is at least 2**62
+        return _with_exact(
+            np.asarray(result), operator.mul, array_a, array_b, np.abs(array_a * 1.0 * array_b) >= 2.0**62
+        )
+    return _narrowed(np.array(array_a.astype(object) * array_b.astype(object), dtype=object))
+
+
+def _as_integer_array(value: np.ndarray | int) -> np.ndarray:
+    """Return an int64 array of an integer array or integer, or an array of Python integers if it does not fit"""
+    if isinstance(value, (int, np.integer)):
+        # a Python integer array, as numpy would make an unsigned one of integers from 2**63 on
+        value = np.array(int(value), dtype=object)
+    elif not isinstance(value, np.ndarray) or value.dtype.kind not in "iuO":
+        raise TypeError("Arguments should be integers!")
+
+    if value.dtype == object:
+        # e.g. the results of add_arrays and multiply_arrays which do not fit in int64
+        if not all(isinstance(element, (int, np.integer)) for element in value.flat):
+            raise TypeError("Arguments should be integers!")
+        if not _fits_int64(value.flat):
+            return value
+    elif value.dtype == np.uint64 and (value > _INT64.max).any():
+        return value.astype(object)
+    return value.astype(np.int64, copy=False)
+
+
+def _with_exact(
+    result: np.ndarray, operation: Callable, array_a: np.ndarray, array_b: np.ndarray, where: np.ndarray
+) -> np.ndarray:
+    """Replace the int64 results where they may have overflowed by the exact results of Python integers"""
+    if not where.any():
+        return result
+    broadcast_a, broadcast_b = np.broadcast_arrays(array_a, array_b)
+    exact = operation(broadcast_a[where].astype(object), broadcast_b[where].astype(object))
+    # the int64 results wrap around, so they are exact where the exact results fit
+    if _fits_int64(exact):
+        return result
+    values = result.astype(object)
+    values[where] = exact
+    return values
+
+
+def _narrowed(values: np.ndarray) -> np.ndarray:
+    """Return the array of Python integers as an int64 array if they all fit"""
+    return values.astype(np.int64) if _fits_int64(values.flat) else values
+
+
+def _fits_int64(values: Iterable) -> bool:
+    """Whether all integers fit in int64"""
+    return all(_INT64.min <= value <= _INT64.max for value in values)
@@ -1,22 +1,195 @@
 """Module to solve Ax=b"""
 
+import threading
+import warnings
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+
 import numpy as np
 import scipy
 
+from .graph_processing import GraphProcessor
+from .graph_structures import RootedTreeIndex
+from .parallel import thread_map
+
+PERMC_SPECS = ("COLAMD", "MMD_AT_PLUS_A", "MMD_ATA", "NATURAL")
+
+# number of values inspected at a time when a finiteness check fails, bounding its temporaries
+FINITE_CHECK_BLOCK_SIZE = 1 << 16
+
+# average number of vertices per depth below which TreeSolver factorizes with SuperLU instead of level by level
+TREE_LEVEL_SIZE = 256
+
+
+def check_finite(values: np.ndarray, inf_message: str, nan_message: str) -> None:
+    """
+    Raise a ValueError with inf_message or nan_message if the float array contains inf or nan values.
+
+    The sum of the values is finite if and only if they all are, unless it overflows, so the common
+    case takes one pass over the data without temporaries. Only a sum which is not finite is followed
+    by a check of the values in blocks, to tell inf from nan and overflow from either.
+    """
+    with np.errstate(over="ignore", invalid="ignore"):
+        if np.isfinite(values.sum()):
+            return
+
+    rows = values.reshape(len(values), -1)
+    block_rows = max(1, FINITE_CHECK_BLOCK_SIZE // max(1, rows.shape[1]))
+    has_nan = False
+    for start in range(0, len(rows), block_rows):
+        block = rows[start : start + block_rows]
+        if np.isinf(block).any():
+            raise ValueError(inf_message)
+        has_nan = has_nan or bool(np.isnan(block).any())
+
+    if has_nan:
+        raise ValueError(nan_message)
+
+
+def _dense_norm(matrix: np.ndarray, norm: str) -> float:
+    """The 1-norm ("1") or infinity norm ("I") of a dense matrix, computed by LAPACK without copies if contiguous"""
+    (lange,) = scipy.linalg.get_lapack_funcs(("lange",), (matrix,))
+    if matrix.flags.f_contiguous:
+        return float(lange(norm, matrix))
+    if matrix.flags.c_contiguous:
+        # the transpose is Fortran ordered, and its 1-norm is the infinity norm of the matrix
+        return float(lange("I" if norm == "1" else "1", matrix.T))
+    return float(np.abs(matrix).sum(axis=0 if norm == "1" else 1).max())
+
+
+class FillIn(NamedTuple):
+    """
+    Fill-in statistics of a sparse LU factorization.
+
+    Attributes:
+        matrix_nonzeros: number of stored entries of the matrix
+        factor_nonzeros: number of stored entries of L and U together, counting the shared diagonal once
+        ratio: factor_nonzeros / matrix_nonzeros
+    """
+
+    matrix_nonzeros: int
+    factor_nonzeros: int
+    ratio: float
+
+
+def _dense_lu_factor(input_matrix: np.ndarray, overwrite_a: bool) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Factorize a validated dense matrix with LAPACK, returning the LU factorization, the pivots and 1 if
+    it is the factorization of the transpose of the matrix, the trans argument of lu_solve.
+    """
+    # LAPACK works in place on Fortran ordered arrays only, which the transpose of a C ordered one is
+    trans = int(overwrite_a and not input_matrix.flags.f_contiguous and input_matrix.flags.c_contiguous)
+    with warnings.catch_warnings():
+        # a zero pivot is reported as a singular matrix below
+        warnings.simplefilter("ignore", scipy.linalg.LinAlgWarning)
+        lu, piv = scipy.linalg.lu_factor(
+            input_matrix.T if trans else input_matrix, overwrite_a=overwrite_a, check_finite=False
+        )
+
+    if (np.diagonal(lu) == 0).any():
+        raise ValueError("Argument should not be a singular matrix!")
+    return lu, piv, trans
+
+
+def _getrs(
+    factorization: Tuple[np.ndarray, np.ndarray], b: np.ndarray, trans: int = 0, overwrite_b: bool = False
+) -> np.ndarray:
+    """
+    Solve with a dense LU factorization like scipy.linalg.lu_solve, in b itself with overwrite_b if b is
+    one dimensional or Fortran ordered and of the dtype of the factorization.
+
+    The solve consists of the row swaps and triangular solves of LAPACK getrs, with BLAS trsv or trsm.
+    getrs of OpenBLAS itself corrupts memory when several threads call it at once (seen with OpenBLAS
+    0.3.30), as they do when a solver is shared between threads.
+    """
+    lu, piv = factorization
+    in_place = overwrite_b and b.dtype == lu.dtype and (b.flags.f_contiguous or b.ndim == 1 and b.flags.c_contiguous)
+    x = b if in_place else np.array(b, dtype=lu.dtype, order="F")
+    (laswp,) = scipy.linalg.get_lapack_funcs(("laswp",), (lu,))
+    if x.ndim == 1:
+        (trsv,) = scipy.linalg.get_blas_funcs(("trsv",), (lu,))
+
+        def triangular_solve(y: np.ndarray, lower: int, diag: int) -> np.ndarray:
+            return trsv(lu, y, lower=lower, trans=trans, diag=diag, overwrite_x=1)
+
+    else:
+        (trsm,) = scipy.linalg.get_blas_funcs(("trsm",), (lu,))
+
+        def triangular_solve(y: np.ndarray, lower: int, diag: int) -> np.ndarray:
+            return trsm(1.0, lu, y, lower=lower, trans_a=trans, diag=diag, overwrite_b=1)
 
-# pylint: disable=too-few-public-methods
+    # A = P L U, and A^T = U^T L^T P^T
+    if trans:
+        x = triangular_solve(triangular_solve(x, lower=0, diag=0), lower=1, diag=1)
+        x = laswp(x.reshape(len(x), -1, order="F"), piv, inc=-1, overwrite_a=1)
+    else:
+        x = laswp(x.reshape(len(x), -1, order="F"), piv, overwrite_a=1).reshape(b.shape, order="F")
+        x = triangular_solve(triangular_solve(x, lower=1, diag=1), lower=0, diag=0)
+    return x.reshape(b.shape, order="F")
+
+
+class _Woodbury(NamedTuple):
+    """
+    Accumulated low-rank update A + U V^T of a factorized matrix A, see LUSolver.update.
+
+    Attributes:
+        u: (n, k) matrix U
+        v: (n, k) matrix V
+        z: (n, k) matrix A^-1 U
+        capacitance: LU factorization of the (k, k) capacitance matrix I + V^T A^-1 U
+    """
+
+    u: np.ndarray
+    v: np.ndarray
+    z: np.ndarray
+    capacitance: Tuple[np.ndarray, np.ndarray]
+
+
+# pylint: disable=too-many-instance-attributes
 class LUSolver:
     """Class to solve Ax=b using matrix factorization"""
 
-    def __init__(self, input_matrix: np.ndarray):
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        input_matrix: np.ndarray | scipy.sparse.sparray | scipy.sparse.spmatrix,
+        permc_spec: str = "COLAMD",
+        rcond_threshold: float | None = None,
+        max_update_rank: int = 32,
+        mixed_precision: bool = False,
+        max_refinement_iterations: int = 30,
+        overwrite_a: bool = False,
+        check_finite_values: bool = True,
+    ):
         """
         Constructor of the class. It takes the input matrix and decompose it into LU factorization.
         Store the factorization and permutation into class members.
+
+        A scipy.sparse matrix is factorized with the sparse LU of SuperLU instead, which reorders the
+        columns to reduce the fill-in with permc_spec, one of "COLAMD", "MMD_AT_PLUS_A", "MMD_ATA" or "NATURAL".
+
+        The matrix is singular if the factorization has a zero pivot. With rcond_threshold, a matrix
+        whose estimated reciprocal condition number (see rcond) is below it is rejected as well.
+
+        max_update_rank is the accumulated rank of low-rank updates after which the matrix is
+        factorized again, see update.
+
+        With mixed_precision, a dense matrix is factorized in float32, which takes half the memory of a
+        float64 factorization and about half the time. The float64 matrix is kept to refine every solution
+        with residual corrections until it is accurate to float64 precision, see refinement_iterations.
+        If that takes more than max_refinement_iterations steps, or the float32 factorization fails, the
+        matrix is factorized in float64 instead and used from then on.
+
+        With overwrite_a, a dense matrix is factorized in place and must not be used by the caller afterwards.
+        Both C and Fortran ordered float64 arrays are factorized without copies; a C ordered array is
+        factorized as its transpose, which solve takes into account. With mixed precision, the matrix is
+        kept for the refinement instead of a copy. check_finite_values=False skips the check for inf and
+        nan values, for matrices which are known to be finite.
         """
-        if not isinstance(input_matrix, np.ndarray):
-            raise TypeError("Argument should be a numpy array!")
+        is_sparse = scipy.sparse.issparse(input_matrix)
+        if not isinstance(input_matrix, np.ndarray) and not is_sparse:
+            raise TypeError("Argument should be a numpy array or a scipy sparse matrix!")
 
-        if len(input_matrix) == 0:
+        if input_matrix.shape[0] == 0:
             raise ValueError("Argument should contain at least 1 value!")
 
         if input_matrix.shape[0] != input_matrix.shape[1]:
@@ -25,37 +198,714 @@ class LUSolver:
         if input_matrix.dtype != np.float64:
             raise ValueError("Argument should contain float64 values!")
 
-        if np.isinf(input_matrix).any():
-            raise ValueError("Argument should not contain inf values!")
+        if is_sparse:
+            input_matrix = scipy.sparse.csc_array(input_matrix)
+            input_matrix.sum_duplicates()
+        values = np.asarray(input_matrix.data if is_sparse else input_matrix)
+        if check_finite_values:
+            check_finite(values, "Argument should not contain inf values!", "Argument should not contain nan values!")
 
-        if np.isnan(input_matrix).any():
-            raise ValueError("Argument should not contain nan values!")
+        if mixed_precision and is_sparse:
+            raise ValueError("Argument mixed_precision is only supported for dense matrices!")
 
-        if scipy.linalg.det(input_matrix) == 0:
-            raise ValueError("Argument should not be a singular matrix!")
+        self._size = input_matrix.shape[0]
+        self._permc_spec = permc_spec
+        self._rcond_threshold = rcond_threshold
+        self._max_update_rank = max_update_rank
+        self._max_refinement_iterations = max_refinement_iterations
+        # the float64 matrix next to its float32 factorization, None without mixed precision
+        self._refined_matrix: np.ndarray | None = None
+        self._refinement_iterations = 0
+        # guards the switch from the float32 to the float64 factorization against concurrent solves
+        self._lock = threading.Lock()
+        self._woodbury: _Woodbury | None = None
+        self._matrix: scipy.sparse.csc_array | None = None
+        self._splu: scipy.sparse.linalg.SuperLU | None = None
+        self._fill_in: FillIn | None = None
+        self._rcond: float | None = None
+        # 1 if the factorization is of the transpose of the matrix, the trans argument of lu_solve
+        self._trans = 0
+        # the 1-norm of the matrix, to estimate the condition number from the factorization
+        if is_sparse:
+            self._norm = float(abs(input_matrix).sum(axis=0).max())
+            self._factorize_sparse(input_matrix, permc_spec)
+        else:
+            self._norm = _dense_norm(input_matrix, "1")
+            overwrite_a = overwrite_a and input_matrix.flags.writeable
+            if mixed_precision:
+                self._factorize_mixed(input_matrix, overwrite_a)
+            else:
+                self._factorize_dense(input_matrix, overwrite_a)
 
-        self._lu, self._piv = scipy.linalg.lu_factor(input_matrix)
+        if rcond_threshold is not None and self.rcond < rcond_threshold:
+            raise ValueError(
+                f"Argument should not be an ill-conditioned matrix, rcond {self.rcond:.3g} is below {rcond_threshold}!"
+            )
 
-    def solve(self, b: np.ndarray) -> np.ndarray:
+    def _factorize_dense(self, input_matrix: np.ndarray, overwrite_a: bool) -> None:
+        """Factorize a validated dense matrix with LAPACK and estimate its reciprocal condition number"""
+        self._lu, self._piv, self._trans = _dense_lu_factor(input_matrix, overwrite_a)
+        self._rcond = self._estimate_rcond(self._lu, self._trans)
+
+    def _estimate_rcond(self, lu: np.ndarray, trans: int) -> float:
+        """Estimate the reciprocal condition number of the matrix from a dense factorization with LAPACK"""
+        (gecon,) = scipy.linalg.get_lapack_funcs(("gecon",), (lu,))
+        # the 1-norm of the matrix is the infinity norm of its transpose
+        rcond, _ = gecon(lu, self._norm, norm="I" if trans else "1")
+        return float(rcond)
+
+    def _factorize_mixed(self, input_matrix: np.ndarray, overwrite_a: bool) -> None:
+        """Factorize a validated dense matrix in float32, or in float64 if that fails"""
+        if self._max_refinement_iterations < 0:
+            raise ValueError("Argument max_refinement_iterations should not be negative!")
+
+        with warnings.catch_warnings():
+            # float32 overflow and zero pivots make the factorization fall back to float64
+            warnings.simplefilter("ignore", scipy.linalg.LinAlgWarning)
+            warnings.simplefilter("ignore", RuntimeWarning)
+            lu, piv = scipy.linalg.lu_factor(
+                input_matrix.astype(np.float32, order="F"), overwrite_a=True, check_finite=False
+            )
+
+        if not np.isfinite(lu).all() or (np.diagonal(lu) == 0).any():
+            self._factorize_dense(input_matrix, overwrite_a)
+            return
+
+        self._lu, self._piv = lu, piv
+        self._refined_matrix = input_matrix if overwrite_a else input_matrix.copy()
+        # refinement stops once |b - A x| <= |x| |A| eps sqrt(n) in the infinity norm, as in LAPACK dsgesv
+        epsilon = np.finfo(np.float64).eps  # pylint: disable=no-member
+        self._refinement_tolerance = _dense_norm(input_matrix, "I") * epsilon * np.sqrt(self._size)
+        self._rcond = self._estimate_rcond(lu, 0)
+
+    def _factorize_sparse(self, input_matrix: scipy.sparse.csc_array, permc_spec: str) -> None:
+        """Factorize a validated sparse matrix with SuperLU and record the fill-in"""
+        if permc_spec not in PERMC_SPECS:
+            raise ValueError(f"Argument permc_spec should be one of {', '.join(PERMC_SPECS)}!")
+
+        # kept to factorize again after low-rank updates
+        self._matrix = input_matrix
+        try:
+            self._splu = scipy.sparse.linalg.splu(input_matrix, permc_spec=permc_spec)
+        except RuntimeError as error:
+            raise ValueError("Argument should not be a singular matrix!") from error
+
+        factor_nonzeros = self._splu.L.nnz + self._splu.U.nnz - self._size
+        self._fill_in = FillIn(input_matrix.nnz, factor_nonzeros, factor_nonzeros / input_matrix.nnz)
+
+    @property
+    def rcond(self) -> float:
+        """
+        Estimate of the reciprocal condition number 1 / (|A|_1 |A^-1|_1) of the matrix, between 0 and 1.
+        Values close to the machine precision mean that the solutions lose all accuracy.
+        It refers to the matrix of the last full factorization, without low-rank updates since.
+
+        For dense matrices it is computed by LAPACK (dgecon) from the factorization. For sparse matrices
+        the same kind of estimate of |A^-1|_1 is made with a few solves, on first use.
+        """
+        if self._rcond is None:
+            splu: scipy.sparse.linalg.SuperLU = self._splu
+            inverse = scipy.sparse.linalg.LinearOperator(
+                (self._size, self._size),
+                matvec=splu.solve,
+                rmatvec=lambda x: splu.solve(x, trans="T"),
+                dtype=np.float64,
+            )
+            self._rcond = 1.0 / (self._norm * scipy.sparse.linalg.onenormest(inverse))
+        return self._rcond
+
+    @property
+    def mixed_precision(self) -> bool:
+        """Whether solutions come from a float32 factorization with refinement, see the constructor"""
+        return self._refined_matrix is not None
+
+    @property
+    def refinement_iterations(self) -> int:
+        """
+        Number of residual corrections in the last call of solve, solve_parallel or update, the largest
+        over all right-hand sides. It is 0 without mixed precision.
+        """
+        return self._refinement_iterations
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Number of bytes held by the solver: the factorization, the matrix kept for mixed precision or
+        for sparse low-rank updates, and the accumulated low-rank updates. For a sparse factorization
+        the size of L and U is estimated from their number of entries, with an int32 row index each.
+        """
+        arrays = [] if self._woodbury is None else [self._woodbury.u, self._woodbury.v, self._woodbury.z]
+        if self._splu is not None and self._fill_in is not None and self._matrix is not None:
+            arrays += [self._matrix.data, self._matrix.indices, self._matrix.indptr]
+            factor_bytes = self._fill_in.factor_nonzeros * (np.dtype(np.float64).itemsize + 4) + 16 * self._size
+        else:
+            arrays += [self._lu, self._piv] + ([] if self._refined_matrix is None else [self._refined_matrix])
+            factor_bytes = 0
+        return factor_bytes + sum(array.nbytes for array in arrays)
+
+    @property
+    def fill_in(self) -> FillIn | None:
+        """Fill-in statistics of the sparse factorization, None for a dense matrix"""
+        return self._fill_in
+
+    def solve(self, b: np.ndarray, out: np.ndarray | None = None, check_finite_values: bool = True) -> np.ndarray:
         """
         Solve the linear equation with the input matrix and the given vector b.
+        b can also be a matrix of shape (n, k) with k right-hand sides as its columns,
+        which are solved together in one call. The solution has the same shape as b.
+
+        The solution is written into out if given, a float64 array of the same shape as b, which is
+        returned. out may be b itself to solve in place. For a dense float64 factorization, LAPACK then
+        solves in out directly if it is one dimensional or Fortran ordered, without other copies of b.
+        check_finite_values=False skips the check for inf and nan values.
+
+        Several threads may solve with the same solver at once, but not while it is updated.
+        """
+        x, self._refinement_iterations = self._solve(b, out, check_finite_values)
+        return x
+
+    def _solve(self, b: np.ndarray, out: np.ndarray | None, check_finite_values: bool) -> Tuple[np.ndarray, int]:
+        """Validate b and solve, returning the solution and the number of refinement iterations"""
+        if not isinstance(b, np.ndarray):
+            raise TypeError("Argument should be a numpy array!")
+
+        if b.ndim not in (1, 2):
+            raise TypeError("Argument should be a one or two dimensional array!")
+
+        if b.dtype != np.float64:
+            raise TypeError("Argument numpy array should contain float64 values!")
+
+        if b.shape[0] != self._size:
+            raise ValueError("Argument should be the same size as the matrix!")
+
+        if out is not None and (
+            not isinstance(out, np.ndarray)
+            or out.dtype != np.float64
+            or out.shape != b.shape
+            or not out.flags.writeable
+        ):
+            raise ValueError("Argument out should be a writeable float64 numpy array of the same shape as b!")
+
+        if check_finite_values:
+            check_finite(b, "Argument array should not contain inf!", "Argument array should not contain nan!")
+
+        iterations = 0
+        # once the float64 factorization is used, it stays in use
+        if out is not None and self._splu is None and self._refined_matrix is None:
+            if out is not b:
+                np.copyto(out, b)
+            x = self._lu_solve(out, overwrite_b=True)
+        else:
+            x, iterations = self._factorization_solve(b)
+
+        if self._woodbury is not None:
+            # Sherman-Morrison-Woodbury: (A + U V^T)^-1 b = x - A^-1 U (I + V^T A^-1 U)^-1 V^T x with x = A^-1 b
+            x -= self._woodbury.z @ _getrs(self._woodbury.capacitance, self._woodbury.v.T @ x)
+
+        if out is not None and x is not out:
+            # LAPACK solved in a copy, or the solution came from elsewhere
+            np.copyto(out, x)
+            x = out
+        return x, iterations
+
+    def _dense_factorization(self) -> Tuple[np.ndarray, np.ndarray, int, np.ndarray | None]:
+        """The dense LU factorization, pivots, trans and the matrix to refine with, from the same moment"""
+        with self._lock:
+            return self._lu, self._piv, self._trans, self._refined_matrix
+
+    def _factorization_solve(self, b: np.ndarray) -> Tuple[np.ndarray, int]:
+        """Solve with the factorization only, ignoring low-rank updates, and count the refinement iterations"""
+        if self._splu is not None:
+            return self._splu.solve(b), 0
+
+        lu, piv, trans, matrix = self._dense_factorization()
+        if matrix is not None:
+            x, iterations = self._refined_solve(b, (lu, piv), matrix)
+            if x is not None:
+                return x, iterations
+
+            lu, piv, trans = self._fall_back(matrix)
+
+        return _getrs((lu, piv), b, trans), 0
+
+    def _fall_back(self, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Replace the float32 factorization by a float64 one when refinement diverges or stalls, as LAPACK
+        dsgesv does, and return it. The matrix is factorized into new arrays, as other threads may still
+        refine with it, and the state changes only once that succeeds. The first thread to fall back
+        factorizes while the others wait for its result.
+        """
+        with self._lock:
+            if self._refined_matrix is matrix:
+                lu, piv, trans = _dense_lu_factor(matrix, overwrite_a=False)
+                self._rcond = self._estimate_rcond(lu, trans)
+                self._lu, self._piv, self._trans, self._refined_matrix = lu, piv, trans, None
+            return self._lu, self._piv, self._trans
+
+    def _lu_solve(self, b: np.ndarray, overwrite_b: bool = False) -> np.ndarray:
+        """Solve with the dense factorization, in b itself with overwrite_b if LAPACK can"""
+        lu, piv, trans, _ = self._dense_factorization()
+        return _getrs((lu, piv), b, trans, overwrite_b)
+
+    def _refined_solve(
+        self, b: np.ndarray, factorization: Tuple[np.ndarray, np.ndarray], matrix: np.ndarray
+    ) -> Tuple[np.ndarray | None, int]:
+        """
+        Solve with the float32 factorization and correct x by the solutions for the residuals b - A x,
+        until they are small enough for every right-hand side. Return x and the number of corrections,
+        or None if that does not happen within max_refinement_iterations corrections.
+        """
+        with np.errstate(over="ignore", invalid="ignore"):
+            x = _getrs(factorization, b.astype(np.float32, order="F"), overwrite_b=True).astype(np.float64)
+            for iteration in range(self._max_refinement_iterations + 1):
+                residual = b - matrix @ x
+                if (np.abs(residual).max(axis=0) <= self._refinement_tolerance * np.abs(x).max(axis=0)).all():
+                    return x, iteration
+
+                if not np.isfinite(residual).all():
+                    break
+
+                x += _getrs(factorization, residual.astype(np.float32, order="F"), overwrite_b=True)
+        return None, self._max_refinement_iterations
+
+    @property
+    def update_rank(self) -> int:
+        """Accumulated rank of the low-rank updates since the last full factorization"""
+        return 0 if self._woodbury is None else self._woodbury.u.shape[1]
+
+    def update(self, u: np.ndarray, v: np.ndarray) -> None:
+        """
+        Update the matrix A to A + U V^T, for U and V of shape (n, k), or (n,) for a rank-1 update.
+
+        The factorization is kept and solve corrects its solutions with the Sherman-Morrison-Woodbury
+        formula, so an update costs O(n^2 k) instead of O(n^3) and a solve O(n K) more for the
+        accumulated rank K. Once K exceeds max_update_rank, the updated matrix is factorized again.
+        If the updated matrix is singular an exception is raised and the solver is left unchanged.
+        """
+        for argument in (u, v):
+            if not isinstance(argument, np.ndarray):
+                raise TypeError("Argument should be a numpy array!")
+
+            if argument.dtype != np.float64:
+                raise TypeError("Argument numpy array should contain float64 values!")
+
+        if u.shape != v.shape or u.ndim not in (1, 2) or u.shape[0] != self._size:
+            raise ValueError("Arguments should have the same shape, with as many rows as the matrix!")
+
+        for argument in (u, v):
+            check_finite(
+                argument,
+                "Argument array should not contain inf or nan!",
+                "Argument array should not contain inf or nan!",
+            )
+
+        self._update(u.reshape(self._size, -1), v.reshape(self._size, -1))
+
+    def update_entries(self, rows: np.ndarray, cols: np.ndarray, deltas: np.ndarray) -> None:
+        """
+        Add deltas to the entries (rows, cols) of the matrix, see update.
+        The rank of the update is the number of different rows; entries which occur twice are added up.
+        """
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        deltas = np.asarray(deltas, dtype=np.float64)
+        if not rows.shape == cols.shape == deltas.shape or rows.ndim != 1:
+            raise ValueError("Arguments should be one dimensional arrays of the same length!")
+
+        for indices in (rows, cols):
+            if not np.issubdtype(indices.dtype, np.integer) or ((indices < 0) | (indices >= self._size)).any():
+                raise ValueError("Argument should contain row and column indices of the matrix!")
+
+        check_finite(
+            deltas, "Argument array should not contain inf or nan!", "Argument array should not contain inf or nan!"
+        )
+
+        unique_rows, update_of_entry = np.unique(rows, return_inverse=True)
+        u = np.zeros((self._size, len(unique_rows)))
+        u[unique_rows, np.arange(len(unique_rows))] = 1.0
+        v = np.zeros((self._size, len(unique_rows)))
+        np.add.at(v, (cols, update_of_entry), deltas)
+        self._update(u, v)
+
+    def _update(self, u: np.ndarray, v: np.ndarray) -> None:
+        """Add the validated update U V^T to the accumulated one, or factorize again past max_update_rank"""
+        z, self._refinement_iterations = self._factorization_solve(u)
+        if self._woodbury is not None:
+            u = np.hstack([self._woodbury.u, u])
+            v = np.hstack([self._woodbury.v, v])
+            z = np.hstack([self._woodbury.z, z])
+
+        if u.shape[1] > self._max_update_rank:
+            self._refactorize(u, v)
+            return
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", scipy.linalg.LinAlgWarning)
+            capacitance = scipy.linalg.lu_factor(np.eye(u.shape[1]) + v.T @ z, check_finite=False)
+
+        if (np.diagonal(capacitance[0]) == 0).any():
+            raise ValueError("Argument should not make the matrix singular!")
+
+        self._woodbury = _Woodbury(u, v, z, capacitance)
+
+    def _refactorize(self, u: np.ndarray, v: np.ndarray) -> None:
+        """Factorize the matrix with the update U V^T applied from scratch, replacing the whole state"""
+        if self._matrix is not None:
+            matrix = self._matrix + scipy.sparse.csc_array(u) @ scipy.sparse.csc_array(v.T)
+        else:
+            matrix = self._dense_matrix() + u @ v.T
+
+        try:
+            solver = LUSolver(
+                matrix,
+                self._permc_spec,
+                self._rcond_threshold,
+                self._max_update_rank,
+                self.mixed_precision,
+                self._max_refinement_iterations,
+                overwrite_a=True,
+            )
+        except ValueError as error:
+            raise ValueError("Argument should not make the matrix singular!") from error
+        self.__dict__.update(solver.__dict__)
+
+    def _dense_matrix(self) -> np.ndarray:
+        """Reconstruct the dense matrix P L U from its factorization, or return the kept float64 matrix"""
+        if self._refined_matrix is not None:
+            return self._refined_matrix
+
+        lower = np.tril(self._lu, -1)
+        np.fill_diagonal(lower, 1.0)
+        # LAPACK swapped row i with row piv[i] in turn
+        rows = np.arange(self._size)
+        for i, pivot in enumerate(self._piv.tolist()):
+            rows[[i, pivot]] = rows[[pivot, i]]
+        matrix = np.empty_like(self._lu)
+        matrix[rows] = lower @ np.triu(self._lu)
+        return matrix.T if self._trans else matrix
+
+    def solve_stream(self, vectors: Iterable[np.ndarray], block_size: int = 256) -> Iterator[np.ndarray]:
+        """
+        Solve the linear equation for a stream of vectors b, yielding the solutions in the same order.
+        The vectors are collected in blocks of block_size columns, which are solved together.
+        """
+        if block_size < 1:
+            raise ValueError("Block size should be at least 1!")
+
+        n = self._size
+        block = np.empty((n, block_size), dtype=np.float64, order="F")
+        count = 0
+        for b in vectors:
+            if not isinstance(b, np.ndarray):
+                raise TypeError("Argument should be a numpy array!")
+
+            if b.shape != (n,):
+                raise ValueError("Argument should be a one dimensional array of the same size as the matrix!")
+
+            if b.dtype != np.float64:
+                raise TypeError("Argument numpy array should contain float64 values!")
+
+            block[:, count] = b
+            count += 1
+            if count == block_size:
+                yield from self.solve(block).T
+                count = 0
+
+        if count > 0:
+            yield from self.solve(block[:, :count]).T
+
+    def solve_parallel(
+        self, right_hand_sides: Iterable[np.ndarray], n_workers: int | None = None, blas_threads: int | None = None
+    ) -> List[np.ndarray]:
+        """
+        Solve many independent sets of right-hand sides, each a vector or an (n, k) matrix as for solve,
+        in a pool of n_workers threads, and return the solutions in the same order.
+
+        While the pool runs, the BLAS threads are limited to blas_threads, by default the cores divided
+        over the workers, so that the workers do not compete with the BLAS threads; see parallel.thread_map.
+        LAPACK releases the GIL while it solves, so the workers run at the same time. Use solve with all
+        right-hand sides in one matrix instead when they fit in memory together.
+        """
+        results = thread_map(lambda b: self._solve(b, None, True), right_hand_sides, n_workers, blas_threads)
+        self._refinement_iterations = max((iterations for _, iterations in results), default=0)
+        return [x for x, _ in results]
+
+
+class BatchLUSolver:
+    """
+    Class to solve a stack of independent small systems A[i] x[i] = b[i] at once.
+
+    All matrices are factorized together by LU decomposition with partial pivoting, one column
+    at a time with vectorized operations over the whole stack. A singular matrix does not stop
+    the others: it is reported in singular and its solutions are nan.
+    """
+
+    def __init__(self, input_matrices: np.ndarray):
+        """
+        Constructor of the class. It takes a (batch, m, m) stack of matrices and decompose them into
+        LU factorizations, stored in the same format as scipy.linalg.lu_factor.
+        """
+        if not isinstance(input_matrices, np.ndarray):
+            raise TypeError("Argument should be a numpy array!")
+
+        if input_matrices.ndim != 3:
+            raise ValueError("Argument should be a three dimensional array of matrices!")
+
+        if input_matrices.size == 0:
+            raise ValueError("Argument should contain at least 1 value!")
+
+        if input_matrices.shape[1] != input_matrices.shape[2]:
+            raise ValueError("Argument should contain square matrices!")
+
+        if input_matrices.dtype != np.float64:
+            raise ValueError("Argument should contain float64 values!")
+
+        check_finite(
+            input_matrices, "Argument should not contain inf values!", "Argument should not contain nan values!"
+        )
+
+        lu = input_matrices.copy()
+        batch, size, _ = lu.shape
+        elements = np.arange(batch)
+        self._piv = np.empty((batch, size), dtype=np.int64)
+        for k in range(size):
+            pivot_rows = k + np.argmax(np.abs(lu[:, k:, k]), axis=1)
+            self._piv[:, k] = pivot_rows
+            lu[elements, k], lu[elements, pivot_rows] = lu[elements, pivot_rows], lu[elements, k]
+
+            pivots = lu[:, k, k]
+            # a zero pivot means the whole column below is zero, nothing to eliminate
+            lu[:, k + 1 :, k] /= np.where(pivots == 0, 1.0, pivots)[:, None]
+            lu[:, k + 1 :, k + 1 :] -= lu[:, k + 1 :, k, None] * lu[:, None, k, k + 1 :]
+
+        self._lu = lu
+        self._singular = (np.diagonal(lu, axis1=1, axis2=2) == 0).any(axis=1)
+
+    @property
+    def singular(self) -> np.ndarray:
+        """Boolean array telling which of the matrices are singular"""
+        return self._singular
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        """
+        Solve all linear equations with the given (batch, m) stack of vectors b, or (batch, m, k)
+        stack of matrices of right-hand sides. The solutions of singular matrices are nan.
         """
         if not isinstance(b, np.ndarray):
             raise TypeError("Argument should be a numpy array!")
 
-        if len(b.shape) != 1:
-            raise TypeError("Argument should be one dimensional array!")
+        if b.ndim not in (2, 3):
+            raise TypeError("Argument should be a two or three dimensional array!")
 
         if b.dtype != np.float64:
             raise TypeError("Argument numpy array should contain float64 values!")
 
-        if b.shape[0] != self._lu.shape[0]:
+        if b.shape[:2] != self._lu.shape[:2]:
+            raise ValueError("Argument should have the same batch size and size as the matrices!")
+
+        check_finite(b, "Argument array should not contain inf!", "Argument array should not contain nan!")
+
+        x = b.reshape(b.shape[0], b.shape[1], -1).copy()
+        lu = self._lu
+        elements = np.arange(len(x))
+        size = lu.shape[1]
+        # the rows of L are in the final pivot order, so all interchanges go before the substitution
+        for k in range(size):
+            pivot_rows = self._piv[:, k]
+            x[elements, k], x[elements, pivot_rows] = x[elements, pivot_rows], x[elements, k]
+        for k in range(size):
+            x[:, k + 1 :] -= lu[:, k + 1 :, k, None] * x[:, None, k]
+
+        diagonal = np.where(self._singular[:, None], 1.0, np.diagonal(lu, axis1=1, axis2=2))
+        for k in reversed(range(size)):
+            x[:, k] /= diagonal[:, k, None]
+            x[:, :k] -= lu[:, :k, k, None] * x[:, None, k]
+
+        x[self._singular] = np.nan
+        return x.reshape(b.shape)
+
+
+class _TreeLevel(NamedTuple):
+    """
+    The vertices at one depth of a rooted tree, as a slice of the vertices ordered by depth in which
+    the children of a parent are next to each other. All vertices are given by their position in that order.
+
+    Attributes:
+        start: position of the first vertex at the depth
+        end: position after the last vertex at the depth
+        parents: position of the parent of every vertex
+        group_starts: offsets from start where the children of the next parent start
+        group_parents: position of the parent of every group
+    """
+
+    start: int
+    end: int
+    parents: np.ndarray
+    group_starts: np.ndarray
+    group_parents: np.ndarray
+
+
+def _tree_levels(tree: RootedTreeIndex) -> Tuple[np.ndarray, int, List[_TreeLevel]]:
+    """Return the vertices of a tree index ordered by depth, the number of roots and the levels below them"""
+    # in pre-order, the vertices at one depth are grouped by parent
+    by_depth = tree.order[np.argsort(tree.depth[tree.order], kind="stable")]
+    position = np.empty_like(by_depth)
+    position[by_depth] = np.arange(len(by_depth))
+    level_starts = np.searchsorted(tree.depth[by_depth], np.arange(tree.depth.max() + 2)).tolist()
+    levels = []
+    for start, end in zip(level_starts[1:-1], level_starts[2:]):
+        parents = position[tree.parent[by_depth[start:end]]]
+        group_starts = np.flatnonzero(np.r_[True, parents[1:] != parents[:-1]])
+        levels.append(_TreeLevel(start, end, parents, group_starts, parents[group_starts]))
+    return by_depth, level_starts[1], levels
+
+
+class TreeSolver:
+    """
+    Class to solve the weighted Laplacian system of a radial network in O(n).
+
+    For the enabled edges of a GraphProcessor with weights w (e.g. admittances) and optional vertex
+    weights d (e.g. shunt admittances), the system has one equation per vertex. Every source vertex
+    s is fixed to its right-hand side, x[s] = b[s]; every other vertex v balances its edges:
+    d[v] x[v] + sum of w[e] (x[v] - x[u]) over the edges e = (v, u) of v = b[v].
+
+    As the edges form a tree, the children of a vertex are eliminated into it from the leaves up
+    (forward sweep) and the solution follows from the sources down (backward sweep), without fill-in.
+    The vertices are stored by depth, so both sweeps handle a whole level as one slice and the time
+    is O(n) plus a small overhead per level. Deep trees with fewer than TREE_LEVEL_SIZE vertices per
+    level on average, e.g. long feeders, are factorized with SuperLU instead, in reverse pre-order
+    so that the children are eliminated before their parents without fill-in.
+    """
+
+    def __init__(
+        self, graph_processor: GraphProcessor, edge_weights: np.ndarray, vertex_weights: np.ndarray | None = None
+    ):
+        """
+        Constructor of the class. It takes the tree of the graph processor as it is now, so it does not
+        follow later switching, and eliminates the vertices with the weights.
+
+        Args:
+            graph_processor: graph processor of the network
+            edge_weights: weight of every edge in the order of graph_processor.edge_ids, disabled edges are ignored
+            vertex_weights: weight of every vertex in the order of graph_processor.vertex_ids, ignored for
+                the sources, zero if not given
+        """
+        tree = graph_processor.tree
+        n_vertices = len(graph_processor.vertex_ids)
+        if vertex_weights is None:
+            vertex_weights = np.zeros(n_vertices)
+
+        for weights, size in ((edge_weights, len(graph_processor.edge_ids)), (vertex_weights, n_vertices)):
+            if not isinstance(weights, np.ndarray):
+                raise TypeError("Argument should be a numpy array!")
+
+            if weights.dtype != np.float64:
+                raise ValueError("Argument should contain float64 values!")
+
+            if weights.shape != (size,):
+                raise ValueError("Argument should have one weight per edge or vertex!")
+
+            check_finite(weights, "Argument should not contain inf values!", "Argument should not contain nan values!")
+
+        # the tree in vertex positions, for matrix
+        self._parent = tree.parent.copy()
+        self._is_root = self._parent < 0
+        non_roots = np.flatnonzero(~self._is_root)
+        # the weight of the edge to the parent of every vertex
+        self._weight = np.zeros(n_vertices)
+        self._weight[non_roots] = edge_weights[tree.parent_edge[non_roots]]
+        self._vertex_weights = np.where(self._is_root, 0.0, vertex_weights)
+
+        self._splu: scipy.sparse.linalg.SuperLU | None = None
+        if n_vertices < TREE_LEVEL_SIZE * (int(tree.depth.max()) + 1):
+            self._order = tree.order[::-1].copy()
+            self._factorize_sparse()
+        else:
+            self._order, self._n_roots, self._levels = _tree_levels(tree)
+            self._factorize()
+
+    def _factorize(self) -> None:
+        """Eliminate the vertices from the leaves up, keeping the pivots and the multipliers w / pivot by depth"""
+        weight = self._weight[self._order]
+        pivots = self._vertex_weights[self._order] + weight
+        if self._levels:
+            parents = np.concatenate([level.parents for level in self._levels])
+            pivots += np.bincount(parents, weight[self._n_roots :], minlength=len(pivots))
+
+        for level in reversed(self._levels):
+            level_pivots = pivots[level.start : level.end]
+            if (level_pivots == 0).any():
+                raise ValueError("Argument weights should not make the matrix singular!")
+            pivots[level.group_parents] -= np.add.reduceat(
+                weight[level.start : level.end] ** 2 / level_pivots, level.group_starts
+            )
+
+        pivots[: self._n_roots] = 1.0
+        self._pivots = pivots[:, None]
+        self._multipliers = (weight / pivots)[:, None]
+
+    def _factorize_sparse(self) -> None:
+        """Factorize the matrix in reverse pre-order with SuperLU, keeping the pivots on the diagonal"""
+        matrix = self.matrix()[self._order][:, self._order]
+        try:
+            self._splu = scipy.sparse.linalg.splu(matrix.tocsc(), permc_spec="NATURAL", diag_pivot_thresh=0.0)
+        except RuntimeError as error:
+            raise ValueError("Argument weights should not make the matrix singular!") from error
+
+    def matrix(self) -> scipy.sparse.csr_array:
+        """Return the matrix of the system as a sparse matrix, see the class description"""
+        n_vertices = len(self._parent)
+        children = np.flatnonzero(~self._is_root)
+        parents = self._parent[children]
+        weights = self._weight[children]
+        diagonal = self._vertex_weights + self._weight
+        diagonal += np.bincount(parents, weights, minlength=n_vertices)
+        diagonal[self._is_root] = 1.0
+        # the rows of the sources only have their diagonal entry
+        keep_lower = ~self._is_root[parents]
+        rows = np.concatenate([np.arange(n_vertices), children, parents[keep_lower]])
+        cols = np.concatenate([np.arange(n_vertices), parents, children[keep_lower]])
+        values = np.concatenate([diagonal, -weights, -weights[keep_lower]])
+        return scipy.sparse.csr_array((values, (rows, cols)), shape=(n_vertices, n_vertices))
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        """
+        Solve the system for the given vector b in the order of the vertex ids, or a matrix of
+        shape (n, k) with k right-hand sides as its columns. The solution has the same shape as b.
+        """
+        if not isinstance(b, np.ndarray):
+            raise TypeError("Argument should be a numpy array!")
+
+        if b.ndim not in (1, 2):
+            raise TypeError("Argument should be a one or two dimensional array!")
+
+        if b.dtype != np.float64:
+            raise TypeError("Argument numpy array should contain float64 values!")
+
+        if b.shape[0] != len(self._parent):
             raise ValueError("Argument should be the same size as the matrix!")
 
-        if np.isinf(b).any():
-            raise ValueError("Argument array should not contain inf!")
+        check_finite(b, "Argument array should not contain inf!", "Argument array should not contain nan!")
+
+        if self._splu is not None:
+            x = np.empty_like(b)
+            x[self._order] = self._splu.solve(b[self._order])
+            return x
+
+        b_by_depth = b.reshape(len(b), -1)[self._order]
+        h = b_by_depth.copy()
+        for level in reversed(self._levels):
+            contributions = self._multipliers[level.start : level.end] * h[level.start : level.end]
+            h[level.group_parents] += np.add.reduceat(contributions, level.group_starts)
 
-        if np.isnan(b).any():
-            raise ValueError("Argument array should not contain nan!")
+        # the sources are fixed, whatever their children contributed
+        h[: self._n_roots] = b_by_depth[: self._n_roots]
+        x_by_depth = h / self._pivots
+        for level in self._levels:
+            x_by_depth[level.start : level.end] += (
+                self._multipliers[level.start : level.end] * x_by_depth[level.parents]
+            )
 
-        return scipy.linalg.lu_solve((self._lu, self._piv), b)
+        x = np.empty_like(x_by_depth)
+        x[self._order] = x_by_depth
+        return x.reshape(b.shape)
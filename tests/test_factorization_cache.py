@@ -0,0 +1,172 @@
+import threading
+
+import numpy as np
+import pytest
+import scipy
+
+from ees_scientific_software_engineering.factorization_cache import *
+from ees_scientific_software_engineering.solvers import LUSolver
+
+
+def random_matrix(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random((n, n)) + n * np.eye(n)
+
+
+def test_matrix_key():
+    A = random_matrix(5)
+
+    assert matrix_key(A) == matrix_key(A.copy())
+    assert matrix_key(A) == matrix_key(np.repeat(A, 2, axis=1)[:, ::2])
+    assert matrix_key(A) != matrix_key(A + 1e-15 * np.eye(5))
+    assert matrix_key(A) != matrix_key(A.T)
+    assert matrix_key(A) != matrix_key(A.reshape(1, 25))
+    assert matrix_key(A) != matrix_key(A.astype(np.float32))
+    assert matrix_key(np.asfortranarray(A)) == matrix_key(np.asfortranarray(A))
+    assert matrix_key(np.asfortranarray(A)) != matrix_key(np.asfortranarray(A.T))
+    assert matrix_key(scipy.sparse.csr_array(A)) == matrix_key(scipy.sparse.coo_matrix(A))
+    assert matrix_key(scipy.sparse.csr_array(A)) != matrix_key(A)
+
+    with pytest.raises(TypeError, match="Argument should be a numpy array or a scipy sparse matrix!"):
+        matrix_key([[1.0]])
+
+
+def test_factorization_cache_hits_and_misses():
+    cache = FactorizationCache()
+    A = random_matrix(6)
+
+    solver = cache.get(A)
+
+    assert isinstance(solver, LUSolver)
+    assert cache.get(A.copy()) is solver
+    assert cache.get(A, rcond_threshold=1e-3) is not solver
+    assert cache.get(A, rcond_threshold=1e-3) is cache.get(A, rcond_threshold=1e-3)
+    assert np.allclose(solver.solve(np.ones(6)), np.linalg.solve(A, np.ones(6)))
+    assert cache.statistics == CacheStatistics(3, 2, 0, 2, 2 * solver.nbytes)
+    assert len(cache) == 2
+
+
+def test_factorization_cache_sparse():
+    cache = FactorizationCache()
+    A = scipy.sparse.csr_array(random_matrix(6))
+
+    solver = cache.get(A)
+
+    assert solver.fill_in is not None
+    assert cache.get(scipy.sparse.csc_matrix(A)) is solver
+    assert cache.statistics.nbytes == solver.nbytes > 0
+
+
+def test_factorization_cache_lru_eviction():
+    nbytes = LUSolver(random_matrix(10)).nbytes
+    cache = FactorizationCache(max_bytes=2 * nbytes)
+    A, B, C = random_matrix(10, 0), random_matrix(10, 1), random_matrix(10, 2)
+
+    a = cache.get(A)
+    cache.get(B)
+    assert cache.get(A) is a
+    cache.get(C)  # evicts B, the least recently used
+
+    assert cache.statistics == CacheStatistics(hits=1, misses=3, evictions=1, entries=2, nbytes=2 * nbytes)
+    assert cache.get(A) is a
+    cache.get(B)
+    assert cache.statistics.evictions == 2
+    assert cache.statistics.misses == 4
+
+
+def test_factorization_cache_over_budget():
+    cache = FactorizationCache(max_bytes=100)
+
+    solver = cache.get(random_matrix(10))
+
+    assert cache.get(random_matrix(10)) is not solver
+    assert cache.statistics == CacheStatistics(0, 2, 0, 0, 0)
+
+
+def test_factorization_cache_clear():
+    cache = FactorizationCache()
+    cache.get(random_matrix(4))
+    cache.get(random_matrix(4))
+
+    cache.clear()
+
+    assert cache.statistics == CacheStatistics(1, 1, 0, 0, 0)
+    assert cache.max_bytes == 1 << 30
+
+
+def test_factorization_cache_validation():
+    with pytest.raises(ValueError, match="max_bytes should not be negative"):
+        FactorizationCache(max_bytes=-1)
+
+    cache = FactorizationCache()
+    with pytest.raises(ValueError, match="Argument should not be a singular matrix!"):
+        cache.get(np.zeros((3, 3)))
+    assert cache.statistics == CacheStatistics(0, 1, 0, 0, 0)
+
+
+def test_factorization_cache_threads():
+    cache = FactorizationCache()
+    matrices = [random_matrix(20, seed) for seed in range(4)]
+    solvers = [[] for _ in range(8)]
+
+    def worker(index):
+        for i in range(40):
+            solvers[index].append(cache.get(matrices[i % 4]))
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    statistics = cache.statistics
+    assert statistics.hits + statistics.misses == 320
+    assert statistics.entries == 4
+    for results in solvers:
+        for i, solver in enumerate(results):
+            assert solver is cache.get(matrices[i % 4])
+
+
+def test_factorization_cache_threads_solve_shared_solver():
+    # a mixed precision solver whose refinement does not converge falls back to float64 in one of the threads
+    cache = FactorizationCache()
+    A = scipy.linalg.hilbert(10)
+    rng = np.random.default_rng(0)
+    right_hand_sides = [rng.random((10, 2)) for _ in range(8)]
+    expected = [LUSolver(A).solve(b) for b in right_hand_sides]
+    solutions = [None] * 8
+
+    def worker(index):
+        for _ in range(20):
+            solutions[index] = cache.get(A, mixed_precision=True).solve(right_hand_sides[index])
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not cache.get(A, mixed_precision=True).mixed_precision
+    for x, y in zip(solutions, expected):
+        assert np.allclose(x, y)
+
+
+def test_factorization_cache_concurrent_miss(monkeypatch):
+    import ees_scientific_software_engineering.factorization_cache as module
+
+    cache = FactorizationCache()
+    A = random_matrix(5)
+    inner = []
+    calls = []
+
+    def factorize_while_another_thread_does(matrix, **kwargs):
+        calls.append(matrix)
+        if len(calls) == 1:
+            # another lookup of the same matrix finishes while this one factorizes
+            inner.append(cache.get(matrix, **kwargs))
+        return LUSolver(matrix, **kwargs)
+
+    monkeypatch.setattr(module, "LUSolver", factorize_while_another_thread_does)
+
+    assert cache.get(A) is inner[0]
+    assert cache.statistics == CacheStatistics(0, 2, 0, 1, inner[0].nbytes)
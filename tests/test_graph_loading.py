@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from ees_scientific_software_engineering.graph_loading import *
+
+
+def test_read_vertex_chunks_csv(tmp_path):
+    path = tmp_path / "vertices.csv"
+    path.write_text("name,id\na,4\nb,2\n\nc,7\n")
+
+    chunks = list(read_vertex_chunks(path, chunk_size=2))
+
+    assert [chunk.tolist() for chunk in chunks] == [[4, 2], [7]]
+    assert chunks[0].dtype == np.int64
+    assert count_records(path) == 3
+
+
+def test_read_edge_chunks_jsonl(tmp_path):
+    path = tmp_path / "edges.ndjson"
+    path.write_text(
+        '{"id": 1, "from_vertex_id": 0, "to_vertex_id": 2, "enabled": true}\n'
+        "\n"
+        '{"id": 3, "from_vertex_id": 2, "to_vertex_id": 4, "enabled": false}\n'
+        '{"id": 5, "from_vertex_id": 4, "to_vertex_id": 0, "enabled": 1}\n'
+    )
+
+    chunks = list(read_edge_chunks(path, chunk_size=2))
+
+    assert [chunk.edge_ids.tolist() for chunk in chunks] == [[1, 3], [5]]
+    assert chunks[0].edge_vertex_id_pairs.tolist() == [[0, 2], [2, 4]]
+    assert [chunk.edge_enabled.tolist() for chunk in chunks] == [[True, False], [True]]
+    assert count_records(path) == 3
+
+
+def test_read_edge_chunks_csv_booleans(tmp_path):
+    path = tmp_path / "edges.CSV"
+    path.write_text("id,from_vertex_id,to_vertex_id,enabled\n1,0,2,TRUE\n3,2,4, false\n5,4,0,0\n7,0,6,1\n")
+
+    (chunk,) = read_edge_chunks(path, chunk_size=10)
+
+    assert chunk.edge_enabled.tolist() == [True, False, False, True]
+
+
+def test_read_edge_chunks_invalid_boolean(tmp_path):
+    path = tmp_path / "edges.csv"
+    path.write_text("id,from_vertex_id,to_vertex_id,enabled\n1,0,2,yes\n")
+
+    with pytest.raises(ValueError, match="Cannot interpret 'yes' as a boolean"):
+        list(read_edge_chunks(path, chunk_size=10))
+
+
+def test_read_edge_chunks_missing_column(tmp_path):
+    path = tmp_path / "edges.csv"
+    path.write_text("id,from_vertex_id,enabled\n1,0,true\n")
+
+    with pytest.raises(KeyError, match="Column 'to_vertex_id' is missing"):
+        list(read_edge_chunks(path, chunk_size=10))
+
+
+@pytest.mark.parametrize("row, n_fields", [("3,2", 2), ("3,2,4,true,8", 5)])
+def test_read_edge_chunks_csv_wrong_number_of_fields(tmp_path, row, n_fields):
+    path = tmp_path / "edges.csv"
+    path.write_text(f"id,from_vertex_id,to_vertex_id,enabled\n1,0,2,true\n\n{row}\n5,4,0,true\n")
+
+    with pytest.raises(ValueError, match=f"Line 4 of .*edges.csv has {n_fields} fields instead of 4"):
+        list(read_edge_chunks(path, chunk_size=10))
+
+
+def test_read_vertex_chunks_jsonl_missing_column(tmp_path):
+    path = tmp_path / "vertices.jsonl"
+    path.write_text('{"id": 1}\n{"vertex_id": 2}\n')
+
+    with pytest.raises(KeyError, match="Column 'id' is missing"):
+        list(read_vertex_chunks(path, chunk_size=10))
+
+
+def test_read_chunks_invalid_arguments(tmp_path):
+    with pytest.raises(UnsupportedFileFormatError, match=r"File format .txt is not supported"):
+        count_records(tmp_path / "vertices.txt")
+
+    path = tmp_path / "vertices.csv"
+    path.write_text("")
+    assert count_records(path) == 0
+    assert list(read_vertex_chunks(path, chunk_size=10)) == []
+
+    with pytest.raises(ValueError, match="chunk_size should be at least 1"):
+        list(read_vertex_chunks(path, chunk_size=0))
@@ -1,3 +1,7 @@
+import json
+import random
+
+import networkx as nx
 import numpy as np
 import pytest
 
@@ -8,6 +12,22 @@ from ees_scientific_software_engineering.graph_processing import *
 ###############
 
 
+def random_radial_network(n, n_disabled, seed):
+    rng = random.Random(seed)
+    vertex_ids = rng.sample(range(10 * n), n)
+    edge_vertex_id_pairs = [(vertex_ids[rng.randrange(i)], vertex_ids[i]) for i in range(1, n)]
+    edge_vertex_id_pairs = [pair if rng.random() < 0.5 else pair[::-1] for pair in edge_vertex_id_pairs]
+    enabled_pairs = set(edge_vertex_id_pairs) | {pair[::-1] for pair in edge_vertex_id_pairs}
+    while len(edge_vertex_id_pairs) < n - 1 + n_disabled:
+        # a disabled edge parallel to an enabled one is tested separately
+        pair = tuple(rng.sample(vertex_ids, 2))
+        if pair not in enabled_pairs:
+            edge_vertex_id_pairs.append(pair)
+    edge_ids = rng.sample(range(10 * n, 20 * n), len(edge_vertex_id_pairs))
+    edge_enabled = [True] * (n - 1) + [False] * n_disabled
+    return vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, rng.choice(vertex_ids)
+
+
 def test_constructor_simple_network():
     graph_processor = GraphProcessor(
         [1, 2, 3, 4, 5],
@@ -17,8 +37,23 @@ def test_constructor_simple_network():
         1,
     )
 
-    assert len(graph_processor._network.nodes) == 5
-    assert len(graph_processor._network.edges) == 4
+    assert len(graph_processor._vertex_ids) == 5
+    assert np.count_nonzero(graph_processor._edge_enabled) == 4
+    assert graph_processor._adjacency.indptr.tolist() == [0, 2, 5, 6, 8, 10]
+    assert graph_processor._adjacency.nbytes() == 6 * 4 + 10 * 4 + 10 * 4
+
+
+def test_constructor_numpy_arrays():
+    graph_processor = GraphProcessor(
+        np.array([1, 2, 3, 4, 5]),
+        np.array([12, 23, 24, 45, 51]),
+        np.array([[1, 2], [2, 3], [2, 4], [4, 5], [5, 1]]),
+        np.array([True, True, True, True, False]),
+        1,
+    )
+
+    assert graph_processor._adjacency.neighbours.dtype == np.int32
+    assert graph_processor.find_downstream_vertices(24) == [4, 5]
 
 
 def test_constructor_unique_vertex():
@@ -116,7 +151,175 @@ def test_constructor_cycles():
         )
 
 
+def test_constructor_cycles_reports_edge():
+    with pytest.raises(GraphCycleError, match="Edge 51 closes a cycle"):
+        graph_processor = GraphProcessor(
+            [1, 2, 3, 4, 5],
+            [12, 23, 34, 45, 51],
+            [(1, 2), (2, 3), (3, 4), (4, 5), (5, 1)],
+            [True, True, True, True, True],
+            1,
+        )
+
+
+def test_constructor_cycles_reports_first_edge():
+    with pytest.raises(GraphCycleError, match="Edge 13 closes a cycle"):
+        graph_processor = GraphProcessor(
+            [1, 2, 3],
+            [12, 23, 13],
+            [(2, 1), (3, 2), (1, 3)],
+            [True, True, True],
+            1,
+        )
+
+
+def test_constructor_empty():
+    with pytest.raises(IDNotFoundError, match="source_vertex_id not found in vertex_ids"):
+        graph_processor = GraphProcessor([], [], [], [], 1)
+
+
+def test_constructor_parallel_edges_cycle():
+    with pytest.raises(GraphCycleError, match="Edge 21 closes a cycle"):
+        graph_processor = GraphProcessor(
+            [1, 2, 3],
+            [12, 23, 21],
+            [(1, 2), (2, 3), (2, 1)],
+            [True, True, True],
+            1,
+        )
+
+
+def test_constructor_cycle_and_not_connected_tree_size():
+    # V-1 enabled edges containing a cycle cannot span the graph
+    with pytest.raises(GraphNotFullyConnectedError, match="Vertex 4 is not connected to source vertex 1"):
+        graph_processor = GraphProcessor(
+            [1, 2, 3, 4],
+            [12, 23, 31],
+            [(1, 2), (2, 3), (3, 1)],
+            [True, True, True],
+            1,
+        )
+
+
+def test_constructor_cycle_and_not_connected():
+    with pytest.raises(GraphNotFullyConnectedError, match="Vertex 5 is not connected to source vertex 1"):
+        graph_processor = GraphProcessor(
+            [1, 2, 3, 4, 5],
+            [12, 23, 31, 14, 24],
+            [(1, 2), (2, 3), (3, 1), (1, 4), (2, 4)],
+            [True, True, True, True, True],
+            1,
+        )
+
+
+def test_constructor_large_network():
+    n = 2000
+    vertex_ids = list(range(n))
+    edge_ids = list(range(n, 3 * n - 1))
+    edge_vertex_id_pairs = [(i + 1, i) for i in range(n - 1)] + [(0, i) for i in range(n)]
+    edge_enabled = [True] * (n - 1) + [False] * n
+
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, 0)
+
+    assert graph_processor.find_downstream_vertices(n) == list(range(1, n))
+
+
 ##############
+# Chunked loading #
+
+
+def chunks(values, chunk_size):
+    return [values[i : i + chunk_size] for i in range(0, len(values), chunk_size)]
+
+
+def edge_chunks(edge_ids, edge_vertex_id_pairs, edge_enabled, chunk_size):
+    return zip(chunks(edge_ids, chunk_size), chunks(edge_vertex_id_pairs, chunk_size), chunks(edge_enabled, chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_from_chunks_random_network(chunk_size):
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = random_radial_network(100, 10, 5)
+    graph_processor = GraphProcessor.from_chunks(
+        chunks(vertex_ids, chunk_size),
+        len(vertex_ids),
+        edge_chunks(edge_ids, edge_vertex_id_pairs, edge_enabled, chunk_size),
+        len(edge_ids),
+        source_vertex_id,
+    )
+
+    assert_same_as_rebuilt(graph_processor, vertex_ids, edge_ids, edge_vertex_id_pairs, source_vertex_id)
+
+
+@pytest.mark.parametrize(
+    ("n_vertices", "n_edges", "message"),
+    [
+        (4, 6, "vertex_chunks contain more than 4 vertices"),
+        (6, 6, "vertex_chunks contain 5 vertices instead of 6"),
+        (5, 5, "edge_chunks contain more than 5 edges"),
+        (5, 7, "edge_chunks contain 6 edges instead of 7"),
+    ],
+)
+def test_from_chunks_lengths(n_vertices, n_edges, message):
+    edges = edge_chunks([1, 9, 7, 3, 8, 5], [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)], [True] * 6, 4)
+
+    with pytest.raises(InputLengthDoesNotMatchError, match=message):
+        GraphProcessor.from_chunks([[0, 2, 10], [4, 6]], n_vertices, edges, n_edges, 0)
+
+
+def test_from_chunks_chunk_columns_length():
+    with pytest.raises(InputLengthDoesNotMatchError, match="Edge chunk columns do not have the same length"):
+        GraphProcessor.from_chunks([[0, 2]], 2, [([1], [(0, 2)], [True, False])], 1, 0)
+
+
+def test_from_chunks_unique_ids_across_chunks():
+    with pytest.raises(IDNotUniqueError, match="Not all vertex_ids are unique"):
+        GraphProcessor.from_chunks([[0, 2], [2]], 3, [], 0, 0)
+
+    with pytest.raises(IDNotUniqueError, match="Not all edge_ids are unique"):
+        GraphProcessor.from_chunks([[0, 2, 4]], 3, [([1], [(0, 2)], [True]), ([1], [(2, 4)], [True])], 2, 0)
+
+
+def test_from_chunks_vertex_not_found():
+    edges = [([1], [(0, 2)], [True]), ([3, 5], [(2, 8), (9, 0)], [True, False])]
+
+    with pytest.raises(IDNotFoundError, match=r"not found in vertex_ids: \[8, 9\]"):
+        GraphProcessor.from_chunks([[0, 2]], 2, edges, 3, 0)
+
+
+def test_from_chunks_source_not_found():
+    with pytest.raises(IDNotFoundError, match="source_vertex_id not found in vertex_ids"):
+        GraphProcessor.from_chunks([[0, 2]], 2, [([1], [(0, 2)], [True])], 1, 4)
+
+
+def test_from_chunks_validates_graph():
+    with pytest.raises(GraphCycleError, match="Edge 5 closes a cycle"):
+        GraphProcessor.from_chunks(
+            [[0, 2, 4]], 3, [([1, 3], [(0, 2), (2, 4)], [True, True]), ([5], [(4, 0)], [True])], 3, 0
+        )
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl"])
+def test_from_files(tmp_path, suffix):
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = random_radial_network(50, 5, 6)
+    if suffix == ".csv":
+        (tmp_path / "vertices.csv").write_text("id\n" + "".join(f"{i}\n" for i in vertex_ids))
+        edge_lines = [f"{i},{u},{v},{e}\n" for i, (u, v), e in zip(edge_ids, edge_vertex_id_pairs, edge_enabled)]
+        (tmp_path / "edges.csv").write_text("id,from_vertex_id,to_vertex_id,enabled\n" + "".join(edge_lines))
+    else:
+        (tmp_path / "vertices.jsonl").write_text("".join(json.dumps({"id": i}) + "\n" for i in vertex_ids))
+        edge_records = [
+            {"id": i, "from_vertex_id": u, "to_vertex_id": v, "enabled": e}
+            for i, (u, v), e in zip(edge_ids, edge_vertex_id_pairs, edge_enabled)
+        ]
+        (tmp_path / "edges.jsonl").write_text("".join(json.dumps(record) + "\n" for record in edge_records))
+
+    graph_processor = GraphProcessor.from_files(
+        tmp_path / f"vertices{suffix}", tmp_path / f"edges{suffix}", source_vertex_id, chunk_size=8
+    )
+
+    assert_same_as_rebuilt(graph_processor, vertex_ids, edge_ids, edge_vertex_id_pairs, source_vertex_id)
+
+
 # Downstream #
 ##############
 def test_find_downstream_vertices_simple_network():
@@ -133,7 +336,65 @@ def test_find_downstream_vertices_simple_network():
     assert result == [4, 5]
 
 
-def test_find_downstream_vertices_edge_not_exist():
+@pytest.mark.parametrize("seed", range(5))
+def test_find_downstream_vertices_random_network(seed):
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = random_radial_network(60, 20, seed)
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id)
+
+    network = nx.Graph()
+    network.add_nodes_from(vertex_ids)
+    network.add_edges_from(pair for pair, enabled in zip(edge_vertex_id_pairs, edge_enabled) if enabled)
+    for edge_id, pair, enabled in zip(edge_ids, edge_vertex_id_pairs, edge_enabled):
+        if not enabled:
+            assert graph_processor.find_downstream_vertices(edge_id) == []
+            continue
+        network.remove_edge(*pair)
+        expected = set(vertex_ids) - nx.node_connected_component(network, source_vertex_id)
+        network.add_edge(*pair)
+        assert graph_processor.find_downstream_vertices(edge_id) == sorted(expected)
+
+
+def test_rooted_tree_index():
+    graph_processor = GraphProcessor(
+        [1, 2, 3, 4, 5],
+        [12, 23, 24, 45, 51],
+        [(1, 2), (2, 3), (2, 4), (4, 5), (5, 1)],
+        [True, True, True, True, False],
+        1,
+    )
+    tree = graph_processor._tree
+
+    assert tree.parent.tolist() == [-1, 0, 1, 1, 3]
+    assert tree.parent_edge.tolist() == [-1, 0, 1, 2, 3]
+    assert tree.order[0] == 0
+    assert (tree.exit - tree.entry).tolist() == [5, 4, 1, 2, 1]
+    assert sorted(tree.subtree(3).tolist()) == [3, 4]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_rooted_tree_index_high_degree_random_tree(seed):
+    rng = random.Random(seed)
+    n = 300
+    vertex_ids = rng.sample(range(10 * n), n)
+    # half of the vertices hang from one hub, the others from a random earlier vertex
+    edge_vertex_id_pairs = [
+        (vertex_ids[0 if rng.random() < 0.5 else rng.randrange(i)], vertex_ids[i]) for i in range(1, n)
+    ]
+    edge_ids = list(range(n - 1))
+    source_vertex_id = vertex_ids[rng.randrange(n)]
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, [True] * (n - 1), source_vertex_id)
+    tree = graph_processor._tree
+
+    network = nx.bfs_tree(nx.Graph(edge_vertex_id_pairs), source_vertex_id)
+    assert sorted(tree.order.tolist()) == list(range(n))
+    for vertex in range(n):
+        expected = nx.descendants(network, vertex_ids[vertex]) | {vertex_ids[vertex]}
+        assert {vertex_ids[v] for v in tree.subtree(vertex).tolist()} == expected
+
+
+# ids below, between and above the existing ones
+@pytest.mark.parametrize("edge_id", [88, 0, 13, 2**70, 23.5])
+def test_find_downstream_vertices_edge_not_exist(edge_id):
     graph_processor = GraphProcessor(
         [1, 2, 3, 4, 5],
         [12, 23, 24, 45, 51],
@@ -143,7 +404,7 @@ def test_find_downstream_vertices_edge_not_exist():
     )
 
     with pytest.raises(IDNotFoundError, match="edge_id not found in edge_ids"):
-        result = graph_processor.find_downstream_vertices(88)
+        result = graph_processor.find_downstream_vertices(edge_id)
 
 
 def test_find_downstream_vertices_edge_disabled():
@@ -178,6 +439,505 @@ def test_find_alternative_vertices_simple_network():
     assert graph_processor.find_alternative_edges(9) == []
 
 
+def reference_alternative_edges(edge_ids, edge_vertex_id_pairs, edge_enabled, vertex_ids, disabled_edge_id):
+    # the original implementation: try every disabled edge on a copy of the network,
+    # only correct if no disabled edge is parallel to an enabled one
+    network = nx.Graph()
+    network.add_nodes_from(vertex_ids)
+    network.add_edges_from(pair for pair, enabled in zip(edge_vertex_id_pairs, edge_enabled) if enabled)
+    network.remove_edge(*edge_vertex_id_pairs[edge_ids.index(disabled_edge_id)])
+
+    good_alternatives = []
+    for edge_id, pair, enabled in zip(edge_ids, edge_vertex_id_pairs, edge_enabled):
+        if enabled:
+            continue
+        network.add_edge(*pair)
+        if nx.is_connected(network) and len(list(nx.simple_cycles(network))) == 0:
+            good_alternatives.append(edge_id)
+        network.remove_edge(*pair)
+    return good_alternatives
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_find_alternative_edges_random_network(seed):
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = random_radial_network(40, 15, seed)
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id)
+
+    for edge_id, enabled in zip(edge_ids, edge_enabled):
+        if enabled:
+            expected = reference_alternative_edges(edge_ids, edge_vertex_id_pairs, edge_enabled, vertex_ids, edge_id)
+            assert graph_processor.find_alternative_edges(edge_id) == expected
+
+
+def test_find_alternative_edges_parallel_and_self_loop():
+    graph_processor = GraphProcessor(
+        [0, 1, 2],
+        [1, 2, 3, 4, 5],
+        [(0, 1), (1, 2), (2, 1), (1, 0), (2, 2)],
+        [True, True, False, False, False],
+        0,
+    )
+
+    assert graph_processor.find_alternative_edges(1) == [4]
+    assert graph_processor.find_alternative_edges(2) == [3]
+
+
+###############
+# Contingency #
+###############
+def test_find_contingencies_simple_network():
+    graph_processor = GraphProcessor(
+        [0, 2, 10, 4, 6],
+        [1, 9, 7, 3, 8, 5],
+        [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)],
+        [True, True, False, True, False, True],
+        0,
+    )
+
+    table = graph_processor.find_contingencies()
+
+    assert table.edge_ids.tolist() == [1, 9, 3, 5]
+    assert table.downstream_offsets.tolist() == [0, 2, 3, 4, 5]
+    assert table.downstream_vertex_ids.tolist() == [2, 10, 10, 4, 6]
+    assert table.alternative_offsets.tolist() == [0, 1, 1, 3, 4]
+    assert table.alternative_edge_ids.tolist() == [7, 7, 8, 8]
+
+
+@pytest.mark.parametrize("n_workers", [1, 3])
+@pytest.mark.parametrize("seed", range(3))
+def test_find_contingencies_random_network(seed, n_workers):
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = random_radial_network(80, 30, seed)
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id)
+
+    table = graph_processor.find_contingencies(n_workers=n_workers)
+
+    assert table.edge_ids.tolist() == [edge_id for edge_id, enabled in zip(edge_ids, edge_enabled) if enabled]
+    for k, edge_id in enumerate(table.edge_ids):
+        downstream = table.downstream_vertex_ids[table.downstream_offsets[k] : table.downstream_offsets[k + 1]]
+        alternatives = table.alternative_edge_ids[table.alternative_offsets[k] : table.alternative_offsets[k + 1]]
+        assert downstream.tolist() == graph_processor.find_downstream_vertices(edge_id)
+        assert alternatives.tolist() == graph_processor.find_alternative_edges(edge_id)
+
+
+def test_find_contingencies_selected_edges():
+    graph_processor = GraphProcessor(
+        [0, 2, 10, 4, 6],
+        [1, 9, 7, 3, 8, 5],
+        [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)],
+        [True, True, False, True, False, True],
+        0,
+    )
+
+    table = graph_processor.find_contingencies(np.array([5, 1]))
+
+    assert table.edge_ids.tolist() == [5, 1]
+    assert table.downstream_offsets.tolist() == [0, 1, 3]
+    assert table.downstream_vertex_ids.tolist() == [6, 2, 10]
+    assert table.alternative_offsets.tolist() == [0, 1, 2]
+    assert table.alternative_edge_ids.tolist() == [8, 7]
+
+
+def test_find_contingencies_edges_not_found():
+    graph_processor = GraphProcessor(
+        [0, 2, 10, 4, 6],
+        [1, 9, 7, 3, 8, 5],
+        [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)],
+        [True, True, False, True, False, True],
+        0,
+    )
+
+    with pytest.raises(IDNotFoundError, match=r"Edge ids not found in edge_ids: \[88, 99\]"):
+        graph_processor.find_contingencies(np.array([1, 88, 3, 99]))
+
+
+def test_find_contingencies_edges_not_unique():
+    graph_processor = GraphProcessor(
+        [0, 2, 10, 4, 6],
+        [1, 9, 7, 3, 8, 5],
+        [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)],
+        [True, True, False, True, False, True],
+        0,
+    )
+
+    with pytest.raises(IDNotUniqueError, match="Not all edge_ids are unique"):
+        graph_processor.find_contingencies(np.array([1, 3, 1]))
+
+
+def test_find_contingencies_edges_already_disabled():
+    graph_processor = GraphProcessor(
+        [0, 2, 10, 4, 6],
+        [1, 9, 7, 3, 8, 5],
+        [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)],
+        [True, True, False, True, False, True],
+        0,
+    )
+
+    with pytest.raises(EdgeAlreadyDisabledError, match=r"Edge ids already disabled: \[7, 8\]"):
+        graph_processor.find_contingencies(np.array([7, 1, 8]))
+
+
+@pytest.mark.parametrize("n_workers", [0, -2, 1.0, True, "2", None])
+def test_find_contingencies_invalid_n_workers(n_workers):
+    graph_processor = GraphProcessor(
+        [0, 2, 10, 4, 6],
+        [1, 9, 7, 3, 8, 5],
+        [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)],
+        [True, True, False, True, False, True],
+        0,
+    )
+
+    with pytest.raises(ValueError, match="Argument n_workers should be a positive integer!"):
+        graph_processor.find_contingencies(n_workers=n_workers)
+
+
+#############
+# Switching #
+#############
+def simple_network():
+    return GraphProcessor(
+        [0, 2, 10, 4, 6],
+        [1, 9, 7, 3, 8, 5],
+        [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)],
+        [True, True, False, True, False, True],
+        0,
+    )
+
+
+def assert_same_as_rebuilt(graph_processor, vertex_ids, edge_ids, edge_vertex_id_pairs, source_vertex_id):
+    edge_enabled = graph_processor._edge_enabled.tolist()
+    rebuilt = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id)
+
+    tree = graph_processor._tree
+    assert (tree.entry[tree.order] == np.arange(len(vertex_ids))).all()
+    assert (np.sort(tree.exit - tree.entry) == np.sort(rebuilt._tree.exit - rebuilt._tree.entry)).all()
+    assert (tree.depth[tree.parent >= 0] == tree.depth[tree.parent[tree.parent >= 0]] + 1).all()
+    assert graph_processor._disabled_edges.tolist() == rebuilt._disabled_edges.tolist()
+    for edge_id, enabled in zip(edge_ids, edge_enabled):
+        assert graph_processor.find_downstream_vertices(edge_id) == rebuilt.find_downstream_vertices(edge_id)
+        if enabled:
+            assert graph_processor.find_alternative_edges(edge_id) == rebuilt.find_alternative_edges(edge_id)
+
+
+def test_switch_simple_network():
+    graph_processor = simple_network()
+
+    graph_processor.switch(3, 8)
+
+    assert graph_processor.find_downstream_vertices(5) == [4, 6]
+    assert graph_processor.find_downstream_vertices(8) == [4]
+    assert graph_processor.find_alternative_edges(5) == [7, 3]
+    assert_same_as_rebuilt(
+        graph_processor, [0, 2, 10, 4, 6], [1, 9, 7, 3, 8, 5], [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)], 0
+    )
+
+
+def test_switch_back_and_forth():
+    graph_processor = simple_network()
+
+    # every switch inserts the subtree of vertex 4 at the same place, filling up the gaps there
+    for _ in range(50):
+        graph_processor.switch(3, 8)
+        assert graph_processor.find_downstream_vertices(5) == [4, 6]
+        graph_processor.switch(8, 3)
+        assert graph_processor.find_downstream_vertices(3) == [4]
+
+    assert_same_as_rebuilt(
+        graph_processor, [0, 2, 10, 4, 6], [1, 9, 7, 3, 8, 5], [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)], 0
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_switch_random_network(seed):
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = random_radial_network(40, 15, seed)
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id)
+    rng = random.Random(seed)
+
+    for _ in range(20):
+        enabled_edge_ids = graph_processor._edge_ids[graph_processor._edge_enabled].tolist()
+        disabled_edge_id = rng.choice(enabled_edge_ids)
+        alternatives = graph_processor.find_alternative_edges(disabled_edge_id)
+        if alternatives:
+            graph_processor.switch(disabled_edge_id, rng.choice(alternatives))
+            assert_same_as_rebuilt(graph_processor, vertex_ids, edge_ids, edge_vertex_id_pairs, source_vertex_id)
+
+
+def test_switch_edge_not_found():
+    graph_processor = simple_network()
+
+    with pytest.raises(IDNotFoundError, match="disabled_edge_id not found in edge_ids"):
+        graph_processor.switch(88, 7)
+    with pytest.raises(IDNotFoundError, match="enabled_edge_id not found in edge_ids"):
+        graph_processor.switch(1, 88)
+
+
+def test_switch_already_disabled_or_enabled():
+    graph_processor = simple_network()
+
+    with pytest.raises(EdgeAlreadyDisabledError):
+        graph_processor.switch(7, 8)
+    with pytest.raises(EdgeAlreadyEnabledError):
+        graph_processor.switch(1, 3)
+
+
+def test_switch_not_reconnecting():
+    graph_processor = simple_network()
+
+    with pytest.raises(
+        GraphNotFullyConnectedError, match="Edge 8 does not reconnect the vertices downstream of edge 1"
+    ):
+        graph_processor.switch(1, 8)
+
+    assert graph_processor._edge_enabled.tolist() == [True, True, False, True, False, True]
+
+
+def test_toggle_edges():
+    graph_processor = simple_network()
+
+    graph_processor.toggle_edges([1, 3, 7, 8])
+
+    assert graph_processor._edge_enabled.tolist() == [False, True, True, False, True, True]
+    assert graph_processor.find_downstream_vertices(5) == [2, 4, 6, 10]
+    assert_same_as_rebuilt(
+        graph_processor, [0, 2, 10, 4, 6], [1, 9, 7, 3, 8, 5], [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)], 0
+    )
+
+
+@pytest.mark.parametrize(
+    "edge_ids, error",
+    [([1, 8], GraphNotFullyConnectedError), ([7], GraphCycleError), ([1, 9, 7, 8], GraphNotFullyConnectedError)],
+)
+def test_toggle_edges_invalid(edge_ids, error):
+    graph_processor = simple_network()
+
+    with pytest.raises(error):
+        graph_processor.toggle_edges(edge_ids)
+
+    assert_same_as_rebuilt(
+        graph_processor, [0, 2, 10, 4, 6], [1, 9, 7, 3, 8, 5], [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)], 0
+    )
+    assert graph_processor._edge_enabled.tolist() == [True, True, False, True, False, True]
+
+
+def test_toggle_edges_not_unique():
+    graph_processor = simple_network()
+
+    with pytest.raises(IDNotUniqueError, match="Not all edge_ids are unique"):
+        graph_processor.toggle_edges([1, 7, 1])
+
+
+# Snapshot #
+
+
+def assert_same_queries(graph_processor, expected):
+    for edge_id, enabled in zip(expected._edge_ids.tolist(), expected._edge_enabled.tolist()):
+        assert graph_processor.find_downstream_vertices(edge_id) == expected.find_downstream_vertices(edge_id)
+        if enabled:
+            assert graph_processor.find_alternative_edges(edge_id) == expected.find_alternative_edges(edge_id)
+
+
+@pytest.mark.parametrize("mmap_mode", ["c", "r", None])
+def test_save_load_round_trip(tmp_path, mmap_mode):
+    graph_processor = GraphProcessor(*random_radial_network(200, 20, 3))
+    graph_processor.save(tmp_path / "snapshot")
+
+    loaded = GraphProcessor.load(tmp_path / "snapshot", mmap_mode=mmap_mode)
+
+    assert isinstance(loaded._tree.order, np.memmap) == (mmap_mode is not None)
+    assert loaded._vertex_ids is loaded._vertex_index.ids
+    assert loaded._disabled_edges.tolist() == graph_processor._disabled_edges.tolist()
+    assert_same_queries(loaded, graph_processor)
+    for loaded_array, array in zip(loaded.find_contingencies(), graph_processor.find_contingencies()):
+        assert loaded_array.tolist() == array.tolist()
+
+
+def test_save_load_switch_copy_on_write(tmp_path):
+    graph_processor = simple_network()
+    graph_processor.save(tmp_path)
+
+    loaded = GraphProcessor.load(tmp_path)
+    loaded.switch(3, 7)
+    graph_processor.switch(3, 7)
+    assert_same_queries(loaded, graph_processor)
+
+    assert_same_queries(GraphProcessor.load(tmp_path), simple_network())
+
+
+def test_load_checksum_mismatch_validates(tmp_path):
+    graph_processor = simple_network()
+    graph_processor.save(tmp_path)
+    edge_enabled = np.load(tmp_path / "edge_enabled.npy")
+    edge_enabled[1] = False
+    np.save(tmp_path / "edge_enabled.npy", edge_enabled)
+
+    with pytest.raises(GraphNotFullyConnectedError):
+        GraphProcessor.load(tmp_path)
+
+    edge_enabled[1:3] = [True, True]
+    edge_enabled[3] = False
+    np.save(tmp_path / "edge_enabled.npy", edge_enabled)
+
+    loaded = GraphProcessor.load(tmp_path)
+    assert loaded._edge_enabled.tolist() == [True, True, True, False, False, True]
+    assert sorted(loaded.find_downstream_vertices(1)) == [2, 4, 10]
+
+
+def test_load_unsupported_version(tmp_path):
+    simple_network().save(tmp_path)
+    header = json.loads((tmp_path / "header.json").read_text())
+    header["version"] = 0
+    (tmp_path / "header.json").write_text(json.dumps(header))
+
+    with pytest.raises(ValueError, match="Snapshot version 0 is not supported"):
+        GraphProcessor.load(tmp_path)
+
+
+# Forest #
+
+
+def random_forest(n_feeders, n, n_ties, seed):
+    rng = random.Random(seed)
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids = [], [], [], [], []
+    for feeder in range(n_feeders):
+        feeder_network = random_radial_network(n, 2, seed * n_feeders + feeder)
+        offset = 20 * n * feeder
+        vertex_ids += [vertex_id + offset for vertex_id in feeder_network[0]]
+        edge_ids += [edge_id + offset for edge_id in feeder_network[1]]
+        edge_vertex_id_pairs += [(u + offset, v + offset) for u, v in feeder_network[2]]
+        edge_enabled += feeder_network[3]
+        source_vertex_ids.append(feeder_network[4] + offset)
+
+    # normally open ties between the feeders
+    for tie in range(n_ties):
+        edge_ids.append(20 * n * n_feeders + tie)
+        edge_vertex_id_pairs.append(tuple(rng.sample(vertex_ids, 2)))
+        edge_enabled.append(False)
+    return vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids
+
+
+def reference_forest_alternative_edges(edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids, edge_id):
+    network = nx.MultiGraph()
+    network.add_edges_from(pair for pair, enabled in zip(edge_vertex_id_pairs, edge_enabled) if enabled)
+    network.remove_edge(*edge_vertex_id_pairs[edge_ids.index(edge_id)])
+
+    good_alternatives = []
+    for alternative_id, pair, enabled in zip(edge_ids, edge_vertex_id_pairs, edge_enabled):
+        if enabled:
+            continue
+        network.add_edge(*pair)
+        components = list(nx.connected_components(network))
+        if nx.is_forest(network) and all(len(component & set(source_vertex_ids)) == 1 for component in components):
+            good_alternatives.append(alternative_id)
+        network.remove_edge(*pair)
+    return good_alternatives
+
+
+def test_forest_find_downstream_vertices():
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids = random_forest(4, 30, 10, 0)
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids)
+
+    for feeder, source_vertex_id in enumerate(source_vertex_ids):
+        feeder_network = random_radial_network(30, 2, feeder)
+        feeder_processor = GraphProcessor(*feeder_network[:4], feeder_network[4])
+        offset = 20 * 30 * feeder
+        for edge_id in feeder_network[1]:
+            expected = [vertex_id + offset for vertex_id in feeder_processor.find_downstream_vertices(edge_id)]
+            assert graph_processor.find_downstream_vertices(edge_id + offset) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_forest_find_alternative_edges_random_network(seed):
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids = random_forest(3, 15, 8, seed)
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids)
+
+    for edge_id, enabled in zip(edge_ids, edge_enabled):
+        if enabled:
+            expected = reference_forest_alternative_edges(
+                edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids, edge_id
+            )
+            assert graph_processor.find_alternative_edges(edge_id) == expected
+
+
+@pytest.mark.parametrize("n_workers", [1, 3, 8])
+def test_forest_find_contingencies(n_workers):
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids = random_forest(6, 20, 15, 1)
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids)
+    edge_ids = [edge_id for edge_id, enabled in zip(edge_ids, edge_enabled) if enabled][::-3]
+
+    table = graph_processor.find_contingencies(edge_ids, n_workers=n_workers)
+
+    assert table.edge_ids.tolist() == edge_ids
+    for k, edge_id in enumerate(edge_ids):
+        downstream = table.downstream_vertex_ids[table.downstream_offsets[k] : table.downstream_offsets[k + 1]]
+        alternatives = table.alternative_edge_ids[table.alternative_offsets[k] : table.alternative_offsets[k + 1]]
+        assert downstream.tolist() == graph_processor.find_downstream_vertices(edge_id)
+        assert alternatives.tolist() == graph_processor.find_alternative_edges(edge_id)
+
+
+def test_find_contingencies_no_disabled_edges():
+    graph_processor = GraphProcessor([0, 2, 4], [1, 3], [(0, 2), (2, 4)], [True, True], [0])
+
+    table = graph_processor.find_contingencies(n_workers=2)
+
+    assert table.downstream_vertex_ids.tolist() == [2, 4, 4]
+    assert table.alternative_offsets.tolist() == [0, 0, 0]
+
+
+def test_forest_switch_between_feeders():
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids = random_forest(3, 20, 10, 2)
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_ids)
+
+    n_switches = 0
+    for edge_id, enabled in zip(edge_ids, edge_enabled):
+        alternatives = graph_processor.find_alternative_edges(edge_id) if enabled else []
+        if alternatives:
+            graph_processor.switch(edge_id, alternatives[-1])
+            n_switches += 1
+    assert n_switches > 5
+
+    assert_same_as_rebuilt(graph_processor, vertex_ids, edge_ids, edge_vertex_id_pairs, source_vertex_ids)
+
+
+def test_forest_save_load(tmp_path):
+    network = random_forest(3, 10, 5, 3)
+    graph_processor = GraphProcessor(*network)
+    graph_processor.save(tmp_path)
+
+    loaded = GraphProcessor.load(tmp_path)
+
+    assert loaded._sources.tolist() == graph_processor._sources.tolist()
+    assert_same_queries(loaded, graph_processor)
+
+
+def test_forest_sources_connected():
+    with pytest.raises(GraphCycleError, match="Source vertex 4 is connected to another source"):
+        GraphProcessor([0, 2, 4, 6], [1, 3, 5], [(0, 2), (2, 4), (4, 6)], [True, True, True], [0, 4])
+
+
+def test_forest_not_connected():
+    with pytest.raises(GraphNotFullyConnectedError, match="Vertex 6 is not connected to any source vertex"):
+        GraphProcessor(
+            [0, 2, 4, 6, 8, 10], [1, 3, 5, 7], [(0, 2), (2, 10), (10, 0), (4, 8)], [True, True, True, True], [0, 4]
+        )
+
+
+def test_forest_cycle():
+    with pytest.raises(GraphCycleError, match="Edge 5 closes a cycle"):
+        GraphProcessor([0, 2, 4, 6], [1, 3, 5, 7], [(0, 2), (4, 6), (6, 4), (2, 4)], [True, True, True, False], [0, 4])
+
+
+def test_forest_sources_not_found():
+    with pytest.raises(IDNotFoundError, match=r"Source vertex ids not found in vertex_ids: \[5, 7\]"):
+        GraphProcessor([0, 2, 4], [1], [(0, 2)], [True], [0, 5, 4, 7])
+
+    with pytest.raises(IDNotFoundError, match="No source vertex ids given"):
+        GraphProcessor([0, 2, 4], [1], [(0, 2)], [True], [])
+
+
+def test_forest_sources_not_unique():
+    with pytest.raises(IDNotUniqueError, match="Not all source vertex ids are unique"):
+        GraphProcessor([0, 2, 4], [1], [(0, 2)], [True], [0, 4, 0])
+
+
 def test_find_alternative_vertices_edge_not_found():
     graph_processor = GraphProcessor(
         [0, 2, 10, 4, 6],
@@ -1,7 +1,9 @@
 import numpy as np
 import pytest
+import scipy
 
-from ees_scientific_software_engineering.solvers import LUSolver
+from ees_scientific_software_engineering import solvers
+from ees_scientific_software_engineering.solvers import BatchLUSolver, LUSolver, check_finite
 
 
 def correct_matrix():
@@ -21,7 +23,7 @@ def test_lu_solver_correct():
 
 
 def test_lu_solver_matrix_not_array():
-    with pytest.raises(TypeError, match="Argument should be a numpy array!"):
+    with pytest.raises(TypeError, match="Argument should be a numpy array or a scipy sparse matrix!"):
         solver = LUSolver("string")
 
 
@@ -55,6 +57,33 @@ def test_lu_solver_matrix_not_singular():
         solver = LUSolver(np.array([[1.0, 2.0], [2.0, 4.0]]))
 
 
+def test_lu_solver_rcond():
+    A = correct_matrix()
+
+    assert np.isclose(LUSolver(A).rcond, 1 / np.linalg.cond(A, 1))
+    assert LUSolver(np.eye(3)).rcond == 1.0
+
+
+def test_lu_solver_tiny_determinant_not_singular():
+    # the determinant 1e-400 underflows to 0, the factorization has no zero pivot
+    A = 0.1 * np.eye(400)
+
+    solver = LUSolver(A)
+
+    assert solver.rcond == 1.0
+    assert np.allclose(solver.solve(np.ones(400)), 10.0)
+
+
+def test_lu_solver_rcond_threshold():
+    A = np.array([[1.0, 1.0], [1.0, 1.0 + 1e-14]])
+
+    assert LUSolver(A).rcond < 1e-14
+    assert LUSolver(correct_matrix(), rcond_threshold=1e-3).rcond > 1e-3
+
+    with pytest.raises(ValueError, match="Argument should not be an ill-conditioned matrix, rcond .* is below 1e-10!"):
+        solver = LUSolver(A, rcond_threshold=1e-10)
+
+
 def test_lu_solver_vector_type_not_array():
     A = correct_matrix()
     solver = LUSolver(A)
@@ -63,12 +92,156 @@ def test_lu_solver_vector_type_not_array():
         result = solver.solve("not a np array")
 
 
-def test_lu_solver_vector_type_not_1d():
+def test_lu_solver_vector_type_not_1d_or_2d():
+    A = correct_matrix()
+    solver = LUSolver(A)
+
+    with pytest.raises(TypeError, match="Argument should be a one or two dimensional array!"):
+        result = solver.solve(np.ones((4, 2, 2)))
+
+
+def test_lu_solver_multiple_right_hand_sides():
     A = correct_matrix()
+    B = np.arange(12.0).reshape(4, 3)
+    solver = LUSolver(A)
+
+    X = solver.solve(B)
+
+    assert X.shape == (4, 3)
+    assert np.allclose(A @ X, B)
+    for k in range(3):
+        assert np.allclose(X[:, k], solver.solve(B[:, k]))
+
+
+def test_lu_solver_multiple_right_hand_sides_validation():
+    A = correct_matrix()
+    solver = LUSolver(A)
+
+    with pytest.raises(ValueError, match="Argument should be the same size as the matrix!"):
+        result = solver.solve(np.ones((3, 4)))
+
+    with pytest.raises(ValueError, match="Argument array should not contain nan!"):
+        result = solver.solve(np.array([[1.0, 1.0], [1.0, np.nan], [1.0, 1.0], [1.0, 1.0]]))
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 256])
+def test_lu_solver_solve_stream(block_size):
+    A = correct_matrix()
+    vectors = [np.random.default_rng(k).random(4) for k in range(10)]
+    solver = LUSolver(A)
+
+    solutions = list(solver.solve_stream(iter(vectors), block_size=block_size))
+
+    assert len(solutions) == 10
+    for b, x in zip(vectors, solutions):
+        assert np.allclose(x, solver.solve(b))
+
+
+def test_lu_solver_solve_stream_empty():
+    solver = LUSolver(correct_matrix())
+
+    assert list(solver.solve_stream([])) == []
+
+
+def test_lu_solver_solve_stream_validation():
+    solver = LUSolver(correct_matrix())
+
+    with pytest.raises(ValueError, match="Block size should be at least 1!"):
+        list(solver.solve_stream([np.ones(4)], block_size=0))
+
+    with pytest.raises(TypeError, match="Argument should be a numpy array!"):
+        list(solver.solve_stream([[1.0, 1.0, 1.0, 1.0]]))
+
+    with pytest.raises(ValueError, match="Argument should be a one dimensional array of the same size as the matrix!"):
+        list(solver.solve_stream([np.ones(4), np.ones((4, 1))]))
+
+    with pytest.raises(TypeError, match="Argument numpy array should contain float64 values!"):
+        list(solver.solve_stream([np.ones(4, dtype=np.int64)]))
+
+    with pytest.raises(ValueError, match="Argument array should not contain inf!"):
+        list(solver.solve_stream([np.ones(4), np.array([1.0, np.inf, 1.0, 1.0])], block_size=2))
+
+
+@pytest.mark.parametrize("n_workers", [1, 4])
+def test_lu_solver_solve_parallel(n_workers):
+    A = random_matrix(30)
+    rng = np.random.default_rng(1)
+    right_hand_sides = [rng.random(30), rng.random((30, 4)), rng.random((30, 1))] * 3
     solver = LUSolver(A)
 
-    with pytest.raises(TypeError, match="Argument should be one dimensional array!"):
-        result = solver.solve(np.array([[1.0, 1.0, 1.0], [1.0, 1.0, 1.0]]))
+    solutions = solver.solve_parallel(right_hand_sides, n_workers=n_workers)
+
+    assert len(solutions) == len(right_hand_sides)
+    for b, x in zip(right_hand_sides, solutions):
+        assert x.shape == b.shape
+        assert np.allclose(A @ x, b)
+
+
+def ill_conditioned_matrix(n, condition, seed=0):
+    rng = np.random.default_rng(seed)
+    q_1, _ = np.linalg.qr(rng.normal(size=(n, n)))
+    q_2, _ = np.linalg.qr(rng.normal(size=(n, n)))
+    return q_1 @ np.diag(np.logspace(0, -np.log10(condition), n)) @ q_2
+
+
+def test_lu_solver_solve_parallel_mixed_precision_falls_back_once():
+    # refinement of the float32 factorization does not converge, so the threads fall back at once
+    A = ill_conditioned_matrix(200, 1e9)
+    rng = np.random.default_rng(2)
+    right_hand_sides = [rng.normal(size=(200, 4)) for _ in range(16)]
+    expected = [LUSolver(A).solve(b) for b in right_hand_sides]
+
+    for _ in range(5):
+        solver = LUSolver(A, mixed_precision=True)
+        solutions = solver.solve_parallel(right_hand_sides, n_workers=8)
+
+        assert not solver.mixed_precision
+        assert solver._lu.dtype == np.float64
+        for x, y in zip(solutions, expected):
+            assert np.allclose(x, y, rtol=1e-12, atol=0.0)
+
+
+def test_lu_solver_solve_parallel_refinement_iterations():
+    A = random_matrix(50)
+    rng = np.random.default_rng(4)
+    right_hand_sides = [np.zeros(50), rng.random((50, 2)), rng.random(50)]
+    iterations = []
+    for b in right_hand_sides:
+        solver = LUSolver(A, mixed_precision=True)
+        solver.solve(b)
+        iterations.append(solver.refinement_iterations)
+
+    solver = LUSolver(A, mixed_precision=True)
+    solver.solve_parallel(right_hand_sides, n_workers=3)
+
+    assert solver.refinement_iterations == max(iterations) >= 1
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("trans", [0, 1])
+@pytest.mark.parametrize("shape", [(6,), (6, 3), (6, 0)])
+def test_getrs(dtype, trans, shape):
+    rng = np.random.default_rng(5)
+    factorization = scipy.linalg.lu_factor(random_matrix(6).astype(dtype))
+    b = rng.random(shape).astype(dtype)
+
+    x = solvers._getrs(factorization, b, trans)
+
+    assert x.shape == b.shape
+    assert np.allclose(
+        x, scipy.linalg.lu_solve(factorization, b, trans=trans), rtol=1e-4 if dtype == np.float32 else 1e-12
+    )
+
+    in_place = np.asfortranarray(b)
+    assert np.shares_memory(solvers._getrs(factorization, in_place, trans, overwrite_b=True), in_place) or b.size == 0
+    assert np.allclose(in_place, x, rtol=1e-4 if dtype == np.float32 else 1e-12)
+
+
+def test_lu_solver_solve_parallel_validation():
+    solver = LUSolver(correct_matrix())
+
+    with pytest.raises(ValueError, match="Argument should be the same size as the matrix!"):
+        solver.solve_parallel([np.ones(4), np.ones(3)], n_workers=2)
 
 
 def test_lu_solver_vector_not_float64():
@@ -101,3 +274,529 @@ def test_lu_solver_vector_has_nan():
 
     with pytest.raises(ValueError, match="Argument array should not contain nan!"):
         result = solver.solve(np.array([1.0, np.nan, 1.0, 1.0]))
+
+
+# Low-rank updates #
+
+
+def random_matrix(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random((n, n)) + n * np.eye(n)
+
+
+def test_lu_solver_update_rank_1():
+    A = random_matrix(6)
+    u = np.arange(6.0)
+    v = np.ones(6)
+    b = np.arange(12.0).reshape(6, 2)
+    solver = LUSolver(A)
+
+    solver.update(u, v)
+
+    assert solver.update_rank == 1
+    assert np.allclose(solver.solve(b), np.linalg.solve(A + np.outer(u, v), b))
+    assert np.allclose(solver.solve(b[:, 0]), np.linalg.solve(A + np.outer(u, v), b[:, 0]))
+
+
+def test_lu_solver_update_accumulates():
+    A = random_matrix(8)
+    rng = np.random.default_rng(1)
+    solver = LUSolver(A)
+
+    for _ in range(3):
+        U, V = rng.random((8, 2)), rng.random((8, 2))
+        solver.update(U, V)
+        A = A + U @ V.T
+
+    assert solver.update_rank == 6
+    assert np.allclose(solver.solve(np.ones(8)), np.linalg.solve(A, np.ones(8)))
+
+
+def test_lu_solver_update_entries():
+    A = random_matrix(5)
+    solver = LUSolver(A)
+
+    solver.update_entries(np.array([1, 3, 1]), np.array([2, 0, 2]), np.array([0.5, -2.0, 1.0]))
+
+    A[1, 2] += 1.5
+    A[3, 0] -= 2.0
+    assert solver.update_rank == 2
+    assert np.allclose(solver.solve(np.ones(5)), np.linalg.solve(A, np.ones(5)))
+
+
+def test_lu_solver_update_refactorizes():
+    A = random_matrix(6)
+    rng = np.random.default_rng(2)
+    solver = LUSolver(A, max_update_rank=3)
+
+    for _ in range(2):
+        U, V = rng.random((6, 2)), rng.random((6, 2))
+        solver.update(U, V)
+        A = A + U @ V.T
+
+    assert solver.update_rank == 0
+    assert np.isclose(solver.rcond, LUSolver(A).rcond)
+    assert np.allclose(solver.solve(np.ones(6)), np.linalg.solve(A, np.ones(6)))
+
+    solver.update_entries(np.array([0]), np.array([5]), np.array([3.0]))
+    A[0, 5] += 3.0
+    assert solver.update_rank == 1
+    assert np.allclose(solver.solve(np.ones(6)), np.linalg.solve(A, np.ones(6)))
+
+
+def test_lu_solver_update_sparse():
+    A = sparse_laplacian(20)
+    dense = A.toarray()
+    solver = LUSolver(A, max_update_rank=1)
+
+    solver.update_entries(np.array([0]), np.array([19]), np.array([-1.0]))
+    solver.update_entries(np.array([19]), np.array([0]), np.array([-1.0]))
+
+    dense[0, 19] -= 1.0
+    dense[19, 0] -= 1.0
+    assert solver.update_rank == 0
+    assert solver.fill_in.matrix_nonzeros == 60
+    assert np.allclose(solver.solve(np.ones(20)), np.linalg.solve(dense, np.ones(20)))
+
+
+@pytest.mark.parametrize("max_update_rank", [0, 32])
+def test_lu_solver_update_singular(max_update_rank):
+    solver = LUSolver(np.eye(2), max_update_rank=max_update_rank)
+
+    with pytest.raises(ValueError, match="Argument should not make the matrix singular!"):
+        solver.update(np.array([1.0, 0.0]), np.array([-1.0, 0.0]))
+
+    assert solver.update_rank == 0
+    assert np.allclose(solver.solve(np.array([1.0, 2.0])), [1.0, 2.0])
+
+
+def test_lu_solver_update_validation():
+    solver = LUSolver(correct_matrix())
+
+    with pytest.raises(TypeError, match="Argument should be a numpy array!"):
+        solver.update([1.0, 1.0, 1.0, 1.0], np.ones(4))
+
+    with pytest.raises(TypeError, match="Argument numpy array should contain float64 values!"):
+        solver.update(np.ones(4), np.ones(4, dtype=np.int64))
+
+    with pytest.raises(ValueError, match="Arguments should have the same shape, with as many rows as the matrix!"):
+        solver.update(np.ones((4, 2)), np.ones((4, 1)))
+
+    with pytest.raises(ValueError, match="Arguments should have the same shape, with as many rows as the matrix!"):
+        solver.update(np.ones(3), np.ones(3))
+
+    with pytest.raises(ValueError, match="Argument array should not contain inf or nan!"):
+        solver.update(np.ones(4), np.array([1.0, np.nan, 1.0, 1.0]))
+
+    with pytest.raises(ValueError, match="Arguments should be one dimensional arrays of the same length!"):
+        solver.update_entries(np.array([0, 1]), np.array([0]), np.array([1.0]))
+
+    with pytest.raises(ValueError, match="Argument should contain row and column indices of the matrix!"):
+        solver.update_entries(np.array([0]), np.array([4]), np.array([1.0]))
+
+    with pytest.raises(ValueError, match="Argument should contain row and column indices of the matrix!"):
+        solver.update_entries(np.array([0.0]), np.array([1]), np.array([1.0]))
+
+    with pytest.raises(ValueError, match="Argument array should not contain inf or nan!"):
+        solver.update_entries(np.array([0]), np.array([1]), np.array([np.inf]))
+
+    assert solver.update_rank == 0
+
+
+# Sparse #
+
+
+def sparse_laplacian(n):
+    # path graph Laplacian plus a small shunt on every vertex, like a radial admittance matrix
+    main = np.full(n, 2.01)
+    main[[0, -1]] = 1.01
+    return scipy.sparse.diags_array([-np.ones(n - 1), main, -np.ones(n - 1)], offsets=[-1, 0, 1], format="csr")
+
+
+@pytest.mark.parametrize("permc_spec", ["COLAMD", "MMD_AT_PLUS_A", "MMD_ATA", "NATURAL"])
+def test_lu_solver_sparse_matches_dense(permc_spec):
+    A = sparse_laplacian(50)
+    b = np.random.default_rng(0).random((50, 3))
+
+    sparse_solver = LUSolver(A, permc_spec=permc_spec)
+    dense_solver = LUSolver(A.toarray())
+
+    assert np.allclose(sparse_solver.solve(b), dense_solver.solve(b))
+    assert np.allclose(sparse_solver.solve(b[:, 0]), dense_solver.solve(b[:, 0]))
+    assert np.allclose(list(sparse_solver.solve_stream(b.T, block_size=2)), dense_solver.solve(b).T)
+
+
+def test_lu_solver_sparse_formats():
+    A = correct_matrix()
+    b = np.array([1.0, 2.0, 3.0, 4.0])
+
+    for matrix in [scipy.sparse.coo_array(A), scipy.sparse.csr_matrix(A), scipy.sparse.lil_array(A)]:
+        assert np.allclose(A @ LUSolver(matrix).solve(b), b)
+
+
+def test_lu_solver_sparse_fill_in():
+    A = sparse_laplacian(100)
+
+    fill_in = LUSolver(A, permc_spec="NATURAL").fill_in
+
+    # a tridiagonal matrix has no fill-in without pivoting
+    assert fill_in.matrix_nonzeros == 298
+    assert fill_in.factor_nonzeros == 298
+    assert fill_in.ratio == 1.0
+    assert LUSolver(A.toarray()).fill_in is None
+
+
+def test_lu_solver_sparse_rcond():
+    A = sparse_laplacian(30)
+
+    assert np.isclose(LUSolver(A).rcond, LUSolver(A.toarray()).rcond)
+
+
+def test_lu_solver_sparse_validation():
+    with pytest.raises(ValueError, match="Argument should contain at least 1 value!"):
+        solver = LUSolver(scipy.sparse.csr_array((0, 0)))
+
+    with pytest.raises(ValueError, match="Argument should be a square matrix!"):
+        solver = LUSolver(scipy.sparse.csr_array((2, 3)))
+
+    with pytest.raises(ValueError, match="Argument should contain float64 values!"):
+        solver = LUSolver(scipy.sparse.eye_array(3, dtype=np.float32))
+
+    with pytest.raises(ValueError, match="Argument should not contain inf values!"):
+        solver = LUSolver(scipy.sparse.csr_array(np.diag([1.0, np.inf, 1.0])))
+
+    with pytest.raises(ValueError, match="Argument should not contain nan values!"):
+        solver = LUSolver(scipy.sparse.csr_array(np.diag([1.0, np.nan, 1.0])))
+
+    with pytest.raises(ValueError, match="Argument should not be a singular matrix!"):
+        solver = LUSolver(scipy.sparse.csr_array(np.array([[1.0, 2.0], [2.0, 4.0]])))
+
+    with pytest.raises(ValueError, match="Argument should not be a singular matrix!"):
+        solver = LUSolver(scipy.sparse.csr_array(np.diag([1.0, 0.0, 1.0])))
+
+    with pytest.raises(ValueError, match="Argument should not be an ill-conditioned matrix"):
+        solver = LUSolver(scipy.sparse.csr_array(np.array([[1.0, 1.0], [1.0, 1.0 + 1e-14]])), rcond_threshold=1e-10)
+
+    with pytest.raises(ValueError, match="Argument permc_spec should be one of COLAMD"):
+        solver = LUSolver(sparse_laplacian(3), permc_spec="AMD")
+
+
+def test_lu_solver_sparse_vector_validation():
+    solver = LUSolver(sparse_laplacian(4))
+
+    with pytest.raises(ValueError, match="Argument should be the same size as the matrix!"):
+        result = solver.solve(np.ones(3))
+
+    with pytest.raises(ValueError, match="Argument array should not contain nan!"):
+        result = solver.solve(np.array([1.0, np.nan, 1.0, 1.0]))
+
+
+# Mixed precision #
+
+
+def test_lu_solver_mixed_precision():
+    A = random_matrix(50)
+    b = np.random.default_rng(1).random((50, 3))
+    solver = LUSolver(A, mixed_precision=True)
+
+    x = solver.solve(b)
+
+    assert solver.mixed_precision
+    assert solver._lu.dtype == np.float32
+    assert 1 <= solver.refinement_iterations <= 5
+    assert np.allclose(x, np.linalg.solve(A, b), rtol=1e-13, atol=0.0)
+    assert np.isclose(solver.rcond, LUSolver(A).rcond, rtol=1e-3)
+
+
+def test_lu_solver_mixed_precision_zero_vector():
+    solver = LUSolver(random_matrix(5), mixed_precision=True)
+
+    assert np.array_equal(solver.solve(np.zeros(5)), np.zeros(5))
+    assert solver.refinement_iterations == 0
+
+
+def test_lu_solver_mixed_precision_falls_back_when_not_converging():
+    A = scipy.linalg.hilbert(8)
+    solver = LUSolver(A, mixed_precision=True)
+    assert solver.mixed_precision
+
+    x = solver.solve(np.ones(8))
+
+    assert not solver.mixed_precision
+    assert solver.refinement_iterations == 0
+    assert solver._lu.dtype == np.float64
+    assert np.allclose(x, LUSolver(A).solve(np.ones(8)))
+
+
+def test_lu_solver_mixed_precision_failed_fall_back_keeps_state(monkeypatch):
+    A = scipy.linalg.hilbert(8)
+    solver = LUSolver(A, mixed_precision=True)
+    lu = solver._lu.copy()
+
+    def singular(*args, **kwargs):
+        raise ValueError("Argument should not be a singular matrix!")
+
+    monkeypatch.setattr(solvers, "_dense_lu_factor", singular)
+    with pytest.raises(ValueError, match="Argument should not be a singular matrix!"):
+        solver.solve(np.ones(8))
+
+    assert solver.mixed_precision
+    assert np.array_equal(solver._lu, lu)
+    assert np.array_equal(solver._refined_matrix, A)
+
+    monkeypatch.undo()
+    assert np.allclose(solver.solve(np.ones(8)), LUSolver(A).solve(np.ones(8)))
+    assert not solver.mixed_precision
+
+
+def test_lu_solver_mixed_precision_falls_back_on_float32_overflow():
+    solver = LUSolver(np.diag([1e39, 1.0]), mixed_precision=True)
+    assert not solver.mixed_precision
+
+    solver = LUSolver(np.eye(2), mixed_precision=True, max_refinement_iterations=0)
+    assert np.allclose(solver.solve(np.array([1e39, 1.0])), [1e39, 1.0])
+    assert not solver.mixed_precision
+
+
+def test_lu_solver_mixed_precision_updates():
+    A = random_matrix(6)
+    rng = np.random.default_rng(3)
+    solver = LUSolver(A, max_update_rank=2, mixed_precision=True)
+
+    U, V = rng.random((6, 2)), rng.random((6, 2))
+    solver.update(U, V)
+    A = A + U @ V.T
+    assert solver.update_rank == 2
+    assert np.allclose(solver.solve(np.ones(6)), np.linalg.solve(A, np.ones(6)), rtol=1e-13, atol=0.0)
+
+    solver.update_entries(np.array([2]), np.array([4]), np.array([1.5]))
+    A[2, 4] += 1.5
+    assert solver.update_rank == 0
+    assert solver.mixed_precision
+    assert np.allclose(solver.solve(np.ones(6)), np.linalg.solve(A, np.ones(6)), rtol=1e-13, atol=0.0)
+
+
+def test_lu_solver_mixed_precision_validation():
+    with pytest.raises(ValueError, match="Argument mixed_precision is only supported for dense matrices!"):
+        LUSolver(sparse_laplacian(4), mixed_precision=True)
+
+    with pytest.raises(ValueError, match="Argument max_refinement_iterations should not be negative!"):
+        LUSolver(correct_matrix(), mixed_precision=True, max_refinement_iterations=-1)
+
+
+# In-place #
+
+
+def test_check_finite():
+    check_finite(np.array([1e308, 1e308, -1.0]), "inf", "nan")
+
+    with pytest.raises(ValueError, match="^inf$"):
+        check_finite(np.array([[1.0, np.nan], [np.inf, 1.0]]), "inf", "nan")
+
+    with pytest.raises(ValueError, match="^nan$"):
+        check_finite(np.array([1e308, 1e308, np.nan]), "inf", "nan")
+
+    values = np.zeros((3, 40000))
+    values[2, 39999] = -np.inf
+    with pytest.raises(ValueError, match="^inf$"):
+        check_finite(values, "inf", "nan")
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_lu_solver_overwrite_a(order):
+    A = np.asarray(random_matrix(6), order=order)
+    expected = LUSolver(A)
+    b = np.arange(6.0)
+
+    solver = LUSolver(A, overwrite_a=True)
+
+    assert np.shares_memory(solver._lu, A)
+    assert solver._trans == (order == "C")
+    assert np.isclose(solver.rcond, expected.rcond)
+    assert np.allclose(solver.solve(b), expected.solve(b))
+    assert np.allclose(solver._dense_matrix(), random_matrix(6))
+
+
+def test_lu_solver_overwrite_a_not_in_place():
+    A = random_matrix(6)
+    b = np.arange(6.0)
+
+    read_only = A.copy()
+    read_only.flags.writeable = False
+    assert np.allclose(LUSolver(read_only, overwrite_a=True).solve(b), np.linalg.solve(A, b))
+
+    strided = np.repeat(A, 2, axis=1)[:, ::2]
+    solver = LUSolver(strided, overwrite_a=True)
+    assert not np.shares_memory(solver._lu, strided)
+    assert np.isclose(solver.rcond, LUSolver(A).rcond)
+    assert np.allclose(solver.solve(b), np.linalg.solve(A, b))
+
+
+def test_lu_solver_overwrite_a_mixed_precision():
+    A = random_matrix(6)
+    solver = LUSolver(A, mixed_precision=True, overwrite_a=True)
+
+    assert solver._refined_matrix is A
+    assert np.allclose(solver.solve(np.ones(6)), np.linalg.solve(random_matrix(6), np.ones(6)))
+
+
+def test_lu_solver_out():
+    A = random_matrix(5)
+    solver = LUSolver(A, overwrite_a=True)
+    b = np.random.default_rng(1).random((5, 3))
+    expected = np.linalg.solve(random_matrix(5), b)
+
+    out = np.empty((5, 3), order="F")
+    assert solver.solve(b, out=out) is out
+    assert np.allclose(out, expected)
+
+    out = np.empty((5, 3))
+    assert solver.solve(b, out=out) is out
+    assert np.allclose(out, expected)
+
+    b_in_place = np.asfortranarray(b)
+    assert solver.solve(b_in_place, out=b_in_place, check_finite_values=False) is b_in_place
+    assert np.allclose(b_in_place, expected)
+
+
+@pytest.mark.parametrize(
+    "matrix, kwargs",
+    [(sparse_laplacian(5), {}), (random_matrix(5), {"mixed_precision": True}), (random_matrix(5), {})],
+)
+def test_lu_solver_out_other_paths(matrix, kwargs):
+    solver = LUSolver(matrix, **kwargs)
+    solver.update_entries(np.array([0]), np.array([4]), np.array([-0.5]))
+    b = np.arange(5.0)
+    out = np.empty(5)
+
+    assert solver.solve(b, out=out) is out
+    assert np.allclose(out, solver.solve(b))
+
+
+def test_lu_solver_check_finite_values_false():
+    A = random_matrix(3)
+    A[0, 0] = np.nan
+
+    with pytest.raises(ValueError, match="Argument should not contain nan values!"):
+        LUSolver(A)
+
+    with pytest.raises(ValueError, match="Argument array should not contain nan!"):
+        LUSolver(random_matrix(3)).solve(np.array([np.nan, 1.0, 1.0]))
+
+    assert np.isnan(LUSolver(A, check_finite_values=False).solve(np.ones(3))).any()
+    assert np.isnan(LUSolver(random_matrix(3)).solve(np.array([np.nan, 1.0, 1.0]), check_finite_values=False)).any()
+
+
+def test_lu_solver_out_validation():
+    solver = LUSolver(correct_matrix())
+    b = np.ones(4)
+
+    for out in ([0.0] * 4, np.empty(4, dtype=np.float32), np.empty((4, 1))):
+        with pytest.raises(ValueError, match="Argument out should be a writeable float64 numpy array"):
+            solver.solve(b, out=out)
+
+    out = np.empty(4)
+    out.flags.writeable = False
+    with pytest.raises(ValueError, match="Argument out should be a writeable float64 numpy array"):
+        solver.solve(b, out=out)
+
+
+# Batched #
+
+
+def random_matrices(batch, m, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random((batch, m, m)) + m * np.eye(m)
+
+
+@pytest.mark.parametrize("m", [1, 4, 9])
+def test_batch_lu_solver_matches_numpy(m):
+    A = random_matrices(50, m)
+    A[::7] = A[::7, ::-1]  # rows in reverse order need pivoting
+    b = np.random.default_rng(1).random((50, m))
+    solver = BatchLUSolver(A)
+
+    assert not solver.singular.any()
+    assert np.allclose(solver.solve(b), np.linalg.solve(A, b[..., None])[..., 0])
+
+
+def test_batch_lu_solver_matches_lu_factor():
+    A = random_matrices(3, 5)[:, ::-1]
+    solver = BatchLUSolver(A)
+
+    for i in range(3):
+        lu, piv = scipy.linalg.lu_factor(A[i])
+        assert np.allclose(solver._lu[i], lu)
+        assert np.array_equal(solver._piv[i], piv)
+
+
+def test_batch_lu_solver_multiple_right_hand_sides():
+    A = random_matrices(10, 4)
+    b = np.random.default_rng(2).random((10, 4, 3))
+
+    x = BatchLUSolver(A).solve(b)
+
+    assert x.shape == (10, 4, 3)
+    assert np.allclose(A @ x, b)
+
+
+def test_batch_lu_solver_singular_elements():
+    A = random_matrices(4, 3)
+    A[1] = [[1.0, 2.0, 3.0], [2.0, 4.0, 6.0], [0.0, 1.0, 1.0]]
+    A[3] = 0.0
+    b = np.ones((4, 3))
+    solver = BatchLUSolver(A)
+
+    x = solver.solve(b)
+
+    assert solver.singular.tolist() == [False, True, False, True]
+    assert np.isnan(x[[1, 3]]).all()
+    assert np.allclose(A[[0, 2]] @ x[[0, 2], :, None], 1.0)
+
+
+def test_batch_lu_solver_validation():
+    with pytest.raises(TypeError, match="Argument should be a numpy array!"):
+        BatchLUSolver([[[1.0]]])
+
+    with pytest.raises(ValueError, match="Argument should be a three dimensional array of matrices!"):
+        BatchLUSolver(correct_matrix())
+
+    with pytest.raises(ValueError, match="Argument should contain at least 1 value!"):
+        BatchLUSolver(np.empty((0, 2, 2)))
+
+    with pytest.raises(ValueError, match="Argument should contain square matrices!"):
+        BatchLUSolver(np.ones((2, 2, 3)))
+
+    with pytest.raises(ValueError, match="Argument should contain float64 values!"):
+        BatchLUSolver(np.ones((2, 2, 2), dtype=np.int64))
+
+    A = random_matrices(2, 2)
+    A[1, 0, 1] = np.inf
+    with pytest.raises(ValueError, match="Argument should not contain inf values!"):
+        BatchLUSolver(A)
+
+    A[1, 0, 1] = np.nan
+    with pytest.raises(ValueError, match="Argument should not contain nan values!"):
+        BatchLUSolver(A)
+
+
+def test_batch_lu_solver_vector_validation():
+    solver = BatchLUSolver(random_matrices(2, 3))
+
+    with pytest.raises(TypeError, match="Argument should be a numpy array!"):
+        solver.solve([[1.0, 1.0, 1.0], [1.0, 1.0, 1.0]])
+
+    with pytest.raises(TypeError, match="Argument should be a two or three dimensional array!"):
+        solver.solve(np.ones(3))
+
+    with pytest.raises(TypeError, match="Argument numpy array should contain float64 values!"):
+        solver.solve(np.ones((2, 3), dtype=np.int64))
+
+    with pytest.raises(ValueError, match="Argument should have the same batch size and size as the matrices!"):
+        solver.solve(np.ones((3, 3)))
+
+    with pytest.raises(ValueError, match="Argument array should not contain inf!"):
+        solver.solve(np.array([[1.0, 1.0, 1.0], [1.0, np.inf, 1.0]]))
+
+    with pytest.raises(ValueError, match="Argument array should not contain nan!"):
+        solver.solve(np.array([[1.0, 1.0, 1.0], [1.0, np.nan, 1.0]]))
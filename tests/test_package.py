@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import ees_scientific_software_engineering as package
+from ees_scientific_software_engineering import rms, solvers
+
+# budget of the cumulative import time of the package itself, in microseconds; it takes a few ms
+IMPORT_TIME_BUDGET = 25_000
+
+HEAVY_MODULES = ["numpy", "scipy", "threadpoolctl"]
+
+
+def run_python(*arguments):
+    environment = {**os.environ, "PYTHONPATH": str(Path(package.__file__).parents[1])}
+    return subprocess.run([sys.executable, *arguments], capture_output=True, text=True, check=True, env=environment)
+
+
+def modules_after(code):
+    prefixes = HEAVY_MODULES + [package.__name__]
+    code += f"\nimport json, sys\nprint(json.dumps(sorted(m for m in sys.modules if m.split('.')[0] in {prefixes})))"
+    return json.loads(run_python("-c", code).stdout.splitlines()[-1])
+
+
+def test_import_is_lazy():
+    assert modules_after(f"import {package.__name__}") == [package.__name__]
+
+
+def test_rms_does_not_import_scipy():
+    modules = modules_after(f"import numpy as np\nfrom {package.__name__} import rms\nprint(rms.rms(np.ones(3)))")
+
+    assert f"{package.__name__}.rms" in modules
+    assert "numpy" in modules
+    assert not [module for module in modules if module.split(".")[0] in ("scipy", "threadpoolctl")]
+    assert f"{package.__name__}.solvers" not in modules
+
+
+def test_solver_imports_scipy():
+    modules = modules_after(f"from {package.__name__} import LUSolver")
+
+    assert f"{package.__name__}.solvers" in modules
+    assert "scipy" in modules
+
+
+def test_import_time():
+    times = []
+    for _ in range(3):
+        result = run_python("-X", "importtime", "-c", f"import {package.__name__}")
+        line = next(line for line in result.stderr.splitlines() if line.endswith(f"| {package.__name__}"))
+        times.append(int(line.split("|")[1]))
+
+    assert min(times) < IMPORT_TIME_BUDGET
+
+
+@pytest.mark.parametrize("name", package.__all__)
+def test_lazy_attributes(name):
+    value = getattr(package, name)
+
+    if name in package._SUBMODULES:
+        assert value is sys.modules[f"{package.__name__}.{name}"]
+    else:
+        assert value is getattr(sys.modules[f"{package.__name__}.{package._ATTRIBUTE_MODULES[name]}"], name)
+    assert name in dir(package)
+
+
+def test_attributes():
+    assert rms is sys.modules[f"{package.__name__}.rms"]
+    assert package.LUSolver is solvers.LUSolver
+    assert package.add(1, 2) == 3
+
+    with pytest.raises(AttributeError, match="has no attribute 'missing'"):
+        package.missing
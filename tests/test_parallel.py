@@ -0,0 +1,80 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+import threadpoolctl
+
+from ees_scientific_software_engineering.parallel import *
+
+
+def blas_threads():
+    return [info["num_threads"] for info in threadpoolctl.threadpool_info() if info["user_api"] == "blas"]
+
+
+def test_available_cores():
+    assert 1 <= available_cores() <= (os.cpu_count() or 1)
+
+
+def test_limit_blas_threads():
+    before = blas_threads()
+
+    with limit_blas_threads(2) as limited:
+        assert limited
+        assert set(blas_threads()) == {2}
+
+    assert blas_threads() == before
+
+
+def test_limit_blas_threads_none():
+    before = blas_threads()
+
+    with limit_blas_threads(None) as limited:
+        assert not limited
+        assert blas_threads() == before
+
+
+def test_limit_blas_threads_without_threadpoolctl(monkeypatch):
+    # a None in sys.modules makes importing it raise an ImportError
+    monkeypatch.setitem(sys.modules, "threadpoolctl", None)
+
+    with limit_blas_threads(1) as limited:
+        assert not limited
+
+
+def test_limit_blas_threads_invalid():
+    with pytest.raises(ValueError, match="n_threads should be at least 1"):
+        with limit_blas_threads(0):
+            pass
+
+
+@pytest.mark.parametrize("n_workers", [None, 1, 3])
+def test_thread_map(n_workers):
+    thread_ids = set()
+
+    def square(x):
+        thread_ids.add(threading.get_ident())
+        return x * x
+
+    assert thread_map(square, range(20), n_workers) == [x * x for x in range(20)]
+    if n_workers == 1:
+        assert thread_ids == {threading.get_ident()}
+
+
+def test_thread_map_limits_blas_threads():
+    results = thread_map(lambda _: blas_threads(), range(4), n_workers=2, blas_threads=3)
+
+    # one entry per loaded BLAS library, which numpy and scipy may or may not share
+    assert len(results) == 4
+    for threads in results:
+        assert set(threads) == {3}
+    assert set(thread_map(lambda _: blas_threads(), range(2), n_workers=available_cores() + 1)[0]) == {1}
+
+
+def test_thread_map_errors():
+    with pytest.raises(ValueError, match="n_workers should be at least 1"):
+        thread_map(abs, [1], n_workers=0)
+
+    with pytest.raises(ZeroDivisionError):
+        thread_map(lambda x: 1 / x, [1.0, 0.0], n_workers=2)
@@ -4,7 +4,8 @@ from pathlib import Path
 import numpy as np
 import pytest
 
-from ees_scientific_software_engineering.rms import rms
+from ees_scientific_software_engineering import rms as rms_module
+from ees_scientific_software_engineering.rms import RmsAccumulator, batched_rms, rms, rolling_rms
 
 DATA_PATH = Path(__file__).parent / "data"
 
@@ -53,3 +54,342 @@ def test_atleat_one_value():
 def test_rms_error_contains_nan():
     with pytest.raises(ValueError, match="Argument array should not contain nan!"):
         rms(np.array([4.0, np.nan, 8.0]))
+
+
+# Overflow-safe and parallel #
+
+
+@pytest.mark.parametrize("magnitude", [1e-300, 1e-200, 1e200, 1e300])
+def test_rms_does_not_overflow_or_underflow(magnitude):
+    assert np.isclose(rms(np.array([4.0, 1.0, 8.0]) * magnitude), 5.1962 * magnitude, rtol=1e-4)
+
+
+def test_rms_blocks_of_different_scales(monkeypatch):
+    monkeypatch.setattr(rms_module, "BLOCK_SIZE", 10)
+    rng = np.random.default_rng(6)
+    parts = [rng.normal(size=25) * magnitude for magnitude in (1.0, 1e250, 0.0, 1e-250, 1e-320, 1e300)]
+    signal = np.concatenate(parts)
+
+    expected = 1e300 * np.sqrt(np.mean((signal / 1e300) ** 2))
+    assert np.isclose(rms(signal), expected, rtol=1e-14)
+    assert np.isclose(rms(signal, n_workers=4), expected, rtol=1e-14)
+
+
+def test_rms_zeros():
+    assert rms(np.zeros(10)) == 0.0
+    assert rms(np.zeros(10), n_workers=3) == 0.0
+
+
+@pytest.mark.parametrize("n_workers", [2, 3, 8, 300])
+def test_rms_parallel(monkeypatch, n_workers):
+    monkeypatch.setattr(rms_module, "BLOCK_SIZE", 16)
+    signal = np.random.default_rng(7).normal(size=200)
+
+    assert np.isclose(rms(signal, n_workers=n_workers), rms(signal), rtol=1e-14)
+    assert np.isclose(rms(signal[::3], n_workers=n_workers), rms(signal[::3]), rtol=1e-14)
+
+
+def test_rms_parallel_above_threshold(monkeypatch):
+    calls = []
+
+    def recording_thread_map(function, items, n_workers=None):
+        calls.append(n_workers)
+        return [function(item) for item in items]
+
+    monkeypatch.setattr(rms_module, "PARALLEL_RMS_THRESHOLD", 100)
+    monkeypatch.setattr(rms_module, "available_cores", lambda: 4)
+    monkeypatch.setattr(rms_module, "thread_map", recording_thread_map)
+    signal = np.random.default_rng(8).normal(size=100)
+
+    assert np.isclose(rms(signal[:99]), rms(signal[:99], n_workers=1))
+    assert not calls
+    assert np.isclose(rms(signal), rms(signal, n_workers=1))
+    assert calls == [4]
+
+
+def test_rms_parallel_errors(monkeypatch):
+    monkeypatch.setattr(rms_module, "BLOCK_SIZE", 4)
+    signal = np.ones(20)
+
+    with pytest.raises(ValueError, match="Argument n_workers should be at least 1!"):
+        rms(signal, n_workers=0)
+
+    signal[13] = -np.inf
+    with pytest.raises(ValueError, match="Argument array should not contain inf!"):
+        rms(signal, n_workers=2)
+
+    signal[13] = np.nan
+    with pytest.raises(ValueError, match="Argument array should not contain nan!"):
+        rms(signal, n_workers=2)
+
+
+@pytest.mark.parametrize(
+    "function",
+    [
+        rms,
+        lambda signal: rms(signal, n_workers=3),
+        lambda signal: RmsAccumulator().update(signal),
+        batched_rms,
+        lambda signal: rolling_rms(signal, 5),
+        lambda signal: rolling_rms(signal, 5, step=5),
+    ],
+)
+def test_rms_inf_takes_precedence_over_nan(monkeypatch, function):
+    # a nan in the first block and an inf in the last, which all functions report as inf like rms
+    monkeypatch.setattr(rms_module, "BLOCK_SIZE", 8)
+    monkeypatch.setattr(rms_module, "ROLLING_BLOCK_SIZE", 8)
+    signal = np.ones(100)
+    signal[3] = np.nan
+    signal[90] = np.inf
+
+    with pytest.raises(ValueError, match="Argument array should not contain inf!"):
+        function(signal)
+
+    signal[90] = 1.0
+    with pytest.raises(ValueError, match="Argument array should not contain nan!"):
+        function(signal)
+
+
+# Streaming #
+
+
+def test_rms_accumulator_chunks():
+    rng = np.random.default_rng(0)
+    signal = rng.normal(size=200_000)
+
+    accumulator = RmsAccumulator.from_chunks(np.array_split(signal, 7))
+
+    assert accumulator.count == 200_000
+    assert np.isclose(accumulator.result(), rms(signal), rtol=1e-14)
+
+
+def test_rms_accumulator_update_blocks_and_empty_chunks():
+    signal = np.arange(1.0, 100_001.0)
+    accumulator = RmsAccumulator()
+
+    assert accumulator.update(np.array([], dtype=np.float64)) is accumulator
+    accumulator.update(signal).update(np.array([], dtype=np.float64))
+
+    assert np.isclose(accumulator.result(), np.sqrt((100_001 * 200_001) / 6), rtol=1e-15)
+
+
+def test_rms_accumulator_merge():
+    rng = np.random.default_rng(1)
+    parts = [rng.random(n) * 10**n for n in range(1, 6)]
+    accumulators = [RmsAccumulator().update(part) for part in parts]
+
+    merged = RmsAccumulator()
+    for accumulator in accumulators:
+        assert merged.merge(accumulator) is merged
+
+    assert merged.count == sum(len(part) for part in parts)
+    assert np.isclose(merged.result(), rms(np.concatenate(parts)), rtol=1e-14)
+
+
+def test_rms_accumulator_from_npy(tmp_path):
+    signal = np.random.default_rng(2).normal(size=150_000)
+    np.save(tmp_path / "signal.npy", signal)
+
+    accumulator = RmsAccumulator.from_npy(tmp_path / "signal.npy")
+
+    assert np.isclose(accumulator.result(), rms(signal), rtol=1e-14)
+
+
+def test_rms_accumulator_from_data():
+    with open(DATA_PATH / "test_rms.json") as f:
+        data = json.load(f)
+    array = np.array(data["array"])
+    assert np.isclose(RmsAccumulator.from_chunks([array[:1], array[1:]]).result(), data["expected"])
+
+
+@pytest.mark.parametrize("magnitude", [1e-300, 1e-200, 1e200, 1e300])
+def test_rms_accumulator_does_not_overflow_or_underflow(magnitude):
+    accumulator = RmsAccumulator().update(np.array([4.0, 1.0]) * magnitude)
+    accumulator.merge(RmsAccumulator().update(np.array([8.0]) * magnitude))
+
+    assert np.isclose(accumulator.result(), 5.1962 * magnitude, rtol=1e-4)
+
+
+def test_rms_accumulator_blocks_of_different_scales(monkeypatch):
+    monkeypatch.setattr(rms_module, "BLOCK_SIZE", 10)
+    rng = np.random.default_rng(6)
+    parts = [rng.normal(size=25) * magnitude for magnitude in (1.0, 1e250, 0.0, 1e-250, 1e-320, 1e300, 1e150)]
+
+    accumulator = RmsAccumulator.from_chunks(parts[:3])
+    accumulator.merge(RmsAccumulator.from_chunks(parts[3:]))
+
+    assert accumulator.count == 175
+    assert np.isclose(accumulator.result(), rms(np.concatenate(parts)), rtol=1e-14)
+
+
+def test_rms_accumulator_errors():
+    accumulator = RmsAccumulator()
+
+    with pytest.raises(ValueError, match="Argument numpy array should contain at least one value!"):
+        accumulator.result()
+
+    with pytest.raises(TypeError, match="Argument should be a numpy array!"):
+        accumulator.update([1.0, 2.0])
+
+    with pytest.raises(TypeError, match="Argument should be one dimensional array!"):
+        accumulator.update(np.ones((2, 2)))
+
+    with pytest.raises(TypeError, match="Argument numpy array should contain float64 values!"):
+        accumulator.update(np.ones(2, dtype=np.float32))
+
+    with pytest.raises(ValueError, match="Argument array should not contain inf!"):
+        accumulator.update(np.array([4.0, -np.inf, 8.0]))
+
+    with pytest.raises(ValueError, match="Argument array should not contain nan!"):
+        accumulator.update(np.array([4.0, np.nan, 8.0]))
+
+    with pytest.raises(TypeError, match="Argument should be an RmsAccumulator!"):
+        accumulator.merge(1.0)
+
+
+# Batched and rolling #
+
+
+def reference_rolling_rms(signal, window, step):
+    return np.array([rms(signal[start : start + window]) for start in range(0, len(signal) - window + 1, step)])
+
+
+@pytest.mark.parametrize("axis", [0, 1, 2, -1])
+def test_batched_rms(axis):
+    signals = np.random.default_rng(3).normal(size=(4, 5, 6))
+
+    result = batched_rms(signals, axis=axis)
+
+    moved = np.moveaxis(signals, axis, -1)
+    assert result.shape == moved.shape[:-1]
+    assert np.allclose(result, [[rms(signal) for signal in channel] for channel in moved], rtol=1e-14)
+
+
+def test_batched_rms_one_dimensional():
+    assert np.isclose(batched_rms(np.array([4.0, 1.0, 8.0])), 5.1962)
+
+
+def test_batched_rms_overflow():
+    signals = np.array([[1e200, 1.0], [3.0, 4.0], [-1e300, 1e300]])
+
+    assert np.allclose(batched_rms(signals), [1e200 / np.sqrt(2), np.sqrt(12.5), 1e300], rtol=1e-15)
+    assert np.allclose(batched_rms(signals, axis=0), [1e300 / np.sqrt(3), 1e300 / np.sqrt(3)], rtol=1e-15)
+    assert np.isclose(batched_rms(signals[0]), 1e200 / np.sqrt(2), rtol=1e-15)
+
+
+def test_batched_rms_underflow():
+    signals = np.array([np.full(8, 1e-200), [3e-170, 4e-170] + 6 * [0.0], np.zeros(8)])
+
+    assert np.allclose(batched_rms(signals), [1e-200, 5e-170 / np.sqrt(8), 0.0], rtol=1e-15, atol=0.0)
+    assert batched_rms(signals[0]) == pytest.approx(1e-200, rel=1e-15)
+    assert batched_rms(signals[0]) == rms(signals[0])
+
+
+@pytest.mark.parametrize("window, step", [(1, 1), (7, 1), (7, 3), (7, 10), (50, 50), (50, 16), (300, 1), (1000, 7)])
+def test_rolling_rms(monkeypatch, window, step):
+    # small blocks, so that windows overlap blocks
+    monkeypatch.setattr(rms_module, "ROLLING_BLOCK_SIZE", 64)
+    signal = np.random.default_rng(4).normal(size=1000)
+
+    result = rolling_rms(signal, window, step)
+
+    assert np.allclose(result, reference_rolling_rms(signal, window, step), rtol=1e-12)
+
+
+def test_rolling_rms_axis(monkeypatch):
+    monkeypatch.setattr(rms_module, "ROLLING_BLOCK_SIZE", 16)
+    signals = np.random.default_rng(5).normal(size=(100, 3))
+
+    result = rolling_rms(signals, 20, step=5, axis=0)
+
+    assert result.shape == (3, 17)
+    for channel in range(3):
+        assert np.allclose(result[channel], reference_rolling_rms(signals[:, channel], 20, 5), rtol=1e-12)
+
+
+def test_rolling_rms_per_cycle():
+    # 50 Hz sine with an amplitude of 2 sampled at 10 kHz, 200 samples per cycle
+    time = np.arange(10_000) / 10_000
+    waveform = 2.0 * np.sin(2 * np.pi * 50 * time)
+
+    assert np.allclose(rolling_rms(waveform, 200, step=200), np.full(50, np.sqrt(2)), rtol=1e-12)
+    assert np.allclose(rolling_rms(waveform, 200), np.sqrt(2), rtol=1e-12)
+
+
+def test_rolling_rms_rounding_restarts_every_block(monkeypatch):
+    # the large squares only round the cumulative sums of the blocks which contain them
+    monkeypatch.setattr(rms_module, "ROLLING_BLOCK_SIZE", 100)
+    signal = np.concatenate([np.full(1000, 1e8), np.full(1000, 1e-3)])
+
+    assert np.allclose(rolling_rms(signal, 10, step=10)[-10:], 1e-3, rtol=1e-12)
+
+
+@pytest.mark.parametrize("step", [1, 3])
+def test_rolling_rms_rounding_after_transient(step):
+    # a transient 1e7 times the signal in the same block does not round away the windows after it
+    signal = np.full(1000, 1e-3)
+    signal[100:110] = 1e4
+
+    result = rolling_rms(signal, 20, step=step)
+
+    assert np.allclose(result[110 // step + 1 :], 1e-3, rtol=1e-12)
+
+
+def test_rolling_rms_overflow():
+    signal = np.array([1.0, 1e200, 2.0, 3.0, 4.0])
+
+    expected = [1e200 / np.sqrt(2), 1e200 / np.sqrt(2), np.sqrt(6.5), np.sqrt(12.5)]
+    assert np.allclose(rolling_rms(signal, 2), expected, rtol=1e-15)
+    assert np.allclose(rolling_rms(signal, 2, step=2), expected[::2], rtol=1e-15)
+    assert np.allclose(rolling_rms(signal, 4), [1e200 / 2, 1e200 / 2], rtol=1e-15)
+
+
+@pytest.mark.parametrize("window, step", [(4, 1), (4, 3), (4, 4), (3, 5)])
+def test_rolling_rms_underflow(window, step):
+    signal = np.full(8, 1e-200)
+
+    assert np.allclose(rolling_rms(signal, window, step), 1e-200, rtol=1e-15, atol=0.0)
+    assert np.allclose(rolling_rms(signal * np.tile([1.0, 1e150], 4), 2), 1e-50 / np.sqrt(2), rtol=1e-15, atol=0.0)
+
+
+@pytest.mark.parametrize("window, step", [(1, 1), (7, 1), (7, 3), (7, 10), (50, 16)])
+def test_rolling_rms_overflow_different_scales(monkeypatch, window, step):
+    monkeypatch.setattr(rms_module, "ROLLING_BLOCK_SIZE", 64)
+    rng = np.random.default_rng(9)
+    signal = rng.normal(size=1000) * rng.choice([1e-300, 1.0, 1e150, 1e300], size=1000)
+
+    assert np.allclose(rolling_rms(signal, window, step), reference_rolling_rms(signal, window, step), rtol=1e-12)
+
+
+def test_batched_and_rolling_rms_errors():
+    for function in (batched_rms, lambda array, **kwargs: rolling_rms(array, 1, **kwargs)):
+        with pytest.raises(TypeError, match="Argument should be a numpy array!"):
+            function([1.0, 2.0])
+
+        with pytest.raises(TypeError, match="Argument should be at least one dimensional array!"):
+            function(np.array(1.0))
+
+        with pytest.raises(TypeError, match="Argument numpy array should contain float64 values!"):
+            function(np.ones(2, dtype=np.float32))
+
+        with pytest.raises(ValueError, match="Argument axis should be an axis of the array!"):
+            function(np.ones((2, 2)), axis=2)
+
+        with pytest.raises(ValueError, match="Argument axis should be an axis of the array!"):
+            function(np.ones((2, 2)), axis=None)
+
+        with pytest.raises(ValueError, match="Argument array should not contain inf!"):
+            function(np.array([[4.0, 1.0], [-np.inf, 8.0]]))
+
+        with pytest.raises(ValueError, match="Argument array should not contain nan!"):
+            function(np.array([[4.0, 1.0], [np.nan, 8.0]]))
+
+    with pytest.raises(ValueError, match="Argument numpy array should contain at least one value!"):
+        batched_rms(np.ones((3, 0)))
+
+    for window, step in [(0, 1), (2, 0), (2.0, 1), (True, 1)]:
+        with pytest.raises(ValueError, match="Argument (window|step) should be a positive integer!"):
+            rolling_rms(np.ones(5), window, step)
+
+    with pytest.raises(ValueError, match="Argument window should not be longer than the array!"):
+        rolling_rms(np.ones(5), 6)
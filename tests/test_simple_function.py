@@ -1,6 +1,7 @@
+import numpy as np
 import pytest
 
-from ees_scientific_software_engineering.simple_function import add, multiply
+from ees_scientific_software_engineering.simple_function import add, add_arrays, multiply, multiply_arrays
 
 
 def test_add():
@@ -16,3 +17,62 @@ def test_add_error():
     b = 1
     with pytest.raises(TypeError, match="Arguments should be integers!"):
         add(a, b)
+
+
+def test_add_arrays():
+    result = add_arrays(np.array([1, 2, 3]), np.int32(4))
+
+    assert result.dtype == np.int64
+    assert result.tolist() == [5, 6, 7]
+
+
+def test_multiply_arrays():
+    result = multiply_arrays(np.array([[1], [2]], dtype=np.uint8), np.array([3, 200], dtype=np.int16))
+
+    assert result.dtype == np.int64
+    assert result.tolist() == [[3, 200], [6, 400]]
+
+
+def test_array_kernels_overflow_chaining():
+    large = multiply_arrays(np.array([2**40, 3]), 2**40)
+
+    assert large.dtype == object
+    assert add_arrays(large, np.array([0, -(2**80)])).tolist() == [2**80, 3 * 2**40 - 2**80]
+    assert add_arrays(large, -large).dtype == np.int64
+    assert multiply_arrays(np.array([2**63 + 1], dtype=np.uint64), 1).tolist() == [2**63 + 1]
+    assert multiply_arrays(np.array([2**63 - 1], dtype=np.uint64), 1).dtype == np.int64
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        (2**63 - 1, 1),
+        (2**63 - 1, 2),
+        (-(2**63), 1),
+        (-(2**63), -1),
+        (2**63, 0),
+        (2**63, 1),
+        (np.int64(2**63 - 1), 1),
+        (np.uint64(2**63), 1),
+        (np.uint64(2**64 - 1), 1),
+        (2**64, -1),
+    ],
+)
+def test_array_kernels_scalar_limits(a, b):
+    for function, operation in ((add_arrays, int.__add__), (multiply_arrays, int.__mul__)):
+        result = function(a, b)
+        expected = operation(int(a), int(b))
+
+        assert result.shape == ()
+        assert result.dtype == (np.int64 if -(2**63) <= expected < 2**63 else object)
+        assert result.item() == expected
+
+
+def test_array_kernels_error():
+    for function in (add_arrays, multiply_arrays):
+        for a, b in [(1.0, 1), (np.array([1.0]), 1), (np.array([True]), 1), ([1, 2], 1), (1, np.array(["1"]))]:
+            with pytest.raises(TypeError, match="Arguments should be integers!"):
+                function(a, b)
+
+        with pytest.raises(TypeError, match="Arguments should be integers!"):
+            function(np.array([1, 2.0], dtype=object), 1)
@@ -1,7 +1,10 @@
 import json
 from pathlib import Path
 
-from ees_scientific_software_engineering.simple_function import multiply
+import numpy as np
+import pytest
+
+from ees_scientific_software_engineering.simple_function import add_arrays, multiply, multiply_arrays
 
 DATA_PATH = Path(__file__).parent / "data"
 
@@ -10,3 +13,24 @@ def test_multiply_from_data():
     with open(DATA_PATH / "test_multiply.json") as f:
         data = json.load(f)
     assert multiply(data["x"], data["y"]) == data["expected"]
+
+
+@pytest.mark.parametrize("case", json.loads((DATA_PATH / "test_array_kernels.json").read_text()))
+def test_array_kernels_from_data(case):
+    function = {"add": add_arrays, "multiply": multiply_arrays}[case["function"]]
+    expected = np.array(case["expected"])
+    fits_int64 = expected.dtype == np.int64
+
+    result = function(np.array(case["x"]), np.array(case["y"]))
+
+    assert result.dtype == (np.int64 if fits_int64 else object)
+    assert result.shape == expected.shape
+    assert result.tolist() == case["expected"]
+    if np.ndim(case["x"]) == 0 and np.ndim(case["y"]) == 0:
+        assert function(case["x"], case["y"]) == case["expected"]
+
+
+def test_multiply_arrays_from_data():
+    with open(DATA_PATH / "test_multiply.json") as f:
+        data = json.load(f)
+    assert multiply_arrays(np.array([data["x"]]), data["y"]).tolist() == [data["expected"]]
@@ -0,0 +1,175 @@
+import numpy as np
+import pytest
+from test_graph_processing import random_forest, random_radial_network
+
+from ees_scientific_software_engineering import solvers
+from ees_scientific_software_engineering.graph_processing import GraphProcessor
+from ees_scientific_software_engineering.solvers import LUSolver, TreeSolver
+
+SIMPLE_NETWORK = (
+    [1, 2, 3, 4, 5],
+    [12, 23, 24, 45, 51],
+    [(1, 2), (2, 3), (2, 4), (4, 5), (5, 1)],
+    [True, True, True, True, False],
+    1,
+)
+
+NETWORKS = {
+    "simple": SIMPLE_NETWORK,
+    "switching": (
+        [0, 2, 10, 4, 6],
+        [1, 9, 7, 3, 8, 5],
+        [(0, 2), (2, 10), (2, 4), (0, 4), (4, 6), (0, 6)],
+        [True, True, False, True, False, True],
+        0,
+    ),
+    "parallel and self-loop": (
+        [0, 1, 2],
+        [1, 2, 3, 4, 5],
+        [(0, 1), (1, 2), (2, 1), (1, 0), (2, 2)],
+        [True, True, False, False, False],
+        0,
+    ),
+    "path": (
+        list(range(2000)),
+        list(range(2000, 5999)),
+        [(i + 1, i) for i in range(1999)] + [(0, i) for i in range(2000)],
+        [True] * 1999 + [False] * 2000,
+        0,
+    ),
+    "single vertex": ([7], [], [], [], 7),
+    "small forest": ([0, 2, 4, 6], [1, 3], [(0, 2), (6, 4)], [True, True], [0, 4]),
+    **{f"random {seed}": random_radial_network(60, 20, seed) for seed in range(5)},
+    **{f"forest {seed}": random_forest(3, 30, 4, seed) for seed in range(3)},
+}
+
+
+def reference_matrix(vertex_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id, edge_weights, vertex_weights):
+    position = {vertex_id: i for i, vertex_id in enumerate(vertex_ids)}
+    matrix = np.diag(vertex_weights)
+    for (vertex_1, vertex_2), enabled, weight in zip(edge_vertex_id_pairs, edge_enabled, edge_weights):
+        if enabled:
+            i, j = position[vertex_1], position[vertex_2]
+            matrix[[i, j], [i, j]] += weight
+            matrix[[i, j], [j, i]] -= weight
+    for source in np.atleast_1d(source_vertex_id):
+        matrix[position[source]] = 0.0
+        matrix[position[source], position[source]] = 1.0
+    return matrix
+
+
+@pytest.fixture(params=["levels", "superlu"])
+def factorization(request, monkeypatch):
+    # every tree is factorized level by level without a minimum level size and with SuperLU with a huge one
+    monkeypatch.setattr(solvers, "TREE_LEVEL_SIZE", 0 if request.param == "levels" else 1 << 40)
+    return request.param
+
+
+@pytest.mark.parametrize("name", NETWORKS)
+def test_tree_solver_matches_lu_solver(name, factorization):
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = NETWORKS[name]
+    graph_processor = GraphProcessor(vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id)
+    rng = np.random.default_rng(0)
+    edge_weights = rng.random(len(edge_ids)) + 0.5
+    vertex_weights = 0.1 * rng.random(len(vertex_ids))
+    b = rng.random((len(vertex_ids), 3))
+
+    solver = TreeSolver(graph_processor, edge_weights, vertex_weights)
+
+    matrix = reference_matrix(
+        vertex_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id, edge_weights, vertex_weights
+    )
+    assert np.allclose(solver.matrix().toarray(), matrix)
+    assert np.allclose(solver.solve(b), LUSolver(matrix).solve(b))
+    assert np.allclose(solver.solve(b[:, 0]), LUSolver(matrix).solve(b[:, 0]))
+    assert (solver._splu is not None) == (factorization == "superlu")
+
+
+@pytest.mark.parametrize(("name", "uses_superlu"), [("path", True), ("star", False)])
+def test_tree_solver_factorization_by_depth(name, uses_superlu):
+    n = 2 * solvers.TREE_LEVEL_SIZE
+    edge_vertex_id_pairs = [(i - 1 if name == "path" else 0, i) for i in range(1, n)]
+    graph_processor = GraphProcessor(list(range(n)), list(range(n - 1)), edge_vertex_id_pairs, [True] * (n - 1), 0)
+
+    solver = TreeSolver(graph_processor, np.ones(n - 1))
+
+    assert (solver._splu is not None) == uses_superlu
+    assert np.allclose(solver.solve(np.ones(n)), np.linalg.solve(solver.matrix().toarray(), np.ones(n)))
+
+
+def test_tree_solver_voltages(factorization):
+    graph_processor = GraphProcessor(*SIMPLE_NETWORK)
+    # unit resistances, 1 V at the source and 1 A drawn at vertices 3 and 5
+    solver = TreeSolver(graph_processor, np.ones(5))
+
+    x = solver.solve(np.array([1.0, 0.0, -1.0, 0.0, -1.0]))
+
+    assert np.allclose(x, [1.0, -1.0, -2.0, -2.0, -3.0])
+
+
+def test_tree_solver_after_switch():
+    vertex_ids, edge_ids, edge_vertex_id_pairs, edge_enabled, source_vertex_id = SIMPLE_NETWORK
+    graph_processor = GraphProcessor(*SIMPLE_NETWORK)
+    weights = np.arange(1.0, 6.0)
+    before = TreeSolver(graph_processor, weights)
+
+    graph_processor.switch(45, 51)
+
+    after = TreeSolver(graph_processor, weights)
+    matrix = reference_matrix(
+        vertex_ids, edge_vertex_id_pairs, [True, True, True, False, True], 1, weights, np.zeros(5)
+    )
+    b = np.ones(5)
+    assert np.allclose(after.solve(b), np.linalg.solve(matrix, b))
+    assert not np.allclose(before.solve(b), after.solve(b))
+
+
+def test_tree_solver_singular(factorization):
+    graph_processor = GraphProcessor(*SIMPLE_NETWORK)
+
+    with pytest.raises(ValueError, match="Argument weights should not make the matrix singular!"):
+        TreeSolver(graph_processor, np.array([1.0, 1.0, 0.0, 1.0, 1.0]))
+
+
+def test_tree_solver_validation():
+    graph_processor = GraphProcessor(*SIMPLE_NETWORK)
+
+    with pytest.raises(TypeError, match="Argument should be a numpy array!"):
+        TreeSolver(graph_processor, [1.0, 1.0, 1.0, 1.0, 1.0])
+
+    with pytest.raises(ValueError, match="Argument should contain float64 values!"):
+        TreeSolver(graph_processor, np.ones(5, dtype=np.int64))
+
+    with pytest.raises(ValueError, match="Argument should have one weight per edge or vertex!"):
+        TreeSolver(graph_processor, np.ones(4))
+
+    with pytest.raises(ValueError, match="Argument should have one weight per edge or vertex!"):
+        TreeSolver(graph_processor, np.ones(5), np.ones(6))
+
+    with pytest.raises(ValueError, match="Argument should not contain inf values!"):
+        TreeSolver(graph_processor, np.array([1.0, 1.0, np.inf, 1.0, 1.0]))
+
+    with pytest.raises(ValueError, match="Argument should not contain nan values!"):
+        TreeSolver(graph_processor, np.ones(5), np.array([1.0, 1.0, np.nan, 1.0, 1.0]))
+
+
+def test_tree_solver_vector_validation():
+    solver = TreeSolver(GraphProcessor(*SIMPLE_NETWORK), np.ones(5))
+
+    with pytest.raises(TypeError, match="Argument should be a numpy array!"):
+        solver.solve([1.0, 1.0, 1.0, 1.0, 1.0])
+
+    with pytest.raises(TypeError, match="Argument should be a one or two dimensional array!"):
+        solver.solve(np.ones((5, 1, 1)))
+
+    with pytest.raises(TypeError, match="Argument numpy array should contain float64 values!"):
+        solver.solve(np.ones(5, dtype=np.int64))
+
+    with pytest.raises(ValueError, match="Argument should be the same size as the matrix!"):
+        solver.solve(np.ones(4))
+
+    with pytest.raises(ValueError, match="Argument array should not contain inf!"):
+        solver.solve(np.array([1.0, np.inf, 1.0, 1.0, 1.0]))
+
+    with pytest.raises(ValueError, match="Argument array should not contain nan!"):
+        solver.solve(np.array([1.0, np.nan, 1.0, 1.0, 1.0]))